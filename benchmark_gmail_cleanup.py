@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Gmail Cleanup & Replies Benchmark
+
+Runs the cleanup_bounces and build_replies_csv phases of gmail_cleanup_and_replies.py against
+fake_gmail_server.py (started in a child process per mailbox size), and reports for each phase:
+
+- API calls (individual Gmail calls, batch sub-requests counted separately) and HTTP round trips
+- quota units consumed and rate-limit (429) responses
+- response bytes received by the client
+- wall time and peak Python memory of the client (tracemalloc; the server runs in another process)
+
+Usage:
+  python benchmark_gmail_cleanup.py
+  python benchmark_gmail_cleanup.py --sizes 1000 10000 100000 --latency-ms 20 --json bench.json
+  python benchmark_gmail_cleanup.py --sizes 10000 --quota-units-per-sec 250   # realistic per-user quota
+"""
+
+import io
+import sys
+import json
+import time
+import tempfile
+import argparse
+import tracemalloc
+import multiprocessing
+import urllib.request
+from pathlib import Path
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+import httplib2
+from googleapiclient.discovery import build
+
+import fake_gmail_server
+import gmail_cleanup_and_replies as gmail
+
+
+class LocalEndpointHttp:
+    """httplib2 transport that sends every googleapis.com request (including /batch) to the fake server."""
+
+    def __init__(self, base_url: str):
+        self._http = httplib2.Http()
+        self.base_url = base_url.rstrip('/')
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        uri = uri.replace('https://gmail.googleapis.com', self.base_url)
+        return self._http.request(uri, method=method, body=body, headers=headers, **kwargs)
+
+
+def _serve(conn, messages: int, seed: int, latency_ms: float, jitter_ms: float, quota: float, error_rate: float):
+    server = fake_gmail_server.make_server(messages, seed=seed, latency_ms=latency_ms, jitter_ms=jitter_ms,
+                                           quota_units_per_sec=quota, error_rate=error_rate)
+    conn.send(server.server_address[1])
+    conn.close()
+    server.serve_forever()
+
+
+def server_stats(base_url: str) -> Dict:
+    with urllib.request.urlopen(f'{base_url}/__stats') as resp:
+        return json.loads(resp.read())
+
+
+def run_phase(name: str, base_url: str, service, fn, verbose: bool) -> Dict:
+    before = server_stats(base_url)
+    traffic_before = {k: dict(v) for k, v in gmail.api_traffic(service).items()}
+    tracemalloc.start()
+    start = time.perf_counter()
+    output = io.StringIO()
+    with redirect_stdout(sys.stdout if verbose else output):
+        try:
+            result = fn()
+        except gmail.QuotaExhausted as e:
+            # The script stops (checkpointed) on quota exhaustion; report it instead of aborting the benchmark
+            result = {'error': f'quota exhausted: {str(e)[:120]}'}
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    after = server_stats(base_url)
+    received = sum(v['bytes'] for v in gmail.api_traffic(service).values()) - \
+        sum(v['bytes'] for v in traffic_before.values())
+    return {
+        'phase': name,
+        'api_calls': after['api_calls'] - before['api_calls'],
+        'http_requests': after['http_requests'] - before['http_requests'],
+        'quota_units': after['quota_units'] - before['quota_units'],
+        'rate_limited': after['rate_limited'] - before['rate_limited'],
+        'bytes': received,
+        'wall_s': round(wall, 3),
+        'peak_mb': round(peak / (1024 * 1024), 2),
+        'result': result,
+    }
+
+
+def benchmark_size(messages: int, args) -> List[Dict]:
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(
+        target=_serve,
+        args=(child, messages, args.seed, args.latency_ms, args.jitter_ms, args.quota_units_per_sec, args.error_rate),
+        daemon=True,
+    )
+    proc.start()
+    try:
+        port = parent.recv()
+        base_url = f'http://127.0.0.1:{port}'
+        service = build('gmail', 'v1', http=gmail.MeteredHttp(LocalEndpointHttp(base_url)), static_discovery=True)
+        my_email = gmail.get_profile_email(service)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            suppression = gmail.SuppressionIndex(tmp_path / 'suppression.csv')
+            results = [
+                run_phase('cleanup', base_url, service, lambda: gmail.cleanup_bounces(
+                    service, None, dry_run=False, hard_delete=args.hard_delete, suppression=suppression
+                ), args.verbose),
+                run_phase('replies', base_url, service, lambda: {'rows': gmail.build_replies_csv(
+                    service, my_email, tmp_path / 'replies.csv', None
+                )}, args.verbose),
+            ]
+    finally:
+        proc.terminate()
+        proc.join()
+
+    for r in results:
+        r['messages'] = messages
+        if 'error' in r['result']:
+            print(f"  Warning: {r['phase']} phase for {messages} messages stopped early ({r['result']['error']})")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gmail_cleanup_and_replies.py against a fake Gmail API.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='Mailbox sizes to seed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Fake server latency per HTTP request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra latency per HTTP request')
+    parser.add_argument('--quota-units-per-sec', type=float, default=0, help='Per-user quota (Gmail: 250); 0 = unlimited')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a spurious 429 per API call')
+    parser.add_argument('--hard-delete', action='store_true', help='Benchmark batchDelete instead of batchModify')
+    parser.add_argument('--json', type=str, help='Also write results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show the script output of each phase')
+    args = parser.parse_args()
+
+    all_results = []
+    print(f"{'messages':>9} {'phase':<8} {'api_calls':>9} {'http':>6} {'quota':>8} {'429s':>5} "
+          f"{'bytes':>11} {'wall_s':>8} {'peak_mb':>8}")
+    for size in args.sizes:
+        for r in benchmark_size(size, args):
+            all_results.append(r)
+            print(f"{r['messages']:>9} {r['phase']:<8} {r['api_calls']:>9} {r['http_requests']:>6} "
+                  f"{r['quota_units']:>8} {r['rate_limited']:>5} {r['bytes']:>11} {r['wall_s']:>8} {r['peak_mb']:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+        print(f"✓ Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Cosmos Graph Snapshot Diff
+
+Compares two graph files written by visualize_cosmos_graph.py (cosmos_graph.json exports or
+cosmos_graph_full.json build artifacts; compare files of the same kind, since exports truncate
+node data) and reports what changed between them:
+
+- Both files are streamed record by record; only a 16-byte digest per node/edge key is kept for the
+  old snapshot, so memory grows with the number of ids and changes, not with file size
+- Nodes are keyed by id and edges by (source, target, relation); added, removed and changed sets come
+  out of one pass over each file plus one more over the old file to recover removed/changed records
+- Changed nodes list their changed attributes and data fields (old -> new)
+- The changeset is written as JSON and can be rendered as a delta graph (added green, removed pink,
+  changed amber, unchanged neighbours blue) with the visualizer
+
+Usage:
+  python diff_cosmos_graph.py snapshots/cosmos_graph-2025-11-04.json cosmos_graph.json
+  python diff_cosmos_graph.py old.json new.json --out diff.json --render diff.png
+"""
+
+import sys
+import json
+import hashlib
+import argparse
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from visualize_cosmos_graph import CosmosGraphVisualizer, graph_from_data, write_json
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_OUT = 'cosmos_graph_diff.json'
+DELTA_TYPES = {'added': 0, 'context': 2, 'removed': 4, 'changed': 5}  # index into the visualizer palette
+
+_decoder = json.JSONDecoder()
+
+
+class _Stream:
+    """Incremental reader over a JSON text file: decodes one value at a time from a sliding buffer."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"Malformed graph file: expected {chars!r}, got {c!r}")
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_graph_records(path: str) -> Iterator[Tuple[str, Any]]:
+    """Yield ('node', record), ('edge', record) and ('metadata', value) from a graph file, streaming."""
+    kinds = {'nodes': 'node', 'edges': 'edge'}
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _Stream(f)
+        stream.expect('{')
+        if stream.peek() == '}':
+            return
+        while True:
+            key = stream.value()
+            stream.expect(':')
+            if key in kinds and stream.peek() == '[':
+                stream.expect('[')
+                if stream.peek() != ']':
+                    while True:
+                        yield kinds[key], stream.value()
+                        if stream.expect(',]') == ']':
+                            break
+                else:
+                    stream.expect(']')
+            else:
+                yield key, stream.value()
+            if stream.expect(',}') == '}':
+                return
+
+
+def record_key(kind: str, record: Dict[str, Any]) -> str:
+    if kind == 'node':
+        return str(record['id'])
+    return f"{record['source']}\x1f{record['target']}\x1f{record.get('relation', '')}"
+
+
+def record_digest(record: Dict[str, Any]) -> bytes:
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).digest()
+
+
+def changed_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """{attribute or data.<field>: [old, new]} for the values that differ (missing values are None)."""
+    def flat(record):
+        out = {k: v for k, v in record.items() if k != 'data'}
+        if isinstance(record.get('data'), dict):
+            out.update({f"data.{k}": v for k, v in record['data'].items()})
+        elif 'data' in record:
+            out['data'] = record['data']
+        return out
+
+    a, b = flat(old), flat(new)
+    return {k: [a.get(k), b.get(k)] for k in sorted(set(a) | set(b)) if a.get(k) != b.get(k)}
+
+
+def diff_graph_files(old_path: str, new_path: str) -> Dict[str, Any]:
+    """Changeset between two graph files: added/removed/changed nodes and added/removed/changed edges."""
+    # Pass 1: digests of the old snapshot
+    seen: Dict[str, Dict[str, bytes]] = {'node': {}, 'edge': {}}
+    old_meta: Dict[str, Any] = {}
+    for kind, record in iter_graph_records(old_path):
+        if kind in seen:
+            seen[kind][record_key(kind, record)] = record_digest(record)
+        elif kind == 'metadata':
+            old_meta = record
+
+    # Pass 2: compare the new snapshot; whatever is left in seen afterwards was removed
+    added: Dict[str, List[Dict[str, Any]]] = {'node': [], 'edge': []}
+    changed_new: Dict[str, Dict[str, Dict[str, Any]]] = {'node': {}, 'edge': {}}
+    new_meta: Dict[str, Any] = {}
+    counts = Counter()
+    for kind, record in iter_graph_records(new_path):
+        if kind == 'metadata':
+            new_meta = record
+            continue
+        if kind not in seen:
+            continue
+        counts[kind] += 1
+        key = record_key(kind, record)
+        digest = seen[kind].pop(key, None)
+        if digest is None:
+            added[kind].append(record)
+        elif digest != record_digest(record):
+            changed_new[kind][key] = record
+    removed_keys = {kind: set(keys) for kind, keys in seen.items()}
+    del seen
+
+    delta_ids: Set[str] = ({n['id'] for n in added['node']} | removed_keys['node'] | set(changed_new['node']))
+    context_ids = {end for e in added['edge'] + list(changed_new['edge'].values()) for end in (e['source'], e['target'])}
+    context_ids |= {end for key in removed_keys['edge'] for end in key.split('\x1f')[:2]}
+    context_ids -= delta_ids
+
+    # Pass 3: old records of the removed and changed keys, and the unchanged neighbours for context
+    removed: Dict[str, List[Dict[str, Any]]] = {'node': [], 'edge': []}
+    changed: Dict[str, List[Dict[str, Any]]] = {'node': [], 'edge': []}
+    context: List[Dict[str, Any]] = []
+    for kind, record in iter_graph_records(old_path):
+        if kind not in removed:
+            continue
+        key = record_key(kind, record)
+        if key in removed_keys[kind]:
+            removed[kind].append(record)
+        elif key in changed_new[kind]:
+            new_record = changed_new[kind][key]
+            entry = {'id': key} if kind == 'node' else {'source': record['source'], 'target': record['target'],
+                                                       'relation': record.get('relation')}
+            entry.update(type=new_record.get('type', record.get('type')), fields=changed_fields(record, new_record))
+            changed[kind].append(entry)
+        elif kind == 'node' and key in context_ids:
+            context.append({k: record[k] for k in ('id', 'label', 'type', 'node_class') if k in record})
+
+    return {
+        'metadata': {
+            'old': old_path, 'new': new_path,
+            'old_database': old_meta.get('database'), 'new_database': new_meta.get('database'),
+            'container': new_meta.get('container', old_meta.get('container')),
+            'new_nodes': counts['node'], 'new_edges': counts['edge'],
+        },
+        'nodes': {'added': added['node'], 'removed': removed['node'], 'changed': changed['node']},
+        'edges': {'added': added['edge'], 'removed': removed['edge'], 'changed': changed['edge']},
+        'context': context,
+    }
+
+
+def _group(node: Dict[str, Any]) -> str:
+    if node.get('node_class') == 'field':
+        return f"field:{node.get('field_name', '?')}"
+    return str(node.get('type', 'unknown'))
+
+
+def print_changeset(changeset: Dict[str, Any], limit: int = 10) -> None:
+    nodes, edges = changeset['nodes'], changeset['edges']
+    print("\n" + "="*70)
+    print(f"🔀 GRAPH DIFF  {changeset['metadata']['old']} -> {changeset['metadata']['new']}")
+    print("="*70)
+    for status, symbol in (('added', '+'), ('removed', '-'), ('changed', '~')):
+        print(f"\n{symbol} {len(nodes[status])} nodes {status}, {len(edges[status])} edges {status}")
+        for group, count in Counter(_group(n) for n in nodes[status]).most_common(limit):
+            print(f"    {count:>6}  {group}")
+    if nodes['changed']:
+        print("\n~ Changed fields:")
+        for field, count in Counter(f for n in nodes['changed'] for f in n['fields']).most_common(limit):
+            print(f"    {count:>6}  {field}")
+    print("="*70 + "\n")
+
+
+def delta_graph_data(changeset: Dict[str, Any]) -> Dict[str, Any]:
+    """Graph data for rendering: changed nodes typed by status, labelled by their original type."""
+    nodes = []
+    for status in ('added', 'removed', 'changed'):
+        for node in changeset['nodes'][status]:
+            nodes.append({'id': node['id'], 'label': node.get('field_name') or node.get('type') or node['id'],
+                          'type': status, 'node_class': 'document'})
+    for node in changeset['context']:
+        nodes.append({'id': node['id'], 'label': node.get('field_name') or node.get('label', node['id']),
+                      'type': 'context', 'node_class': 'document'})
+    ids = {n['id'] for n in nodes}
+    edges = [{'source': e['source'], 'target': e['target'], 'relation': e.get('relation'), 'delta': status}
+             for status in ('added', 'removed', 'changed') for e in changeset['edges'][status]
+             if e['source'] in ids and e['target'] in ids]
+    metadata = {'database': changeset['metadata']['new_database'], 'container': changeset['metadata']['container'],
+                'node_types': dict(DELTA_TYPES)}
+    return {'nodes': nodes, 'edges': edges, 'metadata': metadata}
+
+
+def render_changeset(changeset: Dict[str, Any], output_file: str, show: bool = False) -> None:
+    graph_data = delta_graph_data(changeset)
+    if not graph_data['nodes']:
+        print("⚠ Nothing changed, no delta graph to render")
+        return
+    visualizer = CosmosGraphVisualizer(connect=False)
+    visualizer.database_id = graph_data['metadata']['database'] or visualizer.database_id
+    visualizer.container_id = graph_data['metadata']['container'] or visualizer.container_id
+    visualizer.node_types = dict(DELTA_TYPES)
+    visualizer.graph = graph_from_data(graph_data)
+    visualizer.visualize_dynamic(output_file=output_file, show=show)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Diff two Cosmos graph files (exports or build artifacts).')
+    parser.add_argument('old', help='Earlier graph file')
+    parser.add_argument('new', help='Later graph file')
+    parser.add_argument('--out', default=DEFAULT_OUT, help=f'Changeset JSON (default: {DEFAULT_OUT})')
+    parser.add_argument('--render', metavar='PNG', help='Also render the delta graph to this image')
+    parser.add_argument('--show', action='store_true', help='Open the delta graph window (with --render)')
+    parser.add_argument('--top', type=int, default=10, help='Groups listed per section (default: 10)')
+    args = parser.parse_args(argv)
+
+    try:
+        changeset = diff_graph_files(args.old, args.new)
+        write_json(args.out, changeset)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        return 1
+    print_changeset(changeset, args.top)
+    print(f"✓ Changeset saved to {args.out}")
+    if args.render:
+        render_changeset(changeset, args.render, show=args.show)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
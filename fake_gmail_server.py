@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Fake Gmail API Server
+
+A local stand-in for the subset of the Gmail REST API used by gmail_cleanup_and_replies.py, so the
+cleanup and replies phases can be measured without a real mailbox or real quota.
+
+Supported endpoints (under /gmail/v1/users/me):
+- GET    profile
+- GET    messages                 (q, maxResults, pageToken; realistic 500-per-page pagination)
+- GET    messages/{id}            (format=minimal|metadata|full|raw, metadataHeaders, fields)
+- POST   messages/{id}/trash
+- DELETE messages/{id}
+- POST   messages/batchModify     (addLabelIds/removeLabelIds, max 1000 ids)
+- POST   messages/batchDelete     (max 1000 ids)
+- GET    threads/{id}             (format, metadataHeaders, fields)
+- GET    history                  (startHistoryId, pageToken)
+- POST   /batch                   (multipart/mixed HTTP batch, max 100 parts)
+
+Plus GET /__stats, which reports API calls and quota units consumed.
+
+Behaviour knobs:
+- --latency-ms / --jitter-ms     sleep per HTTP request
+- --quota-units-per-sec          per-user token bucket (Gmail's documented limit is 250); 0 disables it
+- --error-rate                   probability of a spurious 429 rateLimitExceeded per API call
+
+The mailbox is synthetic and deterministic for a given --messages/--seed: outreach threads started by
+me with 0-3 replies, unrelated inbox mail, and ~5% bounces carrying a real message/delivery-status part.
+
+Usage:
+  python fake_gmail_server.py --messages 10000 --port 8765 --latency-ms 20
+"""
+
+import re
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+
+MY_EMAIL = 'me@fake.example'
+
+# Quota units per method, from the Gmail API usage limits table
+QUOTA_COSTS = {
+    'getProfile': 1,
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.trash': 5,
+    'messages.delete': 10,
+    'messages.batchModify': 50,
+    'messages.batchDelete': 50,
+    'threads.get': 10,
+    'history.list': 2,
+}
+
+MAX_PAGE_SIZE = 500
+MAX_BATCH_PARTS = 100
+MAX_BULK_IDS = 1000
+
+BOUNCE_QUERY_TERMS = ('mail delivery subsystem', 'mailer-daemon', 'postmaster', 'delivery status notification',
+                      'undelivered mail', 'failure notice', 'delivery incomplete', 'message blocked')
+
+
+class ApiError(Exception):
+    """An error returned to the client as a Gmail-style JSON error body."""
+
+    def __init__(self, code: int, message: str, reason: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.reason = reason
+
+    def body(self) -> Dict:
+        return {'error': {'code': self.code, 'message': self.message,
+                          'errors': [{'domain': 'usageLimits' if self.code == 429 else 'global',
+                                      'reason': self.reason, 'message': self.message}]}}
+
+
+def parse_fields(spec: str) -> Dict:
+    """Parse a partial-response mask ('a,b/c,d(e,f)') into a nested dict; None means 'everything below'."""
+    tree: Dict = {}
+
+    def add(node: Dict, token: str, sub: Optional[Dict]) -> None:
+        parts = [p for p in token.strip().split('/') if p]
+        if not parts:
+            return
+        for p in parts[:-1]:
+            child = node.get(p, {})
+            if child is None:
+                return
+            node[p] = child
+            node = child
+        last = parts[-1]
+        if sub is None or node.get(last, {}) is None:
+            node[last] = None
+        else:
+            node.setdefault(last, {}).update(sub)
+
+    def parse(i: int, node: Dict) -> int:
+        token = ''
+        while i < len(spec):
+            c = spec[i]
+            if c == ',':
+                add(node, token, None)
+                token = ''
+            elif c == '(':
+                sub: Dict = {}
+                i = parse(i + 1, sub)
+                add(node, token, sub)
+                token = ''
+            elif c == ')':
+                add(node, token, None)
+                return i
+            else:
+                token += c
+            i += 1
+        add(node, token, None)
+        return i
+
+    parse(0, tree)
+    return tree
+
+
+def apply_fields(obj, tree: Optional[Dict]):
+    """Keep only the parts of obj selected by a parse_fields() tree."""
+    if tree is None:
+        return obj
+    if isinstance(obj, list):
+        return [apply_fields(x, tree) for x in obj]
+    if isinstance(obj, dict):
+        return {k: apply_fields(obj[k], sub) for k, sub in tree.items() if k in obj}
+    return obj
+
+
+class FakeMailbox:
+    """In-memory synthetic mailbox with Gmail-like messages, threads, labels and history."""
+
+    def __init__(self, total_messages: int, seed: int = 42, bounce_ratio: float = 0.05, days: int = 365):
+        self.lock = threading.Lock()
+        self.messages: Dict[str, Dict] = {}
+        self.order: List[str] = []           # newest first, like messages.list
+        self.threads: Dict[str, List[str]] = {}
+        self.history: List[Dict] = []
+        self.history_id = 1000
+        self._seed(total_messages, seed, bounce_ratio, days)
+
+    def _next_history(self) -> int:
+        self.history_id += 1
+        return self.history_id
+
+    def _add(self, thread_id: str, sender: str, to: str, subject: str, date_ms: int,
+             labels: List[str], snippet: str, bounce_for: Optional[str] = None) -> str:
+        mid = f'{len(self.messages) + 1:016x}'
+        msg = {
+            'id': mid,
+            'threadId': thread_id or mid,
+            'labelIds': labels,
+            'snippet': snippet,
+            'internalDate': str(date_ms),
+            'sizeEstimate': 2000 + len(snippet) * 4 + (3000 if bounce_for else 0),
+            'historyId': str(self._next_history()),
+            'headers': [
+                {'name': 'From', 'value': sender},
+                {'name': 'To', 'value': to},
+                {'name': 'Subject', 'value': subject},
+                {'name': 'Date', 'value': format_datetime(datetime.fromtimestamp(date_ms / 1000, tz=timezone.utc))},
+                {'name': 'Message-Id', 'value': f'<{mid}@fake.example>'},
+            ],
+            'bounce_for': bounce_for,
+        }
+        self.messages[mid] = msg
+        self.order.append(mid)
+        self.threads.setdefault(msg['threadId'], []).append(mid)
+        self.history.append({'id': msg['historyId'], 'messagesAdded': [{'message': {'id': mid, 'threadId': msg['threadId']}}]})
+        return mid
+
+    def _seed(self, total: int, seed: int, bounce_ratio: float, days: int) -> None:
+        rnd = random.Random(seed)
+        now_ms = int(time.time() * 1000)
+        span_ms = days * 86400 * 1000
+        contacts = [f'contact{i}@prospect{i % 97}.example' for i in range(max(10, total // 4))]
+        pending: List[Tuple[int, Dict]] = []
+
+        count = 0
+        while count < total:
+            date_ms = now_ms - rnd.randint(0, span_ms)
+            roll = rnd.random()
+            contact = rnd.choice(contacts)
+            if roll < bounce_ratio:
+                pending.append((date_ms, dict(thread_id='', sender='Mail Delivery Subsystem <mailer-daemon@googlemail.com>',
+                                              to=MY_EMAIL, subject='Delivery Status Notification (Failure)',
+                                              labels=['INBOX', 'UNREAD'], snippet="Address not found Your message wasn't delivered",
+                                              bounce_for=contact)))
+                count += 1
+            elif roll < bounce_ratio + 0.2:
+                pending.append((date_ms, dict(thread_id='', sender=f'News <news@vendor{rnd.randint(1, 40)}.example>',
+                                              to=MY_EMAIL, subject=f'Weekly digest #{rnd.randint(1, 500)}',
+                                              labels=['INBOX', 'CATEGORY_PROMOTIONS'], snippet='This week in payments ' * 3)))
+                count += 1
+            else:
+                # Outreach thread: my message first, then 0-3 replies
+                thread_key = f'thread-{count}'
+                subject = f'PortalPay for {contact.split("@")[1]}'
+                pending.append((date_ms, dict(thread_id=thread_key, sender=f'Me <{MY_EMAIL}>', to=contact, subject=subject,
+                                              labels=['SENT'], snippet='Hi there, following up on crypto payments ' * 2)))
+                count += 1
+                for r in range(rnd.choice((0, 0, 1, 1, 2, 3))):
+                    if count >= total:
+                        break
+                    reply_ms = min(now_ms, date_ms + rnd.randint(60, 14 * 86400) * 1000)
+                    pending.append((reply_ms, dict(thread_id=thread_key, sender=f'Prospect <{contact}>', to=MY_EMAIL,
+                                                   subject=f'Re: {subject}', labels=['INBOX'],
+                                                   snippet='Thanks for reaching out, interested ' * (1 + r))))
+                    count += 1
+
+        # Insert chronologically so ids and history ids increase with time; a thread's id is its first message id
+        thread_ids: Dict[str, str] = {}
+        for date_ms, spec in sorted(pending, key=lambda p: p[0]):
+            key = spec.pop('thread_id')
+            mid = self._add(thread_ids.get(key, ''), date_ms=date_ms, **spec)
+            if key:
+                thread_ids.setdefault(key, self.messages[mid]['threadId'])
+        self.order.reverse()
+
+    # ---- rendering -------------------------------------------------------------------------------
+
+    def raw_bytes(self, msg: Dict) -> bytes:
+        lines = [f"{h['name']}: {h['value']}" for h in msg['headers']]
+        lines.append('MIME-Version: 1.0')
+        if msg['bounce_for']:
+            lines += [
+                'Content-Type: multipart/report; boundary="dsn"; report-type=delivery-status',
+                '',
+                '--dsn',
+                'Content-Type: text/plain',
+                '',
+                f"Address not found: {msg['bounce_for']}",
+                '--dsn',
+                'Content-Type: message/delivery-status',
+                '',
+                'Reporting-MTA: dns; googlemail.com',
+                '',
+                f"Final-Recipient: rfc822; {msg['bounce_for']}",
+                'Action: failed',
+                'Status: 5.1.1',
+                'Diagnostic-Code: smtp; 550-5.1.1 The email account that you tried to reach does not exist.',
+                '',
+                '--dsn--',
+            ]
+        else:
+            lines += ['Content-Type: text/plain; charset=utf-8', '', msg['snippet'] * 4]
+        return '\r\n'.join(lines).encode('utf-8')
+
+    def render(self, msg: Dict, fmt: str, metadata_headers: List[str]) -> Dict:
+        base = {k: msg[k] for k in ('id', 'threadId', 'labelIds', 'snippet', 'sizeEstimate', 'historyId', 'internalDate')}
+        if fmt == 'minimal':
+            return base
+        if fmt == 'raw':
+            base['raw'] = base64.urlsafe_b64encode(self.raw_bytes(msg)).decode('ascii')
+            return base
+        headers = msg['headers']
+        if fmt == 'metadata' and metadata_headers:
+            wanted = {h.lower() for h in metadata_headers}
+            headers = [h for h in headers if h['name'].lower() in wanted]
+        base['payload'] = {'partId': '', 'mimeType': 'multipart/report' if msg['bounce_for'] else 'text/plain',
+                           'filename': '', 'headers': headers, 'body': {'size': msg['sizeEstimate']}}
+        if fmt == 'full':
+            data = base64.urlsafe_b64encode(self.raw_bytes(msg)).decode('ascii')
+            base['payload']['body'] = {'size': msg['sizeEstimate'], 'data': data}
+        return base
+
+    # ---- queries / mutations -----------------------------------------------------------------------
+
+    def matches(self, msg: Dict, q: str) -> bool:
+        q = (q or '').lower()
+        labels = msg['labelIds']
+        if 'TRASH' in labels and 'in:anywhere' not in q and 'in:trash' not in q:
+            return False
+        if 'from:me' in q and 'SENT' not in labels:
+            return False
+        if any(term in q for term in BOUNCE_QUERY_TERMS) and not msg['bounce_for']:
+            return False
+        m = re.search(r'newer_than:(\d+)d', q)
+        if m and int(msg['internalDate']) < (time.time() - int(m.group(1)) * 86400) * 1000:
+            return False
+        m = re.search(r'after:(\d{4})/(\d{2})/(\d{2})', q)
+        if m:
+            after = datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)), tzinfo=timezone.utc)
+            if int(msg['internalDate']) < after.timestamp() * 1000:
+                return False
+        return True
+
+    def trash(self, mid: str) -> Dict:
+        msg = self.messages[mid]
+        if 'TRASH' not in msg['labelIds']:
+            msg['labelIds'] = [l for l in msg['labelIds'] if l != 'INBOX'] + ['TRASH']
+            msg['historyId'] = str(self._next_history())
+            self.history.append({'id': msg['historyId'], 'labelsAdded': [{'message': {'id': mid}, 'labelIds': ['TRASH']}]})
+        return msg
+
+    def delete(self, mid: str) -> None:
+        msg = self.messages.pop(mid)
+        self.threads[msg['threadId']].remove(mid)
+        self.order.remove(mid)
+        self.history.append({'id': str(self._next_history()), 'messagesDeleted': [{'message': {'id': mid}}]})
+
+
+class FakeGmailApi:
+    """Dispatches Gmail REST calls against a FakeMailbox, charging quota per call."""
+
+    def __init__(self, mailbox: FakeMailbox, quota_units_per_sec: float = 0, error_rate: float = 0.0, seed: int = 0):
+        self.mailbox = mailbox
+        self.quota_rate = quota_units_per_sec
+        self.error_rate = error_rate
+        self.rnd = random.Random(seed)
+        self.bucket = quota_units_per_sec
+        self.bucket_ts = time.monotonic()
+        self.stats_lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.quota_units = 0
+        self.http_requests = 0
+        self.rate_limited = 0
+
+    def charge(self, method: str) -> None:
+        cost = QUOTA_COSTS.get(method, 5)
+        with self.stats_lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            if self.error_rate and self.rnd.random() < self.error_rate:
+                self.rate_limited += 1
+                raise ApiError(429, 'User-rate limit exceeded', 'rateLimitExceeded')
+            if self.quota_rate:
+                now = time.monotonic()
+                self.bucket = min(self.quota_rate, self.bucket + (now - self.bucket_ts) * self.quota_rate)
+                self.bucket_ts = now
+                if self.bucket < cost:
+                    self.rate_limited += 1
+                    raise ApiError(429, 'User-rate limit exceeded. Retry after a short delay', 'rateLimitExceeded')
+                self.bucket -= cost
+            self.quota_units += cost
+
+    def stats(self) -> Dict:
+        with self.stats_lock:
+            return {'calls': dict(self.calls), 'api_calls': sum(self.calls.values()), 'quota_units': self.quota_units,
+                    'http_requests': self.http_requests, 'rate_limited': self.rate_limited}
+
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        """Handle one (non-batch) API call. Returns (status, json body)."""
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        m = re.fullmatch(r'/gmail/v1/users/[^/]+/(\w+)(?:/([^/]+))?(?:/(\w+))?', parts.path)
+        if not m:
+            return 404, ApiError(404, 'Not Found', 'notFound').body()
+        resource, ident, action = m.groups()
+        try:
+            result = self._dispatch(method, resource, ident, action, query, body)
+        except ApiError as e:
+            return e.code, e.body()
+        except KeyError:
+            return 404, ApiError(404, 'Requested entity was not found.', 'notFound').body()
+        fields = (query.get('fields') or [None])[0]
+        if fields and isinstance(result, dict):
+            result = apply_fields(result, parse_fields(fields))
+        return (204 if result is None else 200), (result or {})
+
+    def _dispatch(self, method, resource, ident, action, query, body):
+        mb = self.mailbox
+        q = lambda name, default=None: (query.get(name) or [default])[0]
+        if resource == 'profile':
+            self.charge('getProfile')
+            return {'emailAddress': MY_EMAIL, 'messagesTotal': len(mb.messages), 'historyId': str(mb.history_id)}
+
+        if resource == 'messages' and ident is None and method == 'GET':
+            self.charge('messages.list')
+            size = min(int(q('maxResults', 100)), MAX_PAGE_SIZE)
+            offset = int(q('pageToken', 0) or 0)
+            with mb.lock:
+                matched = [mid for mid in mb.order if mb.matches(mb.messages[mid], q('q', ''))]
+            page = matched[offset:offset + size]
+            resp = {'messages': [{'id': mid, 'threadId': mb.messages[mid]['threadId']} for mid in page],
+                    'resultSizeEstimate': len(matched)}
+            if offset + size < len(matched):
+                resp['nextPageToken'] = str(offset + size)
+            if not page:
+                resp.pop('messages')
+            return resp
+
+        if resource == 'messages' and ident in ('batchModify', 'batchDelete') and method == 'POST':
+            self.charge(f'messages.{ident}')
+            ids = json.loads(body or b'{}').get('ids', [])
+            if len(ids) > MAX_BULK_IDS:
+                raise ApiError(400, f'Too many ids: {len(ids)} > {MAX_BULK_IDS}', 'invalidArgument')
+            payload = json.loads(body or b'{}')
+            with mb.lock:
+                for mid in ids:
+                    if mid not in mb.messages:
+                        continue
+                    if ident == 'batchDelete':
+                        mb.delete(mid)
+                        continue
+                    if 'TRASH' in payload.get('addLabelIds', []):
+                        mb.trash(mid)
+                    msg = mb.messages[mid]
+                    msg['labelIds'] = [l for l in msg['labelIds'] if l not in payload.get('removeLabelIds', [])]
+                    for label in payload.get('addLabelIds', []):
+                        if label not in msg['labelIds']:
+                            msg['labelIds'].append(label)
+            return None
+
+        if resource == 'messages' and ident and action == 'trash' and method == 'POST':
+            self.charge('messages.trash')
+            with mb.lock:
+                msg = mb.trash(ident)
+                return mb.render(msg, 'minimal', [])
+
+        if resource == 'messages' and ident and method == 'DELETE':
+            self.charge('messages.delete')
+            with mb.lock:
+                mb.delete(ident)
+            return None
+
+        if resource == 'messages' and ident and method == 'GET':
+            self.charge('messages.get')
+            with mb.lock:
+                return mb.render(mb.messages[ident], q('format', 'full'), query.get('metadataHeaders', []))
+
+        if resource == 'threads' and ident and method == 'GET':
+            self.charge('threads.get')
+            with mb.lock:
+                mids = mb.threads[ident]
+                if not mids:
+                    raise KeyError(ident)
+                return {'id': ident, 'historyId': str(mb.history_id),
+                        'messages': [mb.render(mb.messages[mid], q('format', 'full'), query.get('metadataHeaders', []))
+                                     for mid in mids]}
+
+        if resource == 'history' and method == 'GET':
+            self.charge('history.list')
+            start = int(q('startHistoryId', 0))
+            size = min(int(q('maxResults', 100)), MAX_PAGE_SIZE)
+            offset = int(q('pageToken', 0) or 0)
+            with mb.lock:
+                records = [h for h in mb.history if int(h['id']) > start]
+                resp = {'history': records[offset:offset + size], 'historyId': str(mb.history_id)}
+            if offset + size < len(records):
+                resp['nextPageToken'] = str(offset + size)
+            return resp
+
+        raise ApiError(404, 'Not Found', 'notFound')
+
+    def handle_batch(self, content_type: str, body: bytes) -> Tuple[int, str, bytes]:
+        """Handle a multipart/mixed batch. Returns (status, content type, body)."""
+        m = re.search(r'boundary="?([^";]+)"?', content_type or '')
+        if not m:
+            return 400, 'application/json', json.dumps(ApiError(400, 'Missing boundary', 'badRequest').body()).encode()
+        boundary = m.group(1)
+        # googleapiclient separates batch parts with bare LF, other clients use CRLF
+        text = body.decode('utf-8', 'replace').replace('\r\n', '\n')
+        raw_parts = [p for p in text.split(f'--{boundary}') if p.strip() and p.strip() != '--']
+        if len(raw_parts) > MAX_BATCH_PARTS:
+            return 400, 'application/json', json.dumps(
+                ApiError(400, f'Too many requests in batch: {len(raw_parts)}', 'badRequest').body()).encode()
+
+        out_boundary = 'batch_fake_gmail'
+        chunks = []
+        for part in raw_parts:
+            outer, _, inner = part.lstrip('\n').partition('\n\n')
+            cid = re.search(r'Content-ID:\s*<([^>]*)>', outer, re.IGNORECASE)
+            request_line, _, rest = inner.partition('\n')
+            _, _, inner_body = rest.partition('\n\n')
+            method, target, _ = (request_line.split(' ') + ['', ''])[:3]
+            status, payload = self.handle(method, target, inner_body.strip().encode('utf-8'))
+            payload_text = json.dumps(payload) if status != 204 else ''
+            chunks.append(
+                f'--{out_boundary}\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{cid.group(1) if cid else ""}>\r\n\r\n'
+                f'HTTP/1.1 {status} {"OK" if status < 300 else "Error"}\r\n'
+                f'Content-Type: application/json; charset=UTF-8\r\n\r\n{payload_text}\r\n'
+            )
+        chunks.append(f'--{out_boundary}--\r\n')
+        return 200, f'multipart/mixed; boundary={out_boundary}', ''.join(chunks).encode('utf-8')
+
+
+def make_handler(api: FakeGmailApi, latency_ms: float, jitter_ms: float):
+    rnd = random.Random(1)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Small keep-alive responses otherwise stall ~40ms on Nagle + delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, content_type: str, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _serve(self, method: str) -> None:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            if latency_ms or jitter_ms:
+                time.sleep((latency_ms + rnd.random() * jitter_ms) / 1000)
+            path = urlsplit(self.path).path
+            if path == '/__stats':
+                self._send(200, 'application/json', json.dumps(api.stats()).encode())
+                return
+            with api.stats_lock:
+                api.http_requests += 1
+            if path.startswith('/batch'):
+                self._send(*api.handle_batch(self.headers.get('Content-Type', ''), body))
+                return
+            status, payload = api.handle(method, self.path, body)
+            self._send(status, 'application/json; charset=UTF-8', b'' if status == 204 else json.dumps(payload).encode())
+
+        def do_GET(self):
+            self._serve('GET')
+
+        def do_POST(self):
+            self._serve('POST')
+
+        def do_DELETE(self):
+            self._serve('DELETE')
+
+    return Handler
+
+
+def make_server(
+    messages: int,
+    host: str = '127.0.0.1',
+    port: int = 0,
+    seed: int = 42,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    quota_units_per_sec: float = 0,
+    error_rate: float = 0.0
+) -> ThreadingHTTPServer:
+    """Seed a mailbox and return an (unstarted) HTTP server for it; port 0 picks a free port."""
+    api = FakeGmailApi(FakeMailbox(messages, seed=seed), quota_units_per_sec=quota_units_per_sec,
+                       error_rate=error_rate, seed=seed)
+    server = ThreadingHTTPServer((host, port), make_handler(api, latency_ms, jitter_ms))
+    server.daemon_threads = True
+    server.api = api
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake Gmail API server with a synthetic mailbox.')
+    parser.add_argument('--messages', type=int, default=1000, help='Number of synthetic messages to seed')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the mailbox')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Fixed latency added to every HTTP request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra latency (0..N ms) per request')
+    parser.add_argument('--quota-units-per-sec', type=float, default=0,
+                        help='Per-user quota token bucket (Gmail: 250); 0 disables quota errors')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a spurious 429 per API call')
+    args = parser.parse_args()
+
+    print(f"Seeding {args.messages} messages...")
+    server = make_server(args.messages, args.host, args.port, args.seed, args.latency_ms, args.jitter_ms,
+                         args.quota_units_per_sec, args.error_rate)
+    host, port = server.server_address[:2]
+    print(f"✓ Fake Gmail API listening on http://{host}:{port} as {MY_EMAIL} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
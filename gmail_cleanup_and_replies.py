@@ -3,9 +3,14 @@
 Gmail Cleanup and Replies CSV Builder
 
 Features:
-- Cleans up failed delivery emails (bounces) by moving them to Trash (or hard deleting with a flag)
+- Cleans up failed delivery emails (bounces) by moving them to Trash (or hard deleting with a flag),
+  using batched metadata reads and batchModify/batchDelete in chunks of 1000 ids
+- Parses bounce DSNs (Final-Recipient/Status/Diagnostic-Code) into a hashed suppression index
+  (bounce_suppression.csv) that senders can check before mailing an address
 - Scans your sent-email threads and extracts replies you've received
 - Outputs a CSV report of replies
+- Requests only the fields it reads (fields= masks, format=minimal where possible) with gzip, and
+  reports response bytes per API call type
 
 Authentication:
 - Uses the same gmail_credentials.json and gmail_token.pickle as vcrun.py
@@ -35,24 +40,47 @@ Usage examples:
 
   # Choose output CSV path
   python scripts/gmail_cleanup_and_replies.py --out "./gmail_replies.csv"
+
+  # Keep one canonical replies dataset: append only new replies, write a delta CSV of them
+  python scripts/gmail_cleanup_and_replies.py --only-replies --dataset "./gmail_replies"
+  python scripts/gmail_cleanup_and_replies.py --dataset "./gmail_replies" --import-csv gmail_replies_*.csv --compact
+
+  # Several mailboxes in parallel (per-account folders, combined replies CSV and bounce summary)
+  python scripts/gmail_cleanup_and_replies.py --accounts accounts.json --out-dir ./gmail_accounts
+
+  # Continue a replies run that crashed or ran out of quota (progress is checkpointed in <out>.work/)
+  python scripts/gmail_cleanup_and_replies.py --only-replies --out "./gmail_replies.csv" --resume
 """
 
 import os
 import sys
 import csv
 import re
+import json
 import time
+import heapq
+import shutil
+import base64
+import hashlib
 import argparse
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Tuple, Set
 from pathlib import Path
-from email.utils import parseaddr
+from contextlib import ExitStack, redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from email import message_from_bytes
+from email.utils import parseaddr, getaddresses
 
 import pickle
+import random
+import urllib.parse
+
+import httplib2
 
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
@@ -60,16 +88,157 @@ from googleapiclient.errors import HttpError
 # Defaults align with vcrun.py, but can be overridden via CLI
 GMAIL_TOKEN_FILE = 'gmail_token.pickle'
 GMAIL_CREDENTIALS_FILE = 'gmail_credentials.json'
+# Hashed hard-bounce index that senders consult before mailing an address
+SUPPRESSION_FILE = 'bounce_suppression.csv'
 
 # We need modify (implies read access, label changes, trash). This will trigger a one-time auth if your
 # current token only has gmail.send
 GMAIL_SCOPES = ['https://www.googleapis.com/auth/gmail.modify']
 
 
-def get_gmail_service(token_file: str, credentials_file: str, scopes: List[str]):
+# Partial-response masks: only request the parts of each payload the script actually reads
+METADATA_HEADERS = ['From', 'To', 'Subject', 'Date', 'In-Reply-To', 'References', 'Message-Id', 'Reply-To']
+BOUNCE_HEADERS = ['From', 'Subject']
+REPLY_HEADERS = ['From', 'To', 'Subject']
+LIST_FIELDS = 'messages(id,threadId),nextPageToken'
+MESSAGE_FIELDS = 'id,threadId,internalDate,snippet,payload/headers'
+THREAD_FIELDS = 'id,messages(id,internalDate,snippet,payload/headers)'
+
+_GMAIL_PATH_RE = re.compile(r'(GET|POST|PUT|PATCH|DELETE) /gmail/v1/users/[^/]+/(\w+)(?:/([^/?\s]+))?(?:/(\w+))?')
+
+
+def gmail_call_type(method: str, path: str) -> str:
+    """Name a Gmail REST call from its method and path, e.g. 'messages.get' or 'messages.batchModify'."""
+    m = _GMAIL_PATH_RE.search(f'{method} {path}')
+    if not m:
+        return 'other'
+    method, resource, ident, action = m.groups()
+    if resource == 'profile':
+        return 'getProfile'
+    if action:
+        return f'{resource}.{action}'
+    if ident in ('batchModify', 'batchDelete'):
+        return f'{resource}.{ident}'
+    if ident:
+        return f'{resource}.get' if method == 'GET' else f'{resource}.{method.lower()}'
+    return f'{resource}.list' if method == 'GET' else f'{resource}.insert'
+
+
+# Per-user quota units per call (Gmail API usage limits); the per-user limit is 250 units/second
+QUOTA_UNITS = {
+    'getProfile': 1,
+    'messages.list': 5,
+    'messages.get': 5,
+    'messages.trash': 5,
+    'messages.delete': 10,
+    'messages.batchModify': 50,
+    'messages.batchDelete': 50,
+    'threads.get': 10,
+    'history.list': 2,
+}
+DEFAULT_QUOTA_UNITS_PER_SEC = 250
+
+
+class QuotaThrottle:
+    """
+    Client-side token bucket in Gmail quota units, so a mailbox is scheduled under its per-user limit
+    instead of running into 429s. Requests costing more than one second of quota (large batches) are
+    let through when the bucket is full and paid back before the next one.
+    """
+
+    def __init__(self, units_per_sec: float):
+        self.rate = float(units_per_sec)
+        self.bucket = self.rate
+        self.updated = time.monotonic()
+        self.waited = 0.0
+
+    def acquire(self, units: int) -> None:
+        while True:
+            now = time.monotonic()
+            self.bucket = min(self.rate, self.bucket + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.bucket >= min(units, self.rate):
+                self.bucket -= units
+                return
+            delay = (min(units, self.rate) - self.bucket) / self.rate
+            self.waited += delay
+            time.sleep(delay)
+
+
+def backoff(attempt: int) -> None:
+    """Sleep before retry number attempt + 1 (exponential, capped at 32s, with jitter)."""
+    time.sleep(min(32, 2 ** attempt) + random.random())
+
+
+class MeteredHttp:
+    """
+    Wraps the authorized httplib2 transport to ask for gzip explicitly and count response bytes
+    (after decompression, i.e. what gets JSON-parsed) per Gmail call type.
+
+    Batch requests are recorded as 'batch:<inner call type>', with the number of inner calls.
+    With a QuotaThrottle, each request first waits for its quota units and 429 responses are retried
+    with exponential backoff (up to max_retries times).
+    """
+
+    def __init__(self, http, throttle: Optional[QuotaThrottle] = None, max_retries: int = 5):
+        self._http = http
+        self.throttle = throttle
+        self.max_retries = max_retries
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        headers = dict(headers or {})
+        headers['accept-encoding'] = 'gzip'
+        # Google only serves gzip to user agents that mention it
+        user_agent = headers.get('user-agent', '')
+        if 'gzip' not in user_agent:
+            headers['user-agent'] = f'{user_agent} (gzip)'.strip()
+
+        inner = 1
+        path = urllib.parse.urlsplit(uri).path
+        if path.startswith('/batch'):
+            text = body.decode('utf-8', 'replace') if isinstance(body, bytes) else (body or '')
+            first = _GMAIL_PATH_RE.search(text)
+            inner_type = gmail_call_type(first.group(1), first.group(0).split(' ', 1)[1]) if first else 'other'
+            call_type = 'batch:' + inner_type
+            inner = text.count('Content-Type: application/http') or 1
+        else:
+            inner_type = call_type = gmail_call_type(method, path)
+
+        attempt = 0
+        while True:
+            if self.throttle:
+                self.throttle.acquire(QUOTA_UNITS.get(inner_type, 5) * inner)
+            resp, content = self._http.request(uri, method=method, body=body, headers=headers, **kwargs)
+            if not self.throttle or resp.status != 429 or attempt >= self.max_retries:
+                break
+            backoff(attempt)
+            attempt += 1
+
+        entry = self.stats.setdefault(call_type, {'calls': 0, 'inner_calls': 0, 'bytes': 0, 'gzip': 0})
+        entry['calls'] += 1
+        entry['inner_calls'] += inner
+        entry['bytes'] += len(content or b'')
+        if resp.get('-content-encoding') == 'gzip':
+            entry['gzip'] += 1
+        return resp, content
+
+
+def get_gmail_service(
+    token_file: str,
+    credentials_file: str,
+    scopes: List[str],
+    quota_units_per_sec: float = 0,
+    allow_reauth: bool = True
+):
     """Authenticate and return Gmail API service with required scopes.
 
-    If an existing token is present but missing required scopes, re-run OAuth flow.
+    If an existing token is present but missing required scopes, re-run OAuth flow (or raise if
+    allow_reauth is False, e.g. in a background worker that cannot open a browser).
+    The service's transport is a MeteredHttp, throttled to quota_units_per_sec if > 0; see api_traffic(service).
     """
     creds = None
 
@@ -95,38 +264,63 @@ def get_gmail_service(token_file: str, credentials_file: str, scopes: List[str])
             needs_reauth = True
 
     if needs_reauth:
+        if not allow_reauth:
+            raise RuntimeError(f"Token {token_file} is missing, expired or lacks scopes {scopes}; "
+                               f"authorize it once with --token {token_file}")
         flow = InstalledAppFlow.from_client_secrets_file(credentials_file, scopes)
         creds = flow.run_local_server(port=0)
         with open(token_file, 'wb') as token:
             pickle.dump(creds, token)
 
-    return build('gmail', 'v1', credentials=creds)
+    throttle = QuotaThrottle(quota_units_per_sec) if quota_units_per_sec and quota_units_per_sec > 0 else None
+    http = MeteredHttp(AuthorizedHttp(creds, http=httplib2.Http()), throttle=throttle)
+    return build('gmail', 'v1', http=http)
+
+
+def api_traffic(service) -> Dict[str, Dict[str, int]]:
+    """Per call type request/byte counters collected by the service's MeteredHttp (empty if unmetered)."""
+    return getattr(getattr(service, '_http', None), 'stats', {})
+
+
+def print_api_traffic(service) -> None:
+    stats = api_traffic(service)
+    if not stats:
+        return
+    print("API traffic (response bytes after gzip decoding):")
+    for call_type, entry in sorted(stats.items()):
+        print(f"  {call_type:<28} http_calls={entry['calls']:<6} api_calls={entry['inner_calls']:<7} "
+              f"bytes={entry['bytes']:<11} gzip={entry['gzip']}")
 
 
 def get_profile_email(service) -> str:
     """Return the authenticated user's primary email address."""
-    profile = service.users().getProfile(userId='me').execute()
+    profile = service.users().getProfile(userId='me', fields='emailAddress').execute()
     return profile.get('emailAddress', '')
 
 
-def list_messages(service, query: str, label_ids: Optional[List[str]] = None, max_pages: int = 1000) -> List[str]:
-    """List message IDs matching a Gmail query, with pagination."""
-    msgs = []
+def iter_message_pages(service, query: str, label_ids: Optional[List[str]] = None, max_pages: int = 1000):
+    """Yield pages of message refs ({'id', 'threadId'}) matching a Gmail query."""
     page_token = None
     pages = 0
     while True:
-        kwargs = {'userId': 'me', 'q': query, 'maxResults': 500}
+        kwargs = {'userId': 'me', 'q': query, 'maxResults': 500, 'fields': LIST_FIELDS}
         if page_token:
             kwargs['pageToken'] = page_token
         if label_ids:
             kwargs['labelIds'] = label_ids
         resp = service.users().messages().list(**kwargs).execute()
-        ids = [m['id'] for m in resp.get('messages', [])]
-        msgs.extend(ids)
+        yield resp.get('messages', [])
         page_token = resp.get('nextPageToken')
         pages += 1
         if not page_token or pages >= max_pages:
             break
+
+
+def list_messages(service, query: str, label_ids: Optional[List[str]] = None, max_pages: int = 1000) -> List[str]:
+    """List message IDs matching a Gmail query, with pagination."""
+    msgs = []
+    for page in iter_message_pages(service, query, label_ids=label_ids, max_pages=max_pages):
+        msgs.extend(m['id'] for m in page)
     return msgs
 
 
@@ -136,17 +330,94 @@ def get_message_metadata(service, message_id: str) -> Dict:
         userId='me',
         id=message_id,
         format='metadata',
-        metadataHeaders=['From', 'To', 'Subject', 'Date', 'In-Reply-To', 'References', 'Message-Id', 'Reply-To']
+        metadataHeaders=METADATA_HEADERS,
+        fields=MESSAGE_FIELDS
     ).execute()
 
 
-def get_thread(service, thread_id: str) -> Dict:
-    """Get an entire thread with metadata for each message."""
+# Gmail accepts up to 100 calls per HTTP batch, but recommends <= 50 to avoid per-user rate limiting
+BATCH_GET_SIZE = 50
+# messages.batchModify / messages.batchDelete accept at most 1000 ids per call
+BATCH_MODIFY_SIZE = 1000
+# Re-batches of sub-requests that a 200 batch response rate-limited individually
+BATCH_RETRIES = 5
+
+
+def chunked(items: List[str], size: int):
+    """Yield successive slices of at most `size` items."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def batch_get_messages(service, message_ids: List[str], chunk_size: int = BATCH_GET_SIZE, **get_kwargs) -> Dict[str, Dict]:
+    """Fetch many messages with messages.get(**get_kwargs) using HTTP batch requests.
+
+    Returns a dict of message id -> response. Messages that fail are omitted with a warning.
+    Gmail rate-limits inside a successful batch response (per sub-request 429 / 403 rateLimitExceeded),
+    so those ids are re-batched with backoff, up to BATCH_RETRIES times, before they are given up on.
+    """
+    results: Dict[str, Dict] = {}
+    rate_limited: List[str] = []
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            if isinstance(exception, HttpError) and is_rate_limited(exception):
+                rate_limited.append(request_id)
+                return
+            print(f"  Warning: failed reading {request_id}: {exception}")
+            return
+        results[request_id] = response
+
+    # Batch request ids must be unique
+    pending = list(dict.fromkeys(message_ids))
+    for attempt in range(BATCH_RETRIES + 1):
+        if attempt:
+            backoff(attempt - 1)
+        for chunk in chunked(pending, chunk_size):
+            batch = service.new_batch_http_request(callback=on_response)
+            for mid in chunk:
+                batch.add(service.users().messages().get(userId='me', id=mid, **get_kwargs), request_id=mid)
+            try:
+                batch.execute()
+            except HttpError as he:
+                print(f"  Warning: batch request failed ({len(chunk)} messages): {he}")
+        if not rate_limited:
+            break
+        pending, rate_limited = rate_limited, []
+    else:
+        print(f"  Warning: {len(pending)} messages still rate limited after {BATCH_RETRIES} retries")
+    return results
+
+
+def batch_get_message_metadata(
+    service,
+    message_ids: List[str],
+    chunk_size: int = BATCH_GET_SIZE,
+    metadata_headers: Optional[List[str]] = None
+) -> Dict[str, Dict]:
+    """Fetch metadata (headers, internalDate, snippet) for many messages using HTTP batch requests."""
+    return batch_get_messages(
+        service, message_ids, chunk_size,
+        format='metadata',
+        metadataHeaders=metadata_headers or METADATA_HEADERS,
+        fields=MESSAGE_FIELDS,
+    )
+
+
+def batch_get_thread_ids(service, message_ids: List[str], chunk_size: int = BATCH_GET_SIZE) -> Dict[str, str]:
+    """Resolve message ids to thread ids with format=minimal and an id/threadId field mask."""
+    responses = batch_get_messages(service, message_ids, chunk_size, format='minimal', fields='id,threadId')
+    return {mid: resp.get('threadId', '') for mid, resp in responses.items()}
+
+
+def get_thread(service, thread_id: str, metadata_headers: Optional[List[str]] = None) -> Dict:
+    """Get an entire thread with metadata (headers, internalDate, snippet) for each message."""
     return service.users().threads().get(
         userId='me',
         id=thread_id,
         format='metadata',
-        metadataHeaders=['From', 'To', 'Subject', 'Date', 'In-Reply-To', 'References', 'Message-Id', 'Reply-To']
+        metadataHeaders=metadata_headers or REPLY_HEADERS,
+        fields=THREAD_FIELDS
     ).execute()
 
 
@@ -182,35 +453,224 @@ BOUNCE_SUBJECT_PATTERNS = [
     r'failure notice',
 ]
 
+# All from/subject patterns compiled into a single alternation, matched in one pass over a
+# "from:<from>\nsubject:<subject>" haystack so each pattern only applies to its own header
+BOUNCE_RE = re.compile(
+    r'^from:.*?(?:' + '|'.join(BOUNCE_FROM_PATTERNS) + r')'
+    r'|^subject:.*?(?:' + '|'.join(BOUNCE_SUBJECT_PATTERNS) + r')',
+    re.MULTILINE,
+)
+
+
 def is_bounce_message(msg_metadata: Dict) -> bool:
     """Heuristic to detect failed delivery notifications."""
     payload = (msg_metadata or {}).get('payload', {})
     hmap = header_map(payload)
-    from_val = (hmap.get('from') or '').lower()
-    subj_val = (hmap.get('subject') or '').lower()
+    from_val = (hmap.get('from') or '').lower().replace('\n', ' ')
+    subj_val = (hmap.get('subject') or '').lower().replace('\n', ' ')
+    return BOUNCE_RE.search(f'from:{from_val}\nsubject:{subj_val}') is not None
 
-    if any(pat in from_val for pat in BOUNCE_FROM_PATTERNS):
-        return True
-    if any(pat in subj_val for pat in BOUNCE_SUBJECT_PATTERNS):
-        return True
-    # Sometimes bounces are in "Mail Delivery Subsystem" with different subjects
-    if 'mail delivery subsystem' in from_val:
+
+def _dsn_address(value: str) -> str:
+    """Strip the address-type prefix from a DSN recipient field ('rfc822; a@b.com' -> 'a@b.com')."""
+    if ';' in value:
+        value = value.split(';', 1)[1]
+    return parseaddr(value.strip())[1].strip().lower()
+
+
+def parse_dsn_failures(raw_message: bytes) -> List[Dict[str, str]]:
+    """
+    Extract failed recipients from a bounce's raw RFC 822 bytes.
+
+    Reads the per-recipient blocks of every message/delivery-status part (Final-Recipient, Action,
+    Status, Diagnostic-Code). Falls back to the X-Failed-Recipients header when no DSN part exists.
+    Only permanent failures (Action: failed or a 5.x.x status) are returned.
+    """
+    msg = message_from_bytes(raw_message)
+    failures: List[Dict[str, str]] = []
+    seen: Set[str] = set()
+
+    for part in msg.walk():
+        if part.get_content_type() != 'message/delivery-status':
+            continue
+        blocks = part.get_payload()
+        if not isinstance(blocks, list):
+            continue
+        for block in blocks:
+            recipient = block.get('Final-Recipient') or block.get('Original-Recipient')
+            if not recipient:
+                continue
+            address = _dsn_address(str(recipient))
+            action = str(block.get('Action', '')).strip().lower()
+            status = str(block.get('Status', '')).strip()
+            if not address or address in seen:
+                continue
+            if action != 'failed' and not status.startswith('5'):
+                continue
+            diagnostic = ' '.join(str(block.get('Diagnostic-Code', '')).split())
+            failures.append({'email': address, 'status': status, 'diagnostic': diagnostic})
+            seen.add(address)
+
+    if not failures:
+        for value in (msg.get_all('X-Failed-Recipients') or []):
+            for _, address in getaddresses([value]):
+                address = address.strip().lower()
+                if address and address not in seen:
+                    failures.append({'email': address, 'status': '', 'diagnostic': ''})
+                    seen.add(address)
+
+    return failures
+
+
+def batch_get_raw_messages(service, message_ids: List[str], chunk_size: int = BATCH_GET_SIZE) -> Dict[str, bytes]:
+    """Fetch raw RFC 822 bytes for many messages using HTTP batch requests."""
+    responses = batch_get_messages(service, message_ids, chunk_size, format='raw', fields='id,raw')
+    return {
+        mid: base64.urlsafe_b64decode(resp['raw'].encode('ascii'))
+        for mid, resp in responses.items()
+        if resp.get('raw')
+    }
+
+
+def hash_address(email_addr: str) -> str:
+    """Stable hash of a normalized email address, used as the suppression index key."""
+    return hashlib.sha256(email_addr.strip().lower().encode('utf-8')).hexdigest()
+
+
+class SuppressionIndex:
+    """
+    Persistent set of hard-bounced recipients, keyed by SHA-256 of the lowercased address.
+
+    Stored as a small CSV (address_hash,status,diagnostic,first_seen,last_seen,bounces) and held in a
+    dict once loaded, so senders can check an address in O(1) before mailing it:
+
+        index = SuppressionIndex.load('bounce_suppression.csv')
+        if index.is_suppressed(to_email):
+            skip()
+    """
+
+    FIELDS = ['address_hash', 'status', 'diagnostic', 'first_seen', 'last_seen', 'bounces']
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path) -> 'SuppressionIndex':
+        index = cls(path)
+        if index.path.exists():
+            try:
+                with index.path.open('r', newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        key = (row.get('address_hash') or '').strip()
+                        if key:
+                            index.entries[key] = row
+            except Exception as e:
+                print(f"Warning: could not read suppression index at {index.path}: {e}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def is_suppressed(self, email_addr: str) -> bool:
+        return hash_address(email_addr) in self.entries
+
+    def add(self, email_addr: str, status: str = '', diagnostic: str = '') -> bool:
+        """Record a hard bounce. Returns True if the address was not suppressed before."""
+        key = hash_address(email_addr)
+        now = datetime.now(tz=timezone.utc).isoformat()
+        entry = self.entries.get(key)
+        self.dirty = True
+        if entry:
+            entry['last_seen'] = now
+            entry['bounces'] = str(int(entry.get('bounces') or 0) + 1)
+            if status:
+                entry['status'] = status
+            if diagnostic:
+                entry['diagnostic'] = diagnostic[:300]
+            return False
+        self.entries[key] = {
+            'address_hash': key,
+            'status': status,
+            'diagnostic': diagnostic[:300],
+            'first_seen': now,
+            'last_seen': now,
+            'bounces': '1',
+        }
         return True
-    return False
 
+    def merge(self, other: 'SuppressionIndex') -> int:
+        """Fold another index (e.g. one written by a per-account worker) into this one. Returns new entries."""
+        added = 0
+        for key, entry in other.entries.items():
+            mine = self.entries.get(key)
+            self.dirty = True
+            if mine is None:
+                self.entries[key] = dict(entry)
+                added += 1
+                continue
+            mine['bounces'] = str(int(mine.get('bounces') or 0) + int(entry.get('bounces') or 0))
+            mine['first_seen'] = min(mine.get('first_seen') or entry['first_seen'], entry.get('first_seen') or '')
+            if (entry.get('last_seen') or '') > (mine.get('last_seen') or ''):
+                mine['last_seen'] = entry['last_seen']
+                mine['status'] = entry.get('status') or mine.get('status', '')
+                mine['diagnostic'] = entry.get('diagnostic') or mine.get('diagnostic', '')
+        return added
+
+    def save(self) -> None:
+        """Atomically rewrite the index file (write to a temp file, then replace)."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with tmp_path.open('w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.FIELDS)
+            writer.writeheader()
+            for entry in self.entries.values():
+                writer.writerow({k: entry.get(k, '') for k in self.FIELDS})
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def batch_trash_or_delete(service, message_ids: List[str], hard_delete: bool = False) -> Tuple[int, int]:
+    """
+    Move many messages to Trash (batchModify adding the TRASH label) or permanently delete them
+    (batchDelete), in chunks of BATCH_MODIFY_SIZE ids.
 
-def trash_or_delete(service, message_id: str, hard_delete: bool = False) -> None:
-    """Move message to Trash or permanently delete."""
-    if hard_delete:
-        service.users().messages().delete(userId='me', id=message_id).execute()
-    else:
-        service.users().messages().trash(userId='me', id=message_id).execute()
+    Returns (messages acted on, API calls made).
+    """
+    acted = 0
+    calls = 0
+    for chunk in chunked(message_ids, BATCH_MODIFY_SIZE):
+        calls += 1
+        try:
+            if hard_delete:
+                service.users().messages().batchDelete(userId='me', body={'ids': chunk}).execute()
+            else:
+                service.users().messages().batchModify(
+                    userId='me',
+                    body={'ids': chunk, 'addLabelIds': ['TRASH']}
+                ).execute()
+            acted += len(chunk)
+        except HttpError as he:
+            print(f"  Warning: failed to {'delete' if hard_delete else 'trash'} {len(chunk)} messages: {he}")
+    return acted, calls
 
 
-def cleanup_bounces(service, since_query: Optional[str], dry_run: bool, hard_delete: bool) -> Dict[str, int]:
+def cleanup_bounces(
+    service,
+    since_query: Optional[str],
+    dry_run: bool,
+    hard_delete: bool,
+    suppression: Optional[SuppressionIndex] = None
+) -> Dict[str, int]:
     """
     Find bounce/failed delivery emails and move them to Trash (or delete).
 
+    If a suppression index is given, the DSN of every matched bounce is parsed and permanently failed
+    recipients are added to it (saved unless dry_run) before the bounces are removed.
+
     Returns a summary dict with counts.
     """
     # Build a robust query; include anywhere (Inbox, archived, etc.)
@@ -230,31 +690,51 @@ def cleanup_bounces(service, since_query: Optional[str], dry_run: bool, hard_del
         query = f'{query} {since_query}'
 
     message_ids = list_messages(service, query)
-    inspected = 0
-    matched = 0
-    acted = 0
 
-    for mid in message_ids:
-        try:
-            meta = get_message_metadata(service, mid)
-            inspected += 1
-            if is_bounce_message(meta):
-                matched += 1
+    # Classify candidates from batched metadata instead of one get per message
+    metadata = batch_get_message_metadata(service, message_ids, metadata_headers=BOUNCE_HEADERS)
+    inspected = len(metadata)
+    candidates: List[str] = []
+    for mid, meta in metadata.items():
+        if not is_bounce_message(meta):
+            # ignore false positives
+            continue
+        candidates.append(mid)
+        if dry_run:
+            # Print for visibility
+            hmap = header_map(meta.get('payload', {}))
+            print(f"[DRY-RUN] Bounce candidate: id={mid} subject={hmap.get('subject','')} from={hmap.get('from','')}")
+
+    matched = len(candidates)
+
+    failed_recipients = 0
+    newly_suppressed = 0
+    if suppression is not None and candidates:
+        raw_messages = batch_get_raw_messages(service, candidates)
+        for mid, raw in raw_messages.items():
+            for failure in parse_dsn_failures(raw):
+                failed_recipients += 1
+                if suppression.add(failure['email'], failure['status'], failure['diagnostic']):
+                    newly_suppressed += 1
                 if dry_run:
-                    # Print for visibility
-                    payload = meta.get('payload', {})
-                    hmap = header_map(payload)
-                    print(f"[DRY-RUN] Bounce candidate: id={mid} subject={hmap.get('subject','')} from={hmap.get('from','')}")
-                else:
-                    trash_or_delete(service, mid, hard_delete=hard_delete)
-                    acted += 1
-            # else: ignore false positives
-        except HttpError as he:
-            print(f"  Warning: failed reading {mid}: {he}")
-        except Exception as e:
-            print(f"  Warning: unexpected error for {mid}: {e}")
-
-    return {'inspected': inspected, 'matched': matched, 'acted': acted}
+                    print(f"[DRY-RUN] Failed recipient: {failure['email']} status={failure['status']} (bounce id={mid})")
+        if not dry_run:
+            suppression.save()
+
+    if dry_run:
+        calls = (matched + BATCH_MODIFY_SIZE - 1) // BATCH_MODIFY_SIZE
+        method = 'batchDelete' if hard_delete else 'batchModify'
+        print(f"[DRY-RUN] Would {'delete' if hard_delete else 'trash'} {matched} messages using {calls} {method} call(s)")
+        return {
+            'inspected': inspected, 'matched': matched, 'acted': 0, 'calls': calls,
+            'failed_recipients': failed_recipients, 'suppressed': newly_suppressed,
+        }
+
+    acted, calls = batch_trash_or_delete(service, candidates, hard_delete=hard_delete)
+    return {
+        'inspected': inspected, 'matched': matched, 'acted': acted, 'calls': calls,
+        'failed_recipients': failed_recipients, 'suppressed': newly_suppressed,
+    }
 
 
 def load_sent_log_ids(sent_log_path: Path) -> List[str]:
@@ -305,12 +785,279 @@ def extract_header(hmap: Dict[str, str], key: str) -> str:
     return hmap.get(key.lower(), '')
 
 
+REPLY_FIELDS = [
+    'thread_id',
+    'reply_message_id',
+    'reply_date',
+    'from_name',
+    'from_email',
+    'subject',
+    'to',
+    'snippet',
+]
+
+# Reply rows buffered in memory before being sorted and flushed to a checkpoint run file
+CHECKPOINT_ROWS = 5000
+# Threads processed between checkpoints even if few replies were found
+CHECKPOINT_THREADS = 200
+# Maximum number of run files merged at once by the external merge sort
+MERGE_FAN_IN = 64
+
+
+class QuotaExhausted(Exception):
+    """Raised when Gmail reports quota/rate exhaustion; the run can be continued with --resume."""
+
+
+def is_quota_error(he: HttpError) -> bool:
+    status = getattr(getattr(he, 'resp', None), 'status', None)
+    if status == 429:
+        return True
+    return status == 403 and any(
+        reason in str(he) for reason in ('rateLimitExceeded', 'userRateLimitExceeded', 'quotaExceeded')
+    )
+
+
+def is_rate_limited(he: HttpError) -> bool:
+    """Short-term rate limiting (worth retrying), as opposed to an exhausted daily quota."""
+    status = getattr(getattr(he, 'resp', None), 'status', None)
+    return status == 429 or (status == 403 and any(
+        reason in str(he) for reason in ('rateLimitExceeded', 'userRateLimitExceeded')))
+
+
+def _run_key(row: Dict[str, str]) -> Tuple[int, str]:
+    """Sort key for reply rows: integer internalDate, then message id (makes duplicates adjacent)."""
+    try:
+        ms = int(row.get('internal_date_ms') or 0)
+    except ValueError:
+        ms = 0
+    return ms, row.get('reply_message_id', '')
+
+
+class ReplyCheckpoint:
+    """
+    On-disk state of a replies run, so an interrupted run can continue with --resume.
+
+    Layout of work_dir:
+      state.json     run parameters (output path, account, since threshold)
+      threads.txt    thread ids to scan; threads.done marks the collection phase complete
+      processed.txt  thread ids whose replies are safely stored in a run file
+      runs/*.csv     sorted runs of reply rows (REPLY_FIELDS plus internal_date_ms)
+
+    Rows are buffered up to CHECKPOINT_ROWS, then sorted and written as a new run before the
+    threads they came from are appended to processed.txt. A crash loses at most the unflushed
+    buffer, and those threads are simply scanned again on resume.
+    """
+
+    RUN_FIELDS = ['internal_date_ms'] + REPLY_FIELDS
+
+    def __init__(self, work_dir: Path):
+        self.work_dir = Path(work_dir)
+        self.runs_dir = self.work_dir / 'runs'
+        self.state_path = self.work_dir / 'state.json'
+        self.threads_path = self.work_dir / 'threads.txt'
+        self.threads_done_path = self.work_dir / 'threads.done'
+        self.processed_path = self.work_dir / 'processed.txt'
+        self.buffer: List[Dict[str, str]] = []
+        self.pending_threads: List[str] = []
+
+    def exists(self) -> bool:
+        return self.state_path.exists()
+
+    def reset(self, state: Dict) -> None:
+        if self.work_dir.exists():
+            shutil.rmtree(self.work_dir)
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(state, indent=2), encoding='utf-8')
+
+    def load_state(self) -> Dict:
+        return json.loads(self.state_path.read_text(encoding='utf-8'))
+
+    def threads_collected(self) -> bool:
+        return self.threads_done_path.exists()
+
+    def save_threads(self, thread_ids: Set[str]) -> None:
+        with self.threads_path.open('w', encoding='utf-8') as f:
+            for tid in thread_ids:
+                f.write(tid + '\n')
+        self.threads_done_path.touch()
+
+    def load_threads(self) -> List[str]:
+        return _read_lines(self.threads_path)
+
+    def load_processed(self) -> Set[str]:
+        return set(_read_lines(self.processed_path))
+
+    def add_rows(self, thread_id: str, rows: List[Dict[str, str]]) -> None:
+        self.buffer.extend(rows)
+        self.pending_threads.append(thread_id)
+        if len(self.buffer) >= CHECKPOINT_ROWS or len(self.pending_threads) >= CHECKPOINT_THREADS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as a sorted run, then record their threads as processed."""
+        if self.buffer:
+            self.buffer.sort(key=_run_key)
+            run_path = self.runs_dir / f'run_{len(self.run_paths()):06d}.csv'
+            _write_run(run_path, self.buffer, self.RUN_FIELDS)
+        if self.pending_threads:
+            with self.processed_path.open('a', encoding='utf-8') as f:
+                for tid in self.pending_threads:
+                    f.write(tid + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        self.buffer = []
+        self.pending_threads = []
+
+    def run_paths(self) -> List[Path]:
+        return sorted(self.runs_dir.glob('run_*.csv'))
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+def _read_lines(path: Path) -> List[str]:
+    if not path.exists():
+        return []
+    with path.open('r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _write_run(path: Path, rows, fieldnames: List[str]) -> int:
+    """Atomically write rows to a CSV (temp file + rename). Returns the number of rows written."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    count = 0
+    with tmp_path.open('w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def _dedupe_sorted(rows):
+    """Drop adjacent rows with the same sort key (re-scanned threads after a crash)."""
+    last = None
+    for row in rows:
+        key = _run_key(row)
+        if key != last:
+            yield row
+        last = key
+
+
+def merge_runs(run_paths: List[Path], out_path: Path, fieldnames: List[str], scratch_dir: Path) -> int:
+    """
+    External k-way merge of sorted run files into out_path, holding one row per run in memory.
+
+    Merges in passes of at most MERGE_FAN_IN files so open file handles stay bounded.
+    Returns the number of rows written.
+    """
+    runs = list(run_paths)
+    level = 0
+    while len(runs) > MERGE_FAN_IN:
+        merged = []
+        for i, group in enumerate(chunked(runs, MERGE_FAN_IN)):
+            path = scratch_dir / f'merge_{level:02d}_{i:06d}.csv'
+            _merge_into(group, path, ReplyCheckpoint.RUN_FIELDS)
+            merged.append(path)
+        runs = merged
+        level += 1
+    return _merge_into(runs, out_path, fieldnames)
+
+
+def _merge_into(run_paths: List[Path], out_path: Path, fieldnames: List[str]) -> int:
+    with ExitStack() as stack:
+        readers = [
+            csv.DictReader(stack.enter_context(p.open('r', newline='', encoding='utf-8')))
+            for p in run_paths
+        ]
+        merged = heapq.merge(*readers, key=_run_key)
+        return _write_run(out_path, _dedupe_sorted(merged), fieldnames)
+
+
+def collect_reply_thread_ids(
+    service,
+    since_epoch_ms: Optional[int],
+    sent_log_ids: Optional[List[str]] = None
+) -> Set[str]:
+    """Collect ids of threads that may contain replies to messages we sent."""
+    thread_ids: Set[str] = set()
+    if sent_log_ids:
+        # Gather thread IDs from sent message IDs; a sent message ID may be old/expired or not
+        # accessible with current scopes, which batch_get_messages reports as a warning
+        for chunk in chunked(sent_log_ids, 500):
+            for tid in batch_get_thread_ids(service, chunk).values():
+                if tid:
+                    thread_ids.add(tid)
+    else:
+        # Fallback: scan recent threads from messages sent by me. messages.list already returns
+        # threadId, so no per-message get is needed. Default to 180 days if since not provided.
+        default_since = 'newer_than:180d' if not since_epoch_ms else ''
+        q = f'from:me {default_since}'.strip()
+        for page in iter_message_pages(service, q):
+            for m in page:
+                tid = m.get('threadId')
+                if tid:
+                    thread_ids.add(tid)
+    return thread_ids
+
+
+def thread_reply_rows(thread: Dict, my_email: str, since_epoch_ms: Optional[int]) -> List[Dict[str, str]]:
+    """Return reply rows (messages not from me) for a thread that includes at least one message from me."""
+    thread_id = thread.get('id', '')
+    messages = thread.get('messages', [])
+    me = my_email.lower()
+
+    # Identify if the thread includes at least one message from me
+    parsed = []
+    has_me = False
+    for m in messages:
+        hmap = header_map(m.get('payload', {}))
+        name, sender_email = parse_name_email(extract_header(hmap, 'From'))
+        if sender_email.lower() == me:
+            has_me = True
+        parsed.append((m, hmap, name, sender_email))
+    if not has_me:
+        return []
+
+    rows = []
+    for m, hmap, name, sender_email in parsed:
+        # Only count messages not from me
+        if sender_email.lower() == me:
+            continue
+
+        # Date filtering
+        internal_date = m.get('internalDate')
+        if since_epoch_ms and internal_date:
+            try:
+                if int(internal_date) < since_epoch_ms:
+                    continue
+            except Exception:
+                pass
+
+        rows.append({
+            'internal_date_ms': internal_date or '0',
+            'thread_id': thread_id,
+            'reply_message_id': m.get('id', ''),
+            'reply_date': epoch_ms_to_iso(internal_date or ''),
+            'from_name': name,
+            'from_email': sender_email,
+            'subject': extract_header(hmap, 'Subject'),
+            'to': extract_header(hmap, 'To'),
+            'snippet': (m.get('snippet') or '').strip(),
+        })
+    return rows
+
+
 def build_replies_csv(
     service,
     my_email: str,
     out_path: Path,
     since_epoch_ms: Optional[int],
-    sent_log_ids: Optional[List[str]] = None
+    sent_log_ids: Optional[List[str]] = None,
+    resume: bool = False,
+    work_dir: Optional[Path] = None
 ) -> int:
     """
     Build a CSV of replies received in threads where you've sent emails.
@@ -319,140 +1066,413 @@ def build_replies_csv(
       - If sent_log_ids provided: for each sent Gmail message id, fetch its thread and collect messages not from me.
       - Else: query threads with 'from:me' in recent window, and collect messages not from me in those threads.
 
+    Progress is checkpointed to work_dir (default: <out>.work) as sorted run files; the final CSV is an
+    external merge of those runs ordered by internalDate, so memory stays bounded by CHECKPOINT_ROWS.
+    With resume=True an interrupted run continues from its last checkpoint.
+
     Returns count of rows written.
     """
-    rows: List[Dict[str, str]] = []
-    seen_reply_ids: Set[str] = set()
-    thread_ids: Set[str] = set()
-
-    # Helper to process a thread and collect reply messages
-    def process_thread(thread_id: str):
-        nonlocal rows
+    checkpoint = ReplyCheckpoint(work_dir or out_path.with_name(out_path.name + '.work'))
+
+    if resume and checkpoint.exists():
+        state = checkpoint.load_state()
+        if state.get('my_email', '').lower() != my_email.lower():
+            raise ValueError(f"Checkpoint in {checkpoint.work_dir} belongs to {state.get('my_email')}, not {my_email}")
+        # Keep the original threshold so a --days window does not drift between attempts
+        since_epoch_ms = state.get('since_epoch_ms')
+        print(f"  Resuming from checkpoint {checkpoint.work_dir}")
+    else:
+        if resume:
+            print(f"  No checkpoint found in {checkpoint.work_dir}; starting a new run")
+        checkpoint.reset({
+            'out': str(out_path),
+            'my_email': my_email,
+            'since_epoch_ms': since_epoch_ms,
+            'sent_log': bool(sent_log_ids),
+            'started': datetime.now(tz=timezone.utc).isoformat(),
+        })
+
+    if not checkpoint.threads_collected():
         try:
-            th = get_thread(service, thread_id)
-            messages = th.get('messages', [])
-            # Identify if the thread includes at least one message from me
-            has_me = False
-            for m in messages:
-                payload = m.get('payload', {})
-                hmap = header_map(payload)
-                from_hdr = extract_header(hmap, 'From')
-                _, sender_email = parse_name_email(from_hdr)
-                if sender_email.lower() == my_email.lower():
-                    has_me = True
-                    break
-            if not has_me:
-                return
-
-            for m in messages:
-                mid = m.get('id', '')
-                if mid in seen_reply_ids:
-                    continue
-                payload = m.get('payload', {})
-                hmap = header_map(payload)
-                from_hdr = extract_header(hmap, 'From')
-                name, sender_email = parse_name_email(from_hdr)
-                # Only count messages not from me
-                if sender_email.lower() == my_email.lower():
-                    continue
-
-                # Date filtering
-                internal_date = m.get('internalDate')
-                if since_epoch_ms and internal_date:
-                    try:
-                        if int(internal_date) < since_epoch_ms:
-                            continue
-                    except Exception:
-                        pass
-
-                # Build row
-                to_hdr = extract_header(hmap, 'To')
-                subject = extract_header(hmap, 'Subject')
-                date_iso = epoch_ms_to_iso(internal_date or '')
-                snippet = (m.get('snippet') or '').strip()
-
-                row = {
-                    'thread_id': thread_id,
-                    'reply_message_id': mid,
-                    'reply_date': date_iso,
-                    'from_name': name,
-                    'from_email': sender_email,
-                    'subject': subject,
-                    'to': to_hdr,
-                    'snippet': snippet,
-                }
-                rows.append(row)
-                seen_reply_ids.add(mid)
-
+            checkpoint.save_threads(collect_reply_thread_ids(service, since_epoch_ms, sent_log_ids))
         except HttpError as he:
-            print(f"  Warning: failed reading thread {thread_id}: {he}")
-        except Exception as e:
-            print(f"  Warning: unexpected error for thread {thread_id}: {e}")
+            if is_quota_error(he):
+                raise QuotaExhausted(str(he)) from he
+            raise
 
-    if sent_log_ids:
-        # Gather thread IDs from sent message IDs
-        for sid in sent_log_ids:
+    processed = checkpoint.load_processed()
+    pending = [tid for tid in checkpoint.load_threads() if tid not in processed]
+    print(f"  Threads: {len(processed)} already processed, {len(pending)} remaining")
+    del processed
+
+    failed: List[str] = []
+    try:
+        for tid in pending:
             try:
-                meta = get_message_metadata(service, sid)
-                tid = meta.get('threadId')
-                if tid:
-                    thread_ids.add(tid)
+                th = get_thread(service, tid)
             except HttpError as he:
-                # Sent message ID may be old/expired or not accessible with current scopes
-                print(f"  Warning: could not fetch sent message {sid}: {he}")
+                if is_quota_error(he):
+                    raise QuotaExhausted(str(he)) from he
+                # Not recorded as processed, so a --resume run retries it
+                print(f"  Warning: failed reading thread {tid}: {he}")
+                failed.append(tid)
+                continue
             except Exception as e:
-                print(f"  Warning: error fetching sent message {sid}: {e}")
-        for tid in thread_ids:
-            process_thread(tid)
+                print(f"  Warning: unexpected error for thread {tid}: {e}")
+                failed.append(tid)
+                continue
+            checkpoint.add_rows(tid, thread_reply_rows(th, my_email, since_epoch_ms))
+    finally:
+        # Persist whatever completed, including on quota exhaustion or Ctrl+C
+        checkpoint.flush()
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    count = merge_runs(checkpoint.run_paths(), out_path, REPLY_FIELDS, checkpoint.work_dir)
+    if failed:
+        # Keep the checkpoint so the failed threads can still be retried
+        print(f"  Warning: {len(failed)} thread(s) could not be read; {out_path} is partial.")
+        print(f"  Checkpoint kept in {checkpoint.work_dir}; rerun with --resume to retry them.")
     else:
-        # Fallback: scan recent threads from messages sent by me
-        # Use a reasonable default window if since not provided
-        base_query = 'from:me'
-        # We'll build the since restriction as a message-level restriction
-        # to reduce search space we can still add a newer_than:Nd if since not provided
-        # Default to 180 days
-        default_since = f'newer_than:180d' if not since_epoch_ms else ''
-        q = f'{base_query} {default_since}'.strip()
-        message_ids = list_messages(service, q)
-        for mid in message_ids:
-            try:
-                meta = get_message_metadata(service, mid)
-                tid = meta.get('threadId')
-                if tid:
-                    thread_ids.add(tid)
-            except Exception:
-                # ignore
-                pass
-        for tid in thread_ids:
-            process_thread(tid)
+        checkpoint.cleanup()
+    return count
+
+
+class RepliesDataset:
+    """
+    Canonical, append-only replies dataset replacing one timestamped CSV per run.
+
+    Layout of root:
+      index.csv                        reply_message_id -> partition (dedup index, loaded into a dict)
+      partitions/replies_YYYY-MM.csv   rows partitioned by reply month, for cheap range reads
+      deltas/new_replies_<ts>.csv      only the rows appended by one merge, for downstream CRM imports
+
+    Appends write new rows to their partition before recording them in the index, so a crash can at
+    worst leave a duplicate row that the next compact() removes.
+    """
+
+    INDEX_FIELDS = ['reply_message_id', 'partition']
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.index_path = self.root / 'index.csv'
+        self.partitions_dir = self.root / 'partitions'
+        self.deltas_dir = self.root / 'deltas'
+        self.index: Dict[str, str] = {}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        with self.index_path.open('r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                mid = row.get('reply_message_id')
+                if mid:
+                    self.index[mid] = row.get('partition', '')
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @staticmethod
+    def partition_for(row: Dict[str, str]) -> str:
+        # reply_date is ISO 8601 (UTC), so the first 7 chars are YYYY-MM
+        date = (row.get('reply_date') or '')[:7]
+        return date if re.fullmatch(r'\d{4}-\d{2}', date) else 'undated'
+
+    def partition_path(self, partition: str) -> Path:
+        return self.partitions_dir / f'replies_{partition}.csv'
+
+    def append_rows(self, rows) -> Tuple[int, int, Optional[Path]]:
+        """
+        Append rows whose reply_message_id is not indexed yet.
+
+        Returns (new rows, duplicate rows skipped, delta file path or None if nothing was new).
+        """
+        self.partitions_dir.mkdir(parents=True, exist_ok=True)
+        self.deltas_dir.mkdir(parents=True, exist_ok=True)
+        delta_path = self.deltas_dir / f'new_replies_{datetime.now().strftime("%Y%m%d_%H%M%S_%f")}.csv'
+        new_entries: List[Tuple[str, str]] = []
+        duplicates = 0
+
+        with ExitStack() as stack:
+            writers: Dict[str, csv.DictWriter] = {}
+            delta_writer = None
+            for row in rows:
+                mid = (row.get('reply_message_id') or '').strip()
+                if not mid or mid in self.index:
+                    duplicates += 1
+                    continue
+                partition = self.partition_for(row)
+                writer = writers.get(partition)
+                if writer is None:
+                    path = self.partition_path(partition)
+                    is_new = not path.exists()
+                    f = stack.enter_context(path.open('a', newline='', encoding='utf-8'))
+                    writer = csv.DictWriter(f, fieldnames=REPLY_FIELDS, extrasaction='ignore')
+                    if is_new:
+                        writer.writeheader()
+                    writers[partition] = writer
+                if delta_writer is None:
+                    f = stack.enter_context(delta_path.open('w', newline='', encoding='utf-8'))
+                    delta_writer = csv.DictWriter(f, fieldnames=REPLY_FIELDS, extrasaction='ignore')
+                    delta_writer.writeheader()
+                writer.writerow(row)
+                delta_writer.writerow(row)
+                self.index[mid] = partition
+                new_entries.append((mid, partition))
+
+        if new_entries:
+            is_new = not self.index_path.exists()
+            with self.index_path.open('a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(self.INDEX_FIELDS)
+                writer.writerows(new_entries)
+        return len(new_entries), duplicates, (delta_path if new_entries else None)
+
+    def append_csv(self, csv_path: Path) -> Tuple[int, int, Optional[Path]]:
+        """Merge a replies CSV (as written by build_replies_csv) into the dataset."""
+        with Path(csv_path).open('r', newline='', encoding='utf-8') as f:
+            return self.append_rows(csv.DictReader(f))
+
+    def iter_rows(self, since: Optional[str] = None, until: Optional[str] = None):
+        """
+        Yield rows with since <= reply_date < until (ISO strings, either bound optional).
+
+        Only partitions whose month overlaps the range are opened.
+        """
+        if not self.partitions_dir.exists():
+            return
+        for path in sorted(self.partitions_dir.glob('replies_*.csv')):
+            partition = path.stem[len('replies_'):]
+            if partition != 'undated':
+                if since and partition < since[:7]:
+                    continue
+                if until and partition > until[:7]:
+                    continue
+            elif since or until:
+                continue
+            with path.open('r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    date = row.get('reply_date') or ''
+                    if since and date < since:
+                        continue
+                    if until and date >= until:
+                        continue
+                    yield row
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Rewrite every partition sorted by reply_date with duplicates removed, then rebuild the index.
+
+        Each partition is rewritten atomically; memory is bounded by the largest partition.
+        """
+        partitions = 0
+        rows_kept = 0
+        removed = 0
+        index: Dict[str, str] = {}
+        for path in sorted(self.partitions_dir.glob('replies_*.csv')) if self.partitions_dir.exists() else []:
+            partition = path.stem[len('replies_'):]
+            with path.open('r', newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            unique: Dict[str, Dict[str, str]] = {}
+            for row in rows:
+                mid = row.get('reply_message_id') or ''
+                if mid and mid not in unique and mid not in index:
+                    unique[mid] = row
+            removed += len(rows) - len(unique)
+            ordered = sorted(unique.values(), key=lambda r: (r.get('reply_date') or '', r['reply_message_id']))
+            _write_run(path, ordered, REPLY_FIELDS)
+            for mid in unique:
+                index[mid] = partition
+            partitions += 1
+            rows_kept += len(ordered)
+
+        _write_run(
+            self.index_path,
+            ({'reply_message_id': mid, 'partition': part} for mid, part in index.items()),
+            self.INDEX_FIELDS,
+        )
+        self.index = index
+        return {'partitions': partitions, 'rows': rows_kept, 'duplicates_removed': removed}
+
+
+# Upper bound on default worker processes for --accounts
+MAX_ACCOUNT_WORKERS = 16
+
+
+def load_accounts_manifest(path: Path) -> List[Dict]:
+    """
+    Load a multi-mailbox manifest: a JSON list of accounts, e.g.
+
+        [
+          {"name": "sales", "token": "tokens/sales.pickle"},
+          {"name": "support", "token": "tokens/support.pickle", "credentials": "support_credentials.json",
+           "sent_log": "logs/support_sent_emails_log.csv", "quota_units_per_sec": 200}
+        ]
 
-    # Sort rows by date ascending
-    def parse_iso(s: str) -> float:
+    'name' and 'token' are required; other keys fall back to the command-line values.
+    """
+    with Path(path).open('r', encoding='utf-8') as f:
+        accounts = json.load(f)
+    if not isinstance(accounts, list):
+        raise ValueError(f"{path}: expected a JSON list of accounts")
+    names = set()
+    for account in accounts:
+        if not account.get('name') or not account.get('token'):
+            raise ValueError(f"{path}: every account needs 'name' and 'token' ({account})")
+        if not re.fullmatch(r'[\w.@-]+', account['name']):
+            raise ValueError(f"{path}: account name {account['name']!r} must be usable as a directory name")
+        if account['name'] in names:
+            raise ValueError(f"{path}: duplicate account name {account['name']!r}")
+        names.add(account['name'])
+    return accounts
+
+
+def run_account(account: Dict, options: Dict) -> Dict:
+    """
+    Process one mailbox (cleanup and/or replies) in a worker process.
+
+    Output goes to <out_dir>/<name>/ (replies.csv, suppression.csv, run.log). Never raises; errors are
+    reported in the returned summary so one bad account does not stop the others.
+    """
+    account_dir = Path(options['out_dir']) / account['name']
+    account_dir.mkdir(parents=True, exist_ok=True)
+    result: Dict = {'name': account['name'], 'email': '', 'cleanup': None, 'replies': None,
+                    'replies_csv': None, 'suppression_file': None, 'traffic': {}, 'error': None}
+    started = time.monotonic()
+
+    with (account_dir / 'run.log').open('a', encoding='utf-8') as log, redirect_stdout(log):
+        print(f"=== {datetime.now(tz=timezone.utc).isoformat()} account={account['name']}")
+        service = None
         try:
-            return datetime.fromisoformat(s).timestamp()
-        except Exception:
-            return 0.0
+            service = get_gmail_service(
+                account['token'],
+                account.get('credentials') or options['credentials'],
+                GMAIL_SCOPES,
+                quota_units_per_sec=account.get('quota_units_per_sec', options['quota_units_per_sec']),
+                allow_reauth=False,
+            )
+            result['email'] = get_profile_email(service)
+
+            if not options['only_replies']:
+                suppression = None
+                if options['suppression']:
+                    suppression = SuppressionIndex(account_dir / 'suppression.csv')
+                    result['suppression_file'] = str(suppression.path)
+                result['cleanup'] = cleanup_bounces(
+                    service, options['since_query'],
+                    dry_run=options['dry_run'], hard_delete=options['hard_delete'], suppression=suppression
+                )
+
+            if not options['only_cleanup']:
+                sent_log = account.get('sent_log') or options['sent_log']
+                sent_ids = load_sent_log_ids(Path(sent_log)) if sent_log else None
+                out_csv = account_dir / 'replies.csv'
+                result['replies'] = build_replies_csv(
+                    service, result['email'], out_csv, options['since_epoch_ms'],
+                    sent_log_ids=sent_ids, resume=options['resume']
+                )
+                result['replies_csv'] = str(out_csv)
+        except QuotaExhausted as e:
+            result['error'] = f"quota exhausted (checkpointed; rerun with --resume): {e}"
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        if result['error']:
+            print(f"ERROR: {result['error']}")
+        if service is not None:
+            result['traffic'] = api_traffic(service)
+            print_api_traffic(service)
+
+    result['elapsed_s'] = round(time.monotonic() - started, 1)
+    return result
 
-    rows.sort(key=lambda r: parse_iso(r.get('reply_date', '')))
 
-    # Write CSV
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open('w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'thread_id',
-            'reply_message_id',
-            'reply_date',
-            'from_name',
-            'from_email',
-            'subject',
-            'to',
-            'snippet',
-        ])
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
+def combine_account_replies(results: List[Dict], out_path: Path) -> int:
+    """k-way merge the per-account replies CSVs (each sorted by reply_date) into one CSV with an account column."""
+
+    def rows(result: Dict):
+        with Path(result['replies_csv']).open('r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                row['account'] = result['email'] or result['name']
+                yield row
+
+    sources = [rows(r) for r in results if r.get('replies_csv') and Path(r['replies_csv']).exists()]
+    merged = heapq.merge(*sources, key=lambda r: (r.get('reply_date') or '', r.get('reply_message_id') or ''))
+    return _write_run(out_path, merged, ['account'] + REPLY_FIELDS)
+
+
+def run_multi_account(args, since_query: Optional[str], since_epoch_ms: Optional[int]) -> None:
+    """Process every mailbox from --accounts in a process pool and write per-account and combined outputs."""
+    accounts = load_accounts_manifest(Path(args.accounts))
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    options = {
+        'out_dir': str(out_dir),
+        'credentials': args.credentials,
+        'quota_units_per_sec': args.quota_units_per_sec or DEFAULT_QUOTA_UNITS_PER_SEC,
+        'since_query': since_query,
+        'since_epoch_ms': since_epoch_ms,
+        'dry_run': args.dry_run,
+        'hard_delete': args.hard_delete,
+        'only_cleanup': args.only_cleanup,
+        'only_replies': args.only_replies,
+        'suppression': not args.no_suppression,
+        'sent_log': args.sent_log,
+        'resume': args.resume,
+    }
+    # The work is network/quota bound, so default to one process per mailbox rather than per CPU
+    workers = args.workers or min(len(accounts), MAX_ACCOUNT_WORKERS)
+    print(f"Processing {len(accounts)} mailboxes with {workers} workers -> {out_dir}")
+
+    results: List[Dict] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_account, account, options): account['name'] for account in accounts}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = f"ERROR {result['error']}" if result['error'] else 'ok'
+            print(f"  [{result['name']}] {result['email'] or '?'} cleanup={result['cleanup']} "
+                  f"replies={result['replies']} {result['elapsed_s']}s {status}")
+    results.sort(key=lambda r: r['name'])
+    print()
 
-    return len(rows)
+    # Combined bounce summary and suppression index
+    if not args.only_replies:
+        totals = {'inspected': 0, 'matched': 0, 'acted': 0, 'calls': 0, 'failed_recipients': 0}
+        for r in results:
+            for key in totals:
+                totals[key] += (r['cleanup'] or {}).get(key, 0)
+        summary_path = out_dir / 'bounce_summary.json'
+        with summary_path.open('w', encoding='utf-8') as f:
+            json.dump({'totals': totals, 'accounts': {r['name']: r['cleanup'] for r in results}}, f, indent=2)
+        print(f"Cleanup totals: {totals} -> {summary_path}")
+
+        if not args.no_suppression and not args.dry_run:
+            suppression = SuppressionIndex.load(args.suppression_file)
+            added = 0
+            for r in results:
+                if r['suppression_file'] and Path(r['suppression_file']).exists():
+                    added += suppression.merge(SuppressionIndex.load(r['suppression_file']))
+            suppression.save()
+            print(f"Suppression: new={added} total={len(suppression)} ({args.suppression_file})")
+
+    # Combined replies
+    if not args.only_cleanup:
+        combined = out_dir / 'combined_replies.csv'
+        count = combine_account_replies(results, combined)
+        print(f"✓ Combined replies CSV written with {count} rows at: {combined.resolve()}")
+        if args.dataset:
+            dataset = RepliesDataset(Path(args.dataset))
+            new_rows, duplicates, delta = dataset.append_csv(combined)
+            print(f"✓ Merged into dataset {args.dataset}: new={new_rows} already_present={duplicates} total={len(dataset)}")
+            if delta:
+                print(f"  New rows for downstream import: {delta}")
+
+    failed = [r['name'] for r in results if r['error']]
+    if failed:
+        print(f"WARNING: {len(failed)} mailbox(es) failed: {', '.join(failed)} (see <out-dir>/<name>/run.log)")
+        sys.exit(2)
+    print("Done.")
 
 
 def main():
@@ -465,9 +1485,48 @@ def main():
     parser.add_argument('--days', type=int, help='Only consider messages newer than N days')
     parser.add_argument('--sent-log', type=str, help='Path to sent_emails_log.csv from vcrun.py to constrain replies')
     parser.add_argument('--out', type=str, help='Output CSV path for replies (default: ./gmail_replies_YYYYMMDD_HHMMSS.csv)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted replies run from its checkpoint (requires the same --out)')
+    parser.add_argument('--work-dir', type=str, help='Checkpoint directory for the replies run (default: <out>.work)')
+    parser.add_argument('--dataset', type=str,
+                        help='Merge replies into this canonical dataset directory (dedup index, monthly partitions, '
+                             'per-run delta CSV of new rows) instead of keeping a new full CSV per run')
+    parser.add_argument('--import-csv', nargs='+', metavar='CSV',
+                        help='Merge existing replies CSVs into --dataset (no Gmail access needed)')
+    parser.add_argument('--compact', action='store_true',
+                        help='Sort and dedupe --dataset partitions and rebuild its index (no Gmail access needed)')
     parser.add_argument('--only-cleanup', action='store_true', help='Only run cleanup of failed deliveries')
     parser.add_argument('--only-replies', action='store_true', help='Only build replies CSV, skip cleanup')
+    parser.add_argument('--suppression-file', default=SUPPRESSION_FILE,
+                        help='Hashed hard-bounce suppression index updated from bounce DSNs (default: ./bounce_suppression.csv)')
+    parser.add_argument('--no-suppression', action='store_true', help='Do not parse bounce DSNs into the suppression index')
+    parser.add_argument('--quota-units-per-sec', type=float, default=0,
+                        help='Throttle each mailbox to this many Gmail quota units/second and retry 429s '
+                             f'(default: off; {DEFAULT_QUOTA_UNITS_PER_SEC} with --accounts)')
+    parser.add_argument('--accounts', type=str,
+                        help='JSON manifest of mailboxes (name, token, optional credentials/sent_log/quota_units_per_sec) '
+                             'to process in parallel instead of a single --token')
+    parser.add_argument('--out-dir', type=str, default='./gmail_accounts',
+                        help='Output directory for --accounts runs (per-account folders plus combined outputs)')
+    parser.add_argument('--workers', type=int, help=f'Worker processes for --accounts (default: one per mailbox, up to {MAX_ACCOUNT_WORKERS})')
     args = parser.parse_args()
+    if args.resume and not args.out and not args.dataset and not args.accounts and not args.only_cleanup:
+        parser.error('--resume requires --out pointing at the interrupted run\'s output path')
+    if (args.import_csv or args.compact) and not args.dataset:
+        parser.error('--import-csv and --compact require --dataset')
+
+    # Dataset maintenance runs locally and needs no Gmail access
+    if args.import_csv or args.compact:
+        dataset = RepliesDataset(Path(args.dataset))
+        for path in args.import_csv or []:
+            new_rows, duplicates, delta = dataset.append_csv(Path(path))
+            print(f"Imported {path}: new={new_rows} duplicates={duplicates}" + (f" delta={delta}" if delta else ""))
+        if args.compact:
+            stats = dataset.compact()
+            print(f"Compacted {args.dataset}: partitions={stats['partitions']} rows={stats['rows']} "
+                  f"duplicates_removed={stats['duplicates_removed']}")
+        print("Done.")
+        return
 
     token_path = args.token
     cred_path = args.credentials
@@ -487,10 +1546,14 @@ def main():
         d = datetime.now(tz=timezone.utc) - timedelta(days=args.days)
         since_epoch_ms = int(d.timestamp() * 1000)
 
+    if args.accounts:
+        run_multi_account(args, since_query_suffix, since_epoch_ms)
+        return
+
     # Initialize Gmail
     print("Initializing Gmail service...")
     try:
-        service = get_gmail_service(token_path, cred_path, GMAIL_SCOPES)
+        service = get_gmail_service(token_path, cred_path, GMAIL_SCOPES, quota_units_per_sec=args.quota_units_per_sec)
     except Exception as e:
         print(f"ERROR: Could not initialize Gmail service: {e}")
         sys.exit(1)
@@ -501,24 +1564,55 @@ def main():
     # Cleanup phase
     if not args.only_replies:
         print("Cleaning up failed deliveries (bounces)...")
-        summary = cleanup_bounces(service, since_query_suffix, dry_run=args.dry_run, hard_delete=args.hard_delete)
+        suppression = None if args.no_suppression else SuppressionIndex.load(args.suppression_file)
+        summary = cleanup_bounces(
+            service, since_query_suffix,
+            dry_run=args.dry_run, hard_delete=args.hard_delete, suppression=suppression
+        )
         action_word = "would be deleted" if args.dry_run else ("deleted" if args.hard_delete else "trashed")
-        print(f"Cleanup summary: inspected={summary['inspected']} matched={summary['matched']} {action_word}={summary['acted']}")
+        acted = summary['matched'] if args.dry_run else summary['acted']
+        print(f"Cleanup summary: inspected={summary['inspected']} matched={summary['matched']} {action_word}={acted} batch_calls={summary['calls']}")
+        if suppression is not None:
+            print(f"Suppression: failed_recipients={summary['failed_recipients']} new={summary['suppressed']} "
+                  f"total={len(suppression)} ({args.suppression_file})")
         print()
 
     # Replies phase
     if not args.only_cleanup:
-        # Determine output path
-        out_csv = Path(args.out) if args.out else Path(f'./gmail_replies_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+        # Determine output path. In dataset mode the run's CSV is a fixed staging file (so --resume
+        # works without --out) that is merged into the dataset and then removed.
+        if args.out:
+            out_csv = Path(args.out)
+        elif args.dataset:
+            out_csv = Path(args.dataset) / '.staging' / 'replies_run.csv'
+        else:
+            out_csv = Path(f'./gmail_replies_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
         sent_ids = None
         if args.sent_log:
             sent_ids = load_sent_log_ids(Path(args.sent_log))
             print(f"Loaded {len(sent_ids)} sent message IDs from sent log")
         print(f"Building replies CSV -> {out_csv}")
-        count = build_replies_csv(service, my_email, out_csv, since_epoch_ms, sent_log_ids=sent_ids)
+        try:
+            count = build_replies_csv(
+                service, my_email, out_csv, since_epoch_ms, sent_log_ids=sent_ids,
+                resume=args.resume, work_dir=Path(args.work_dir) if args.work_dir else None
+            )
+        except QuotaExhausted as e:
+            print(f"ERROR: Gmail quota exhausted: {e}")
+            print(f"Progress is checkpointed; rerun with --resume --out \"{out_csv}\" to continue.")
+            sys.exit(2)
         print(f"✓ Replies CSV written with {count} rows at: {out_csv.resolve()}")
+        if args.dataset:
+            dataset = RepliesDataset(Path(args.dataset))
+            new_rows, duplicates, delta = dataset.append_csv(out_csv)
+            print(f"✓ Merged into dataset {args.dataset}: new={new_rows} already_present={duplicates} total={len(dataset)}")
+            if delta:
+                print(f"  New rows for downstream import: {delta}")
+            if not args.out:
+                out_csv.unlink()
         print()
 
+    print_api_traffic(service)
     print("Done.")
 
 
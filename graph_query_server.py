@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Cosmos Graph Query Server
+
+A long-running local HTTP service that keeps the Cosmos DB graph (the one visualize_cosmos_graph.py
+builds) in memory and answers lookups from prebuilt indexes, instead of regenerating cosmos_graph.json
+and rescanning it for every question.
+
+Endpoints (GET, JSON unless noted):
+- /health                         snapshot version, size, source and load time
+- /node/<id>                      the node (full data) and its neighbors
+- /neighbors?id=&relation=&direction=in|out
+- /ego?id=&radius=1&fields=0&limit=500
+                                  nodes/edges within radius hops; field nodes (shared values such as
+                                  field_type:user) are not expanded through unless fields=1
+- /nodes?type=&field=&value=&limit=&offset=
+                                  type filter and/or documents sharing a field value
+- /wallet/<address>?limit=&offset=
+                                  documents referencing a wallet, grouped by type (shop_config, receipt, ...)
+- /image.png[?id=&radius=]        rendered graph (ego network with id), cached on disk by snapshot version;
+                                  the full graph is rendered in the background and 202 is returned until ready
+
+The snapshot is refreshed every --refresh seconds, either by reloading the graph file when it changes
+(--source file, default) or by fetching and rebuilding from Cosmos through CosmosGraphVisualizer
+(--source cosmos). Queries always see one complete snapshot; a failed refresh keeps the previous one.
+Each response carries X-Graph-Version and X-Query-Time-Us (in-process handling time).
+
+Usage:
+  python graph_query_server.py                             # serves cosmos_graph_full.json / cosmos_graph.json
+  python graph_query_server.py --source cosmos --refresh 900 --prerender
+  curl "http://127.0.0.1:8787/wallet/0x6c28067a2D4F10013FbBb8534aCd76Ab43A4fF9f"
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from visualize_cosmos_graph import (
+    CosmosGraphVisualizer, GraphIndex, GRAPH_FILE, EXPORT_FILE, graph_from_data
+)
+
+WALLET_RE = re.compile(r'^0x[0-9a-fA-F]{40}$')
+IMAGE_CACHE_DIR = os.path.join('tmp', 'graph_render_cache')
+MAX_CACHED_IMAGES = 200
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 5000
+MAX_RADIUS = 3
+
+
+def _summary(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: node[k] for k in ('id', 'type', 'label', 'node_class', 'field_name', 'field_value') if k in node}
+
+
+class GraphSnapshot:
+    """One immutable, fully indexed version of the graph."""
+
+    def __init__(self, graph_data: Dict[str, Any], version: str, source: str):
+        self.graph_data = graph_data
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+        self.index = GraphIndex(graph_data)
+        self.wallets = self._index_wallets()
+
+    def _index_wallets(self) -> Dict[str, List[Tuple[str, str]]]:
+        """wallet -> sorted [(node id, field)], from wallet-valued document fields and wallet field nodes."""
+        wallets: Dict[str, Dict[str, str]] = {}
+        for node_id, node in self.index.nodes.items():
+            if node.get('node_class') == 'field':
+                value = str(node.get('field_value', ''))
+                if WALLET_RE.match(value):
+                    for edge in self.index.in_edges.get(node_id, []):
+                        wallets.setdefault(value.lower(), {})[edge['source']] = node.get('field_name', '')
+                continue
+            data = node.get('data')
+            if isinstance(data, dict):
+                for key, value in data.items():
+                    if isinstance(value, str) and WALLET_RE.match(value):
+                        wallets.setdefault(value.lower(), {})[node_id] = key
+        return {wallet: sorted(refs.items()) for wallet, refs in wallets.items()}
+
+    def ego(self, center: str, radius: int, expand_fields: bool, limit: int) -> Dict[str, Any]:
+        depth = {center: 0}
+        queue = deque([center])
+        truncated = False
+        while queue and not truncated:
+            node_id = queue.popleft()
+            d = depth[node_id]
+            if d >= radius:
+                continue
+            if node_id != center and not expand_fields and self.index.nodes.get(node_id, {}).get('node_class') == 'field':
+                continue
+            for n in self.index.neighbors(node_id):
+                other = n['node']
+                if other not in depth:
+                    if len(depth) >= limit:
+                        truncated = True
+                        break
+                    depth[other] = d + 1
+                    queue.append(other)
+        edges = [e for node_id in depth for e in self.index.out_edges.get(node_id, []) if e['target'] in depth]
+        nodes = [dict(_summary(self.index.nodes.get(n, {'id': n})), depth=d) for n, d in depth.items()]
+        return {'center': center, 'radius': radius, 'nodes': nodes, 'edges': edges, 'truncated': truncated}
+
+
+class GraphService:
+    """Holds the current snapshot, refreshes it in the background and renders cached images."""
+
+    def __init__(self, source: str, graph_path: str, refresh: float, max_items: int, prerender: bool,
+                 cache_dir: str = IMAGE_CACHE_DIR):
+        self.source = source
+        self.graph_path = graph_path
+        self.refresh_interval = refresh
+        self.max_items = max_items
+        self.prerender = prerender
+        self.cache_dir = cache_dir
+        self.snapshot: Optional[GraphSnapshot] = None
+        self._file_stamp: Optional[Tuple[int, int]] = None
+        self._render_lock = threading.Lock()   # matplotlib is not thread safe
+        self._rendering: set = set()
+        self._stop = threading.Event()
+
+    def load(self) -> bool:
+        """Load a new snapshot if the source changed. Returns True if the snapshot was replaced."""
+        if self.source == 'cosmos':
+            visualizer = CosmosGraphVisualizer()
+            items = visualizer.fetch_data(max_items=self.max_items)
+            if not items:
+                raise ValueError('Cosmos returned no documents')
+            visualizer.build_graph(items)
+            graph_data = visualizer.to_graph_data()
+            raw = json.dumps(graph_data, sort_keys=True, default=str).encode('utf-8')
+        else:
+            st = os.stat(self.graph_path)
+            stamp = (st.st_size, st.st_mtime_ns)
+            if stamp == self._file_stamp:
+                return False
+            with open(self.graph_path, 'rb') as f:
+                raw = f.read()
+            graph_data = json.loads(raw)
+            self._file_stamp = stamp
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        if self.snapshot is not None and self.snapshot.version == version:
+            return False
+        # Built completely before the swap, so requests never see a half-indexed graph
+        self.snapshot = GraphSnapshot(graph_data, version, self.source)
+        print(f"✓ Loaded graph {version}: {len(graph_data['nodes'])} nodes, {len(graph_data['edges'])} edges")
+        if self.prerender:
+            self.render_async(self.snapshot, None, 1, False)
+        return True
+
+    def refresh_forever(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.load()
+            except Exception as e:  # keep serving the previous snapshot
+                print(f"✗ Refresh failed, keeping {self.snapshot.version if self.snapshot else 'nothing'}: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # Rendering
+
+    def image_path(self, snapshot: GraphSnapshot, center: Optional[str], radius: int, fields: bool) -> str:
+        key = hashlib.sha1(f'{snapshot.version}|{center}|{radius}|{fields}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{key}.png')
+
+    def render(self, snapshot: GraphSnapshot, center: Optional[str], radius: int, fields: bool) -> str:
+        path = self.image_path(snapshot, center, radius, fields)
+        if os.path.exists(path):
+            return path
+        if center is None:
+            graph_data = snapshot.graph_data
+        else:
+            ego = snapshot.ego(center, radius, fields, MAX_LIMIT)
+            graph_data = {'metadata': snapshot.graph_data.get('metadata', {}), 'edges': ego['edges'],
+                          'nodes': [snapshot.index.nodes.get(n['id'], {'id': n['id']}) for n in ego['nodes']]}
+        with self._render_lock:
+            if os.path.exists(path):
+                return path
+            visualizer = CosmosGraphVisualizer(connect=False)
+            metadata = graph_data.get('metadata', {})
+            visualizer.database_id = metadata.get('database', visualizer.database_id)
+            visualizer.container_id = metadata.get('container', visualizer.container_id)
+            visualizer.node_types = dict(metadata.get('node_types', {}))
+            visualizer.graph = graph_from_data(graph_data)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path[:-len('.png')] + '.tmp.png'
+            visualizer.visualize_dynamic(output_file=tmp_path, show=False)
+            os.replace(tmp_path, path)
+            self._prune_cache()
+        return path
+
+    def render_async(self, snapshot: GraphSnapshot, center: Optional[str], radius: int, fields: bool) -> None:
+        key = self.image_path(snapshot, center, radius, fields)
+        if key in self._rendering:
+            return
+        self._rendering.add(key)
+
+        def run():
+            try:
+                self.render(snapshot, center, radius, fields)
+            except Exception as e:
+                print(f"✗ Render failed: {e}")
+            finally:
+                self._rendering.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _prune_cache(self) -> None:
+        files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.png')]
+        if len(files) > MAX_CACHED_IMAGES:
+            for f in sorted(files, key=os.path.getmtime)[:len(files) - MAX_CACHED_IMAGES]:
+                os.remove(f)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _int_param(params: Dict[str, List[str]], name: str, default: int, low: int, high: int) -> int:
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise BadRequest(f'{name} must be an integer')
+    return max(low, min(high, value))
+
+
+def _param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[0] if values else None
+
+
+def handle_query(service: GraphService, path: str, params: Dict[str, List[str]]) -> Tuple[int, Any]:
+    """Route one request against the current snapshot. Returns (status, payload or image path)."""
+    snapshot = service.snapshot
+    if snapshot is None:
+        return 503, {'error': 'graph not loaded yet'}
+    index = snapshot.index
+
+    if path == '/health':
+        return 200, {'status': 'ok', 'version': snapshot.version, 'source': snapshot.source,
+                     'loaded_at': snapshot.loaded_at, 'nodes': len(index.nodes),
+                     'edges': len(snapshot.graph_data['edges']), 'wallets': len(snapshot.wallets)}
+
+    if path.startswith('/node/'):
+        node_id = unquote(path[len('/node/'):])
+        node = index.nodes.get(node_id)
+        if node is None:
+            return 404, {'error': f'no node {node_id}'}
+        return 200, {'node': node, 'neighbors': index.neighbors(node_id)}
+
+    if path == '/neighbors':
+        node_id = _param(params, 'id')
+        if node_id not in index.nodes:
+            return 404, {'error': f'no node {node_id}'}
+        relation, direction = _param(params, 'relation'), _param(params, 'direction')
+        neighbors = [n for n in index.neighbors(node_id)
+                     if (relation is None or n['relation'] == relation) and (direction is None or n['direction'] == direction)]
+        return 200, {'id': node_id, 'neighbors': neighbors}
+
+    if path == '/ego':
+        node_id = _param(params, 'id')
+        if node_id not in index.nodes:
+            return 404, {'error': f'no node {node_id}'}
+        radius = _int_param(params, 'radius', 1, 1, MAX_RADIUS)
+        limit = _int_param(params, 'limit', 500, 1, MAX_LIMIT)
+        return 200, snapshot.ego(node_id, radius, _param(params, 'fields') == '1', limit)
+
+    if path == '/nodes':
+        node_type, field, value = _param(params, 'type'), _param(params, 'field'), _param(params, 'value')
+        if field is not None and value is None:
+            raise BadRequest('field needs a value')
+        limit = _int_param(params, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        offset = _int_param(params, 'offset', 0, 0, sys.maxsize)
+        matches = index.find(node_type=node_type, field=field, value=value)
+        page = matches[offset:offset + limit]
+        return 200, {'total': len(matches), 'offset': offset,
+                     'nodes': [_summary(index.nodes.get(n, {'id': n})) for n in page]}
+
+    if path.startswith('/wallet/'):
+        wallet = unquote(path[len('/wallet/'):]).strip().lower()
+        if not WALLET_RE.match(wallet):
+            raise BadRequest('not a wallet address')
+        limit = _int_param(params, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        offset = _int_param(params, 'offset', 0, 0, sys.maxsize)
+        refs = snapshot.wallets.get(wallet, [])
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for node_id, field in refs[offset:offset + limit]:
+            node = index.nodes.get(node_id, {'id': node_id})
+            by_type.setdefault(node.get('type', 'unknown'), []).append(dict(_summary(node), via=field))
+        return 200, {'wallet': wallet, 'total': len(refs), 'offset': offset, 'documents': by_type}
+
+    if path == '/image.png':
+        center = _param(params, 'id')
+        if center is not None and center not in index.nodes:
+            return 404, {'error': f'no node {center}'}
+        radius = _int_param(params, 'radius', 1, 1, MAX_RADIUS)
+        fields = _param(params, 'fields') == '1'
+        image = service.image_path(snapshot, center, radius, fields)
+        if os.path.exists(image):
+            return 200, image
+        if center is None:
+            # The full graph takes a while to lay out; render it in the background
+            service.render_async(snapshot, None, radius, fields)
+            return 202, {'status': 'rendering', 'version': snapshot.version}
+        return 200, service.render(snapshot, center, radius, fields)
+
+    return 404, {'error': f'unknown endpoint {path}'}
+
+
+def make_handler(service: GraphService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, content_type: str, body: bytes, started: float) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if service.snapshot is not None:
+                self.send_header('X-Graph-Version', service.snapshot.version)
+            self.send_header('X-Query-Time-Us', str(int((time.perf_counter() - started) * 1e6)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            started = time.perf_counter()
+            url = urlsplit(self.path)
+            try:
+                status, payload = handle_query(service, url.path, parse_qs(url.query))
+            except BadRequest as e:
+                status, payload = 400, {'error': str(e)}
+            except Exception as e:
+                status, payload = 500, {'error': str(e)}
+            if isinstance(payload, str):
+                with open(payload, 'rb') as f:
+                    self._send(status, 'image/png', f.read(), started)
+            else:
+                self._send(status, 'application/json', json.dumps(payload, default=str).encode('utf-8'), started)
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Serve graph lookups from an in-memory, periodically refreshed snapshot.')
+    parser.add_argument('--source', choices=['file', 'cosmos'], default='file',
+                        help='Reload the graph file when it changes, or rebuild from Cosmos (default: file)')
+    parser.add_argument('--graph', help=f'Graph file for --source file (default: {GRAPH_FILE}, else {EXPORT_FILE})')
+    parser.add_argument('--refresh', type=float, default=300, help='Seconds between refreshes (default: 300)')
+    parser.add_argument('--max-items', type=int, default=100, help='Cosmos query page size (--source cosmos)')
+    parser.add_argument('--prerender', action='store_true', help='Render the full graph image after every refresh')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    args = parser.parse_args(argv)
+
+    graph_path = args.graph or (GRAPH_FILE if os.path.exists(GRAPH_FILE) else EXPORT_FILE)
+    service = GraphService(args.source, graph_path, args.refresh, args.max_items, args.prerender)
+    try:
+        service.load()
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    threading.Thread(target=service.refresh_forever, daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    host, port = server.server_address[:2]
+    print(f"✓ Graph query service on http://{host}:{port} (refresh every {args.refresh:g}s, Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Distributor Purchase History Importer
+
+Loads distributor (Sysco) exports such as "Aug 14 2025 01_06 PM.csv" and
+"Shop_Purchase History_066_942863 (1).csv" into the PortalPay Cosmos container.
+
+The files are record-typed CSV: an H row starts a section (an order, or a purchase-history list), the
+F row that follows names the columns, and each P row is one product. Files are parsed row by row (only
+one section and one entry per SUPC are held in memory) and mapped to documents:
+
+- inventory_item  id "inventory:<SUPC>" (same id the inventory API derives from the SKU), one per product.
+  New items get name/price/category from the file; for existing items only costUsd and
+  attributes.distributor are refreshed, so merchant edits (price, stock, images) are kept. Per-lb
+  items carry their per-pound price in attributes.distributor only (no priceUsd/costUsd).
+- purchase        id "purchase:<opco>-<invoice #>", one per order section, with its lines.
+
+Documents are grouped by partition key (wallet) into transactional batches of up to 100 upserts, run
+concurrently. Existing documents are read first (one read_items call per batch) and unchanged ones are
+skipped, so re-importing the same files writes nothing.
+
+--dry-run runs against a local stand-in container persisted in tmp/cosmos_dry_run.json instead of Cosmos.
+
+Usage:
+  python import_distributor_csv.py "Aug 14 2025 01_06 PM.csv" --wallet 0xabc...
+  python import_distributor_csv.py *.csv --wallet 0xabc... --dry-run
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DISTRIBUTOR = "sysco"
+PARTITION_KEY = "wallet"
+BATCH_LIMIT = 100  # Cosmos transactional batch limit (operations per batch)
+DRY_RUN_STORE = os.path.join("tmp", "cosmos_dry_run.json")
+
+
+def _money(value: str) -> Optional[float]:
+    """'71.48' -> 71.48; '', 'MARKET' -> None."""
+    try:
+        return round(float(value), 4)
+    except ValueError:
+        return None
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _order_time(value: str) -> Optional[str]:
+    try:
+        return datetime.strptime(value.strip(), "%b %d %Y %I:%M %p").isoformat()
+    except ValueError:
+        return None
+
+
+def _date(value: str) -> Optional[str]:
+    try:
+        return datetime.strptime(value.strip(), "%m/%d/%Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def _compact(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in doc.items() if v is not None and v != ""}
+
+
+def iter_sections(path: str) -> Iterator[Tuple[List[str], List[Dict[str, str]]]]:
+    """Yield (H row, [P rows keyed by the F row's column names]) for each section, reading one row at a time."""
+    header: Optional[List[str]] = None
+    columns: List[str] = []
+    products: List[Dict[str, str]] = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            kind = row[0].strip()
+            if kind == "H":
+                if header is not None:
+                    yield header, products
+                header, columns, products = row, [], []
+            elif kind == "F":
+                columns = [c.strip() for c in row]
+            elif kind == "P":
+                if not columns:
+                    raise ValueError(f"{path}: P row before any F row")
+                products.append({c: v.strip() for c, v in zip(columns, row) if c})
+    if header is not None:
+        yield header, products
+
+
+def inventory_doc(product: Dict[str, str], wallet: str, now: int) -> Dict[str, Any]:
+    supc = product["SUPC"]
+    case_price, each_price = _money(product.get("Case $", "")), _money(product.get("Each $", ""))
+    pack = product.get("Pack/Size") or "/".join(p for p in (product.get("Pack"), product.get("Size")) if p)
+    per_lb = product.get("Per Lb") == "Y"
+    # Per-lb (catch-weight) items are priced per pound, not per case: that price stays in attributes only
+    price = None if per_lb else case_price if case_price is not None else each_price
+    return _compact({
+        "id": f"inventory:{supc}",
+        "type": "inventory_item",
+        "wallet": wallet,
+        "sku": supc,
+        "name": product.get("Description") or product.get("Desc") or supc,
+        "priceUsd": price,
+        "currency": "USD",
+        "stockQty": 0,
+        "category": product.get("Cat"),
+        "costUsd": price,
+        "taxable": False,
+        "industryPack": "general",
+        "attributes": {"distributor": _compact({
+            "name": DISTRIBUTOR,
+            "supc": supc,
+            "brand": product.get("Brand"),
+            "packSize": pack,
+            "mfrNumber": product.get("Mfr #"),
+            "perLb": per_lb,
+            "casePriceUsd": case_price,
+            "eachPriceUsd": each_price,
+            "marketPrice": "MARKET" in (product.get("Case $"), product.get("Each $"), product.get("Market")),
+        })},
+        "createdAt": now,
+        "updatedAt": now,
+    })
+
+
+def purchase_doc(header: List[str], products: List[Dict[str, str]], wallet: str, source: str,
+                 now: int) -> Optional[Dict[str, Any]]:
+    """Order sections (H list type O...) become purchase documents; purchase-history lists do not."""
+    if len(header) < 14 or not header[1].startswith("O"):
+        return None
+    opco, invoice = header[2], header[9] or header[10]
+    lines = [_compact({
+        "supc": p["SUPC"],
+        "description": p.get("Description"),
+        "brand": p.get("Brand"),
+        "packSize": p.get("Pack/Size"),
+        "caseQty": _int(p.get("Case Qty", "")),
+        "splitQty": _int(p.get("Split Qty", "")),
+        "casePriceUsd": _money(p.get("Case $", "")),
+        "eachPriceUsd": _money(p.get("Each $", "")),
+    }) for p in products]
+    return _compact({
+        "id": f"purchase:{opco}-{invoice}",
+        "type": "purchase",
+        "wallet": wallet,
+        "distributor": DISTRIBUTOR,
+        "opco": opco,
+        "customerNumber": header[3],
+        "invoiceNumber": invoice,
+        "orderedAt": _order_time(header[4]),
+        "deliveryDate": _date(header[5]),
+        "totalUsd": _money(header[11]),
+        "totalQty": _int(header[12]),
+        "status": header[13].strip(),
+        "lines": lines,
+        "sourceFile": os.path.basename(source),
+        "createdAt": now,
+        "updatedAt": now,
+    })
+
+
+def iter_documents(paths: List[str], wallet: str) -> Iterator[Dict[str, Any]]:
+    """Purchases as their sections are read, then one inventory item per SUPC.
+
+    A SUPC often appears in several exports (order lists and the purchase-history list); its rows are
+    combined, later non-empty values winning, so each item is written once and re-imports are no-ops.
+    """
+    now = int(time.time() * 1000)
+    items: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        for header, products in iter_sections(path):
+            for product in products:
+                if not product.get("SUPC"):
+                    continue
+                doc = inventory_doc(product, wallet, now)
+                previous = items.get(doc["id"])
+                if previous:
+                    distributor = {**previous["attributes"]["distributor"], **doc["attributes"]["distributor"]}
+                    doc = {**previous, **doc, "attributes": {"distributor": distributor}}
+                items[doc["id"]] = doc
+            purchase = purchase_doc(header, products, wallet, path, now)
+            if purchase:
+                yield purchase
+    for doc in items.values():
+        doc.setdefault("priceUsd", 0)
+        yield doc
+
+
+def merge(existing: Optional[Dict[str, Any]], incoming: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Document to write, or None if existing already has the imported values."""
+    if existing is None:
+        return incoming
+    doc = {k: v for k, v in existing.items() if not k.startswith("_")}
+    if incoming["type"] == "inventory_item":
+        attributes = dict(doc.get("attributes") or {})
+        attributes["distributor"] = incoming["attributes"]["distributor"]
+        owned = {"costUsd": incoming.get("costUsd"), "attributes": attributes}
+    else:
+        owned = {k: v for k, v in incoming.items() if k not in ("createdAt", "updatedAt")}
+    if all(doc.get(k) == v for k, v in owned.items()):
+        return None
+    doc.update(owned)
+    if doc.get("costUsd") is None:
+        doc.pop("costUsd", None)
+    doc["updatedAt"] = incoming["updatedAt"]
+    return doc
+
+
+class LocalContainer:
+    """Dry-run stand-in for a ContainerProxy: read_items / execute_item_batch over a JSON file."""
+
+    def __init__(self, path: str = DRY_RUN_STORE):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._items: Dict[str, Dict[str, Dict]] = json.load(f)
+        except (OSError, ValueError):
+            self._items = {}
+
+    def read_items(self, items: List[Tuple[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        with self._lock:
+            found = [self._items.get(str(pk), {}).get(item_id) for item_id, pk in items]
+        return [json.loads(json.dumps(d)) for d in found if d is not None]
+
+    def execute_item_batch(self, batch_operations: List[Tuple], partition_key: Any, **kwargs) -> List[Dict]:
+        results = []
+        with self._lock:
+            partition = self._items.setdefault(str(partition_key), {})
+            for operation, (doc,) in batch_operations:
+                if operation != "upsert":
+                    raise ValueError(f"LocalContainer does not support {operation}")
+                results.append({"statusCode": 200 if doc["id"] in partition else 201})
+                partition[doc["id"]] = json.loads(json.dumps(doc))
+        return results
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._items, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class Importer:
+    """Groups documents by partition key and upserts them in concurrent transactional batches."""
+
+    def __init__(self, container, workers: int = 4, partition_key: str = PARTITION_KEY):
+        self.container = container
+        self.partition_key = partition_key
+        self.workers = workers
+        self.stats = {"created": 0, "replaced": 0, "unchanged": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _run_batch(self, pk: Any, docs: List[Dict[str, Any]]) -> None:
+        try:
+            existing = {d["id"]: d for d in self.container.read_items(items=[(d["id"], pk) for d in docs])}
+            writes = []
+            for doc in docs:
+                merged = merge(existing.get(doc["id"]), doc)
+                if merged is None:
+                    self._count("unchanged")
+                else:
+                    writes.append(merged)
+            if not writes:
+                return
+            results = self.container.execute_item_batch([("upsert", (d,)) for d in writes], partition_key=pk)
+            for r in results:
+                self._count("created" if r.get("statusCode") == 201 else "replaced")
+        except Exception as e:  # CosmosHttpResponseError / CosmosBatchOperationError: report and continue
+            print(f"  Error: batch of {len(docs)} for {self.partition_key}={pk}: {getattr(e, 'message', e)}")
+            self._count("failed", len(docs))
+
+    def run(self, documents: Iterator[Dict[str, Any]]) -> Dict[str, int]:
+        pending: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+        in_flight: Dict[str, Future] = {}   # doc id -> batch writing it
+        futures: set = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(pk: Any) -> None:
+                docs = list(pending.pop(pk).values())
+                # The same id must not be written by two concurrent batches (later rows win)
+                wait([in_flight[d["id"]] for d in docs if d["id"] in in_flight])
+                future = pool.submit(self._run_batch, pk, docs)
+                futures.add(future)
+                for d in docs:
+                    in_flight[d["id"]] = future
+                # Bound memory: keep at most 2 batches per worker queued
+                while len(futures) >= 2 * self.workers:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    futures.difference_update(done)
+
+            for doc in documents:
+                pk = doc[self.partition_key]
+                batch = pending.setdefault(pk, {})
+                batch[doc["id"]] = doc
+                if len(batch) >= BATCH_LIMIT:
+                    submit(pk)
+            for pk in list(pending):
+                submit(pk)
+            wait(futures)
+        return self.stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import distributor H/F/P purchase-history CSVs into Cosmos.")
+    parser.add_argument("files", nargs="+", help="Distributor CSV exports")
+    parser.add_argument("--wallet", required=True, help="Merchant wallet the items belong to (partition key)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent batches (default: 4)")
+    parser.add_argument("--dry-run", action="store_true", help=f"Write to a local stand-in ({DRY_RUN_STORE})")
+    parser.add_argument("--store", default=DRY_RUN_STORE, help="Stand-in file for --dry-run")
+    args = parser.parse_args(argv)
+
+    wallet = args.wallet.strip().lower()
+    try:
+        if args.dry_run:
+            container = LocalContainer(args.store)
+        else:
+            from visualize_cosmos_graph import connect_cosmos
+            container = connect_cosmos()["container"]
+        started = time.time()
+        stats = Importer(container, max(1, args.workers)).run(iter_documents(args.files, wallet))
+        if args.dry_run:
+            container.save()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    target = f"local stand-in {args.store}" if args.dry_run else "Cosmos"
+    print(f"Imported into {target} in {time.time() - started:.2f}s: " +
+          ", ".join(f"{v} {k}" for k, v in stats.items()))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
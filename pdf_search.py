@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+PDF Keyword Search
+
+Searches vendor PDFs (e.g. "Bear Cloud API (Ver 0.0.1) Oct'24.pdf", SDK manuals) for terms and prints
+the matching lines with surrounding context, page by page.
+
+- Pages are extracted with PyPDF2 in parallel worker processes (each worker opens the PDF once and
+  extracts a contiguous page range).
+- Per-page text and an inverted index (lowercased word -> line positions) are cached in
+  tmp/.pdf_cache/<sha256>.json, keyed by the PDF's content hash, so repeat queries skip extraction
+  entirely; a path -> (size, mtime, sha256) map avoids rehashing unchanged files.
+- A term matches a line that contains it (case-insensitive substring, whitespace runs collapsed); candidate lines come
+  from the index, so queries do not rescan the text.
+
+Usage:
+  python pdf_search.py "Bear Cloud API (Ver 0.0.1) Oct'24.pdf" -t init -t connect -t printerapi
+  python pdf_search.py manuals/ -t "print bitmap" --context 3
+  python pdf_search.py manuals/ --build     # extract and cache only
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import PyPDF2
+except ImportError:
+    print("Error: PyPDF2 is required. Install with: pip install PyPDF2")
+    sys.exit(1)
+
+CACHE_DIR = os.path.join("tmp", ".pdf_cache")
+PATHS_FILE = "paths.json"
+CACHE_VERSION = 1
+WORD_RE = re.compile(r"\w+")
+
+
+class Match(NamedTuple):
+    pdf: str
+    page: int        # 1-based
+    line: int        # 0-based within the page
+    term: str
+    context: List[Tuple[int, str]]
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def find_pdfs(paths: List[str]) -> List[str]:
+    pdfs = []
+    for p in paths:
+        if os.path.isdir(p):
+            for dirpath, _, filenames in os.walk(p):
+                pdfs.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.lower().endswith(".pdf"))
+        else:
+            pdfs.append(p)
+    return pdfs
+
+
+def _extract_range(args: Tuple[str, int, int]) -> List[str]:
+    """Extract pages [start, end) of one PDF (runs in a worker process)."""
+    path, start, end = args
+    with open(path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def extract_pages(path: str, pool: Optional[ProcessPoolExecutor], workers: int) -> List[str]:
+    with open(path, "rb") as f:
+        page_count = len(PyPDF2.PdfReader(f).pages)
+    if pool is None or page_count < 2:
+        return _extract_range((path, 0, page_count))
+    per_range = max(1, -(-page_count // workers))
+    ranges = [(path, s, min(s + per_range, page_count)) for s in range(0, page_count, per_range)]
+    pages: List[str] = []
+    for chunk in pool.map(_extract_range, ranges):
+        pages.extend(chunk)
+    return pages
+
+
+def build_index(pages: List[str]) -> Dict[str, List[int]]:
+    """word -> flat [page, line, page, line, ...] positions (0-based page), each line listed once per word."""
+    index: Dict[str, List[int]] = {}
+    for p, text in enumerate(pages):
+        for n, line in enumerate(text.split("\n")):
+            for word in set(WORD_RE.findall(line.lower())):
+                index.setdefault(word, []).extend((p, n))
+    return index
+
+
+class PdfCache:
+    """Per-PDF page text + index, stored by content hash."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self._paths_file = os.path.join(cache_dir, PATHS_FILE)
+        try:
+            with open(self._paths_file, "r", encoding="utf-8") as f:
+                self._paths = json.load(f)
+        except (OSError, ValueError):
+            self._paths = {}
+        self._dirty = False
+
+    def sha256_of(self, path: str) -> str:
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        known = self._paths.get(key)
+        if known and known["size"] == st.st_size and known["mtime"] == st.st_mtime:
+            return known["sha256"]
+        sha = file_sha256(path)
+        self._paths[key] = {"size": st.st_size, "mtime": st.st_mtime, "sha256": sha}
+        self._dirty = True
+        return sha
+
+    def _entry_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, f"{sha}.json")
+
+    def load(self, sha: str) -> Optional[Dict]:
+        try:
+            with open(self._entry_path(sha), "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return doc if doc.get("version") == CACHE_VERSION else None
+
+    def store(self, sha: str, source: str, pages: List[str]) -> Dict:
+        doc = {"version": CACHE_VERSION, "sha256": sha, "source": source, "pages": pages,
+               "index": build_index(pages)}
+        path = self._entry_path(sha)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        os.replace(path + ".tmp", path)
+        return doc
+
+    def save_paths(self) -> None:
+        if self._dirty:
+            with open(self._paths_file + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._paths, f, indent=2)
+            os.replace(self._paths_file + ".tmp", self._paths_file)
+            self._dirty = False
+
+
+def load_documents(pdfs: List[str], cache: PdfCache, jobs: Optional[int] = None) -> Dict[str, Dict]:
+    """pdf path -> cached document, extracting (in parallel) only PDFs not in the cache."""
+    docs: Dict[str, Dict] = {}
+    missing: List[Tuple[str, str]] = []
+    for pdf in pdfs:
+        sha = cache.sha256_of(pdf)
+        doc = cache.load(sha)
+        if doc is None:
+            missing.append((pdf, sha))
+        else:
+            docs[pdf] = doc
+    if missing:
+        workers = max(1, jobs or os.cpu_count() or 1)
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for pdf, sha in missing:
+                print(f"  Extracting {pdf}...")
+                docs[pdf] = cache.store(sha, os.path.basename(pdf), extract_pages(pdf, pool, workers))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    cache.save_paths()
+    return docs
+
+
+def _candidates(doc: Dict, term: str) -> List[Tuple[int, int]]:
+    """(page, line) positions that contain every word of term, via the index."""
+    words = WORD_RE.findall(term.lower())
+    if not words:
+        return []
+    index = doc["index"]
+    result = None
+    for word in words:
+        # Substring semantics: "init" also matches "initialize" / "uninit"
+        positions = set()
+        for k in (k for k in index if word in k):
+            flat = index[k]
+            positions.update(zip(flat[0::2], flat[1::2]))
+        result = positions if result is None else result & positions
+        if not result:
+            return []
+    return sorted(result)
+
+
+def search_document(pdf: str, doc: Dict, terms: List[str], context: int) -> List[Match]:
+    lines_by_page: Dict[int, List[str]] = {}
+    matches = []
+    for term in terms:
+        # PyPDF2 often emits runs of spaces between words, so compare with whitespace collapsed
+        needle = " ".join(term.lower().split())
+        for page, line in _candidates(doc, term):
+            lines = lines_by_page.get(page)
+            if lines is None:
+                lines = lines_by_page[page] = doc["pages"][page].split("\n")
+            if needle not in " ".join(lines[line].lower().split()):
+                continue
+            start, end = max(0, line - context), min(len(lines), line + context + 1)
+            matches.append(Match(pdf, page + 1, line, term, [(j, lines[j].strip()) for j in range(start, end)]))
+    matches.sort(key=lambda m: (m.page, m.line))
+    return matches
+
+
+def search(pdfs: List[str], terms: List[str], context: int = 1, jobs: Optional[int] = None,
+           cache_dir: str = CACHE_DIR) -> List[Match]:
+    docs = load_documents(pdfs, PdfCache(cache_dir), jobs)
+    matches = []
+    for pdf in pdfs:
+        matches.extend(search_document(pdf, docs[pdf], terms, context))
+    return matches
+
+
+def print_matches(matches: List[Match]) -> None:
+    seen = set()
+    for m in matches:
+        # A line matching several terms is printed once
+        if (m.pdf, m.page, m.line) in seen:
+            continue
+        seen.add((m.pdf, m.page, m.line))
+        print(f"{m.pdf} p.{m.page} [{m.term}]")
+        for j, text in m.context:
+            print(f"  [{j}]: {text}")
+        print("---")
+    print(f"{len(seen)} matching lines")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search PDFs for terms using a cached per-page text index.")
+    parser.add_argument("paths", nargs="+", help="PDF files and/or folders of PDFs")
+    parser.add_argument("-t", "--term", action="append", default=[], help="Term to search for (repeatable)")
+    parser.add_argument("--context", type=int, default=1, help="Lines of context around each match (default: 1)")
+    parser.add_argument("--jobs", type=int, help="Worker processes for extraction (default: CPU count)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"Cache folder (default: {CACHE_DIR})")
+    parser.add_argument("--build", action="store_true", help="Only extract and cache, no search")
+    parser.add_argument("--json", action="store_true", help="Print matches as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.term and not args.build:
+        parser.error("give at least one --term (or --build)")
+    try:
+        pdfs = find_pdfs(args.paths)
+        if args.build:
+            docs = load_documents(pdfs, PdfCache(args.cache_dir), args.jobs)
+            for pdf, doc in docs.items():
+                print(f"  {pdf}: {len(doc['pages'])} pages, {len(doc['index'])} words")
+            return 0
+        matches = search(pdfs, args.term, args.context, args.jobs, args.cache_dir)
+    except (OSError, PyPDF2.errors.PdfReadError) as e:
+        print(f"Error: {e}")
+        return 1
+    if args.json:
+        print(json.dumps([m._asdict() for m in matches], indent=2))
+    else:
+        print_matches(matches)
+    return 0 if matches else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
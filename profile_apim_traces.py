@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+APIM Trace Latency Profiler
+
+Reads APIM request traces (tmp.apim-trace.*.json, as saved from the Ocp-Apim-Trace-Location URL) and
+turns their cumulative `elapsed` timestamps into per-policy-step latencies:
+
+- each trace entry is charged the time since the previous entry, and entries are grouped by
+  section:source (inbound:rate-limit-by-key, inbound:choose, outbound:quota-by-key, ...), summed per trace
+- backend time is the backend section plus the gap before the first outbound entry (the wait for the
+  backend response); traces answered by return-response in inbound have no backend time
+- gateway time is everything else
+
+Traces are read one at a time (files, directories, globs, or JSONL files with one trace per line), so
+only the per-step numbers are kept in memory. The report gives p50/p90/p99/max per step and per
+operation, and flags the policy steps that dominate the slowest 1% of traces.
+
+Usage:
+  python profile_apim_traces.py
+  python profile_apim_traces.py traces/ --json tmp/apim-trace-profile.json
+  python profile_apim_traces.py "tmp.apim-trace.site-config*.json" --tail-share 0.1
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_PATTERN = "tmp.apim-trace.*.json"
+SECTIONS = ["inbound", "backend", "outbound", "on-error"]
+BACKEND_STEP = "backend"  # step key for the backend round trip (not a gateway policy)
+TAIL_PERCENTILE = 99
+DEFAULT_TAIL_SHARE = 0.2
+
+
+def elapsed_ms(value: str) -> float:
+    """'00:00:00.0003204' (hh:mm:ss.fffffff) -> milliseconds."""
+    h, m, s = value.split(":")
+    return (int(h) * 3600 + int(m) * 60 + float(s)) * 1000.0
+
+
+def find_trace_files(paths: List[str]) -> List[str]:
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(glob.glob(os.path.join(p, "*.json")) + glob.glob(os.path.join(p, "*.jsonl"))))
+        elif os.path.exists(p):
+            files.append(p)
+        else:
+            files.extend(sorted(glob.glob(p)))
+    return files
+
+
+def iter_traces(files: List[str]) -> Iterator[Tuple[str, Dict]]:
+    """Yield (label, trace) one at a time; JSONL files yield one trace per line."""
+    for path in files:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if path.endswith(".jsonl"):
+                    for n, line in enumerate(f, 1):
+                        if line.strip():
+                            yield f"{path}:{n}", json.loads(line)
+                else:
+                    data = json.load(f)
+                    for i, trace in enumerate(data if isinstance(data, list) else [data]):
+                        yield path if not isinstance(data, list) else f"{path}[{i}]", trace
+        except (OSError, ValueError) as e:
+            print(f"  Skipping {path}: {e}")
+
+
+def operation_of(trace: Dict) -> str:
+    """'GET /portalpay/api/inventory' from the api-inspector request entry."""
+    for entry in trace.get("traceEntries", {}).get("inbound", []):
+        data = entry.get("data")
+        if entry.get("source") == "api-inspector" and isinstance(data, dict) and "request" in data:
+            url = data["request"].get("url", "")
+            path = url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0]
+            return f"{data['request'].get('method', '?')} /{path}"
+    return "unknown"
+
+
+def profile_trace(trace: Dict) -> Dict:
+    """Per-step, backend and gateway milliseconds for one trace (steps, including BACKEND_STEP, sum to total_ms)."""
+    entries = trace.get("traceEntries", {})
+    steps: Dict[str, float] = {}
+    backend = 0.0
+    previous = 0.0
+    returned_early = any(e.get("source") == "return-response" for e in entries.get("inbound", []))
+    after_inbound = False
+
+    for section in SECTIONS:
+        for entry in entries.get(section, []):
+            at = elapsed_ms(entry["elapsed"])
+            delta = max(0.0, at - previous)
+            previous = max(previous, at)
+            # The first entry after inbound absorbs the backend round trip; it is booked as the backend
+            # step rather than to that entry's policy, so the steps add up to total_ms
+            if not returned_early and (section == "backend" or (section != "inbound" and not after_inbound)):
+                backend += delta
+                key = BACKEND_STEP
+            else:
+                key = f"{section}:{entry.get('source', '?')}"
+            steps[key] = steps.get(key, 0.0) + delta
+            if section != "inbound":
+                after_inbound = True
+    return {
+        "trace_id": trace.get("traceId"),
+        "operation": operation_of(trace),
+        "total_ms": previous,
+        "backend_ms": backend,
+        "gateway_ms": previous - backend,
+        "steps": steps,
+    }
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(values) -> Dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0,
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+    }
+
+
+def profile_traces(traces: Iterator[Tuple[str, Dict]], tail_share: float = DEFAULT_TAIL_SHARE) -> Dict:
+    """Aggregate per-step / per-operation latency distributions and find the p99 drivers."""
+    totals, backends, gateways = array("d"), array("d"), array("d")
+    step_values: Dict[str, array] = {}
+    by_operation: Dict[str, array] = {}
+    # Each trace's steps are kept as a compact row indexed by step_index, for the tail analysis
+    step_index: Dict[str, int] = {}
+    rows: List[Tuple[float, array]] = []
+    skipped = 0
+
+    for label, trace in traces:
+        try:
+            p = profile_trace(trace)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            print(f"  Skipping {label}: {e}")
+            skipped += 1
+            continue
+        totals.append(p["total_ms"])
+        backends.append(p["backend_ms"])
+        gateways.append(p["gateway_ms"])
+        by_operation.setdefault(p["operation"], array("d")).append(p["total_ms"])
+        row = array("d")
+        for step, ms in p["steps"].items():
+            step_values.setdefault(step, array("d")).append(ms)
+            i = step_index.setdefault(step, len(step_index))
+            row.extend([0.0] * (i + 1 - len(row)))
+            row[i] = ms
+        rows.append((p["total_ms"], row))
+
+    report = {
+        "traces": len(totals),
+        "skipped": skipped,
+        "total_ms": summarize(totals),
+        "backend_ms": summarize(backends),
+        "gateway_ms": summarize(gateways),
+        "operations": {op: summarize(v) for op, v in sorted(by_operation.items())},
+        "steps": {s: summarize(v) for s, v in step_values.items()},
+        "p99_drivers": [],
+    }
+    if not rows:
+        return report
+
+    # Tail = traces at or above the overall p99; a step "dominates" when it carries a large share of tail time
+    threshold = report["total_ms"]["p99"]
+    tail = [row for total, row in rows if total >= threshold]
+    tail_time = sum(total for total, _ in rows if total >= threshold) or 1.0
+    for step, i in step_index.items():
+        step_tail = sum(row[i] for row in tail if i < len(row))
+        share = step_tail / tail_time
+        median = report["steps"][step]["p50"]
+        tail_mean = step_tail / len(tail)
+        if share >= tail_share:
+            report["p99_drivers"].append({
+                "step": step,
+                "tail_share": share,
+                "tail_mean_ms": tail_mean,
+                "overall_p50_ms": median,
+                "slowdown": tail_mean / median if median else None,
+            })
+    report["p99_drivers"].sort(key=lambda d: d["tail_share"], reverse=True)
+    report["tail_traces"] = len(tail)
+    return report
+
+
+def print_report(report: Dict, top: int) -> None:
+    print(f"Profiled {report['traces']} traces" + (f" ({report['skipped']} skipped)" if report["skipped"] else ""))
+    if not report["traces"]:
+        return
+
+    def row(label: str, s: Dict, width: int) -> str:
+        return (f"  {label:<{width}} {s['count']:>7} {s['p50']:>9.3f} {s['p90']:>9.3f} "
+                f"{s['p99']:>9.3f} {s['max']:>9.3f}")
+
+    header = "{:<{w}} {:>7} {:>9} {:>9} {:>9} {:>9}"
+    width = max([30] + [len(s) for s in report["steps"]] + [len(o) for o in report["operations"]])
+    print("  " + header.format("ms", "count", "p50", "p90", "p99", "max", w=width))
+    for key in ("total_ms", "gateway_ms", "backend_ms"):
+        print(row(key[:-3], report[key], width))
+
+    print("\nOperations:")
+    for op, s in sorted(report["operations"].items(), key=lambda kv: kv[1]["p99"], reverse=True):
+        print(row(op, s, width))
+
+    print(f"\nPolicy steps (top {top} by p99):")
+    for step, s in sorted(report["steps"].items(), key=lambda kv: kv[1]["p99"], reverse=True)[:top]:
+        print(row(step, s, width))
+
+    print(f"\nSteps dominating the slowest traces (>= p99 total, {report['tail_traces']} traces):")
+    if not report["p99_drivers"]:
+        print("  none above the share threshold")
+    for d in report["p99_drivers"]:
+        slowdown = f", {d['slowdown']:.1f}x its median" if d["slowdown"] else ""
+        print(f"  {d['step']}: {d['tail_share']:.0%} of tail time, {d['tail_mean_ms']:.3f} ms avg{slowdown}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-policy-step latency profile of APIM traces.")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_PATTERN],
+                        help=f"Trace files, directories, globs or .jsonl files (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--tail-share", type=float, default=DEFAULT_TAIL_SHARE,
+                        help="Flag steps carrying at least this share of p99-tail time (default: 0.2)")
+    parser.add_argument("--top", type=int, default=15, help="Steps to list (default: 15)")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    files = find_trace_files(args.paths)
+    if not files:
+        print(f"No trace files match {' '.join(args.paths)}")
+        return 1
+    report = profile_traces(iter_traces(files), args.tail_share)
+    print_report(report, args.top)
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.json}")
+    return 0 if report["traces"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
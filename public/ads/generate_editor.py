@@ -1,32 +1,63 @@
-import base64
+"""
+Ad Editor Generator
+
+Builds a "Perfect Image Patch Tool" editor page for every ad image (*.png, *.jpg, *.jpeg) under this
+folder (subfolders included), written to editors/<same relative path>.html.
+
+- The image is embedded as a data: URL (bypasses local file CORS), base64-encoded in chunks straight into
+  the output file, so memory stays flat regardless of image size.
+- --max-width / --jpeg-quality embed a downscaled / re-encoded working copy (needs Pillow) instead of the
+  original, which keeps large editors small; the working copies are kept in editors/.work/.
+- editors/.manifest.json records the SHA-256 of each image plus the options used; ads whose image and
+  options are unchanged are skipped (--force rebuilds everything).
+
+Usage:
+  python public/ads/generate_editor.py
+  python public/ads/generate_editor.py --max-width 1200 --jpeg-quality 85
+  python public/ads/generate_editor.py --image linkedin_ad_cannabis.png --out editor.html
+  python public/ads/generate_editor.py --new-text https://surge.basalthq.com/cannabis --old-text surge.basalthq.com/cannabis-pos
+"""
 
-img_path = r"c:\Users\meanp\OneDrive\Documents\HTL Projects\VS Code Projects\portalpay-official\public\ads\linkedin_ad_cannabis.png"
-out_path = r"c:\Users\meanp\OneDrive\Documents\HTL Projects\VS Code Projects\portalpay-official\public\ads\editor.html"
+import os
+import sys
+import json
+import html
+import base64
+import hashlib
+import argparse
 
-with open(img_path, "rb") as f:
-    b64 = base64.b64encode(f.read()).decode("utf-8")
+ADS_DIR = os.path.dirname(os.path.abspath(__file__))
+EDITORS_DIR = "editors"
+WORK_DIR = ".work"
+MANIFEST_FILE = ".manifest.json"
+TEMPLATE_VERSION = 1
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+DEFAULT_OLD_TEXT = "surge.basalthq.com/cannabis-pos"
+DEFAULT_NEW_TEXT = "https://surge.basalthq.com/cannabis"
+# Read size for streaming base64; a multiple of 3 so chunk encodings concatenate into one valid string
+B64_CHUNK = 3 * 256 * 1024
 
-html = f"""<!DOCTYPE html>
+TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
   <title>Ad Editor Tool</title>
   <style>
-    body {{ font-family: sans-serif; padding: 20px; text-align: center; background: #222; color: #fff; }}
-    canvas {{ border: 1px solid #555; cursor: crosshair; max-width: 100%; box-shadow: 0 4px 8px rgba(0,0,0,0.5); }}
-    .controls {{ margin-top: 15px; margin-bottom: 15px; }}
-    button {{ padding: 10px 20px; font-size: 16px; cursor: pointer; border: none; border-radius: 4px; margin: 0 5px; }}
-    .btn-primary {{ background: #4CAF50; color: white; }}
-    .btn-secondary {{ background: #666; color: white; }}
-    .instructions {{ max-width: 800px; margin: 0 auto 20px auto; text-align: left; background: #333; padding: 15px; border-radius: 8px; }}
+    body { font-family: sans-serif; padding: 20px; text-align: center; background: #222; color: #fff; }
+    canvas { border: 1px solid #555; cursor: crosshair; max-width: 100%; box-shadow: 0 4px 8px rgba(0,0,0,0.5); }
+    .controls { margin-top: 15px; margin-bottom: 15px; }
+    button { padding: 10px 20px; font-size: 16px; cursor: pointer; border: none; border-radius: 4px; margin: 0 5px; }
+    .btn-primary { background: #4CAF50; color: white; }
+    .btn-secondary { background: #666; color: white; }
+    .instructions { max-width: 800px; margin: 0 auto 20px auto; text-align: left; background: #333; padding: 15px; border-radius: 8px; }
   </style>
 </head>
 <body>
   <h2>Perfect Image Patch Tool</h2>
-  
+
   <div class="instructions">
     <b>Instructions:</b>
     <ol>
-      <li>Click and drag a box <b>perfectly</b> around the text `surge.basalthq.com/cannabis-pos`.</li>
+      <li>Click and drag a box <b>perfectly</b> around the text `__OLD_TEXT__`.</li>
       <li>Click <b>"Patch It!"</b>.</li>
       <li>Once it looks perfect, <b>Right-click the image -> "Save image as..."</b> and overwrite the file!</li>
     </ol>
@@ -37,127 +68,257 @@ html = f"""<!DOCTYPE html>
     <button class="btn-secondary" onclick="reset()">Reset</button>
     <button class="btn-primary" style="background: #008CBA; margin-left: 20px;" onclick="downloadImage()">⬇️ Download PNG File</button>
   </div>
-  
+
   <canvas id="canvas"></canvas>
 
   <script>
     const canvas = document.getElementById('canvas');
     const ctx = canvas.getContext('2d');
     const img = new Image();
-    
+
     // Base64 to bypass local file CORS constraints!
-    img.src = 'data:image/png;base64,{b64}'; 
-    
+    img.src = 'data:__MIME__;base64,__IMAGE_DATA__';
+
     let box = null;
     let isDrawing = false;
     let startX, startY;
 
-    img.onload = () => {{
+    img.onload = () => {
       canvas.width = img.width;
       canvas.height = img.height;
       ctx.drawImage(img, 0, 0);
-    }};
+    };
 
-    function reset() {{
+    function reset() {
        ctx.drawImage(img, 0, 0);
        box = null;
-    }}
+    }
 
-    canvas.onmousedown = (e) => {{
+    canvas.onmousedown = (e) => {
       const rect = canvas.getBoundingClientRect();
       const scaleX = canvas.width / rect.width;
       const scaleY = canvas.height / rect.height;
-      
+
       startX = (e.clientX - rect.left) * scaleX;
       startY = (e.clientY - rect.top) * scaleY;
       isDrawing = true;
-    }};
+    };
 
-    canvas.onmousemove = (e) => {{
+    canvas.onmousemove = (e) => {
       if (!isDrawing) return;
       reset();
       const rect = canvas.getBoundingClientRect();
       const scaleX = canvas.width / rect.width;
       const scaleY = canvas.height / rect.height;
-      
+
       const currentX = (e.clientX - rect.left) * scaleX;
       const currentY = (e.clientY - rect.top) * scaleY;
-      
+
       ctx.strokeStyle = '#00FF00';
       ctx.lineWidth = 2;
       ctx.strokeRect(startX, startY, currentX - startX, currentY - startY);
-    }};
+    };
 
-    canvas.onmouseup = (e) => {{
+    canvas.onmouseup = (e) => {
       isDrawing = false;
       const rect = canvas.getBoundingClientRect();
       const scaleX = canvas.width / rect.width;
       const scaleY = canvas.height / rect.height;
-      
+
       const currentX = (e.clientX - rect.left) * scaleX;
       const currentY = (e.clientY - rect.top) * scaleY;
-      
-      box = {{
+
+      box = {
         x: Math.min(startX, currentX),
         y: Math.min(startY, currentY),
         w: Math.abs(currentX - startX),
         h: Math.abs(currentY - startY)
-      }};
-    }};
+      };
+    };
 
-    function patch() {{
-      if (!box) {{
+    function patch() {
+      if (!box) {
           alert('Please drag a box around the old text first!');
           return;
-      }}
-      
+      }
+
       // Save it because reset() clears it!
-      const targetBox = {{ ...box }};
-      reset(); 
-      
+      const targetBox = { ...box };
+      reset();
+
       const sliceHeight = 4;
       let sliceY = targetBox.y - sliceHeight - 2;
-      
-      if (sliceY > 0) {{
+
+      if (sliceY > 0) {
           const slice = ctx.getImageData(targetBox.x - 10, sliceY, targetBox.w + 20, sliceHeight);
           const tempCanvas = document.createElement('canvas');
           tempCanvas.width = targetBox.w + 20;
           tempCanvas.height = sliceHeight;
           tempCanvas.getContext('2d').putImageData(slice, 0, 0);
           ctx.drawImage(tempCanvas, 0, 0, targetBox.w + 20, sliceHeight, targetBox.x - 10, targetBox.y - 4, targetBox.w + 20, targetBox.h + 8);
-      }} else {{
+      } else {
           ctx.fillStyle = '#111717';
           ctx.fillRect(targetBox.x - 5, targetBox.y - 2, targetBox.w + 10, targetBox.h + 4);
-      }}
+      }
 
-      ctx.fillStyle = '#b0b5b9'; 
-      ctx.font = '500 ' + (targetBox.h * 0.85) + 'px "Segoe UI", Roboto, sans-serif'; 
+      ctx.fillStyle = '#b0b5b9';
+      ctx.font = '500 ' + (targetBox.h * 0.85) + 'px "Segoe UI", Roboto, sans-serif';
       ctx.textAlign = 'center';
       ctx.textBaseline = 'middle';
       ctx.letterSpacing = '0.5px';
-      
+
       ctx.shadowColor = 'rgba(0,0,0,0.9)';
       ctx.shadowBlur = 6;
       ctx.shadowOffsetX = 0;
       ctx.shadowOffsetY = 2;
-      
-      ctx.fillText('https://surge.basalthq.com/cannabis', targetBox.x + targetBox.w / 2, targetBox.y + targetBox.h / 2 + 1);
-      
+
+      ctx.fillText(__NEW_TEXT__, targetBox.x + targetBox.w / 2, targetBox.y + targetBox.h / 2 + 1);
+
       ctx.shadowColor = 'transparent';
-    }}
+    }
 
-    function downloadImage() {{
+    function downloadImage() {
       const link = document.createElement('a');
-      link.download = 'linkedin_ad_cannabis_fixed.png';
+      link.download = __DOWNLOAD_NAME__;
       link.href = canvas.toDataURL('image/png');
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
-    }}
+    }
   </script>
 </body>
 </html>
 """
 
-with open(out_path, "w", encoding="utf-8") as out_f:
-    out_f.write(html)
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def find_images(ads_dir):
+    """Ad images under ads_dir, relative paths, skipping the generated editors tree."""
+    images = []
+    for dirpath, dirnames, filenames in os.walk(ads_dir):
+        dirnames[:] = sorted(d for d in dirnames if d != EDITORS_DIR and not d.startswith("."))
+        for f in sorted(filenames):
+            if f.lower().endswith(IMAGE_EXTENSIONS):
+                images.append(os.path.relpath(os.path.join(dirpath, f), ads_dir))
+    return images
+
+
+def working_copy(img_path, work_path, max_width, jpeg_quality):
+    """Downscaled / re-encoded copy of img_path for embedding. Returns (path, mime)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Error: --max-width / --jpeg-quality need Pillow. Install with: pip install Pillow")
+        sys.exit(1)
+    os.makedirs(os.path.dirname(work_path), exist_ok=True)
+    with Image.open(img_path) as im:
+        if max_width and im.width > max_width:
+            im = im.resize((max_width, round(im.height * max_width / im.width)), Image.LANCZOS)
+        if jpeg_quality:
+            work_path = os.path.splitext(work_path)[0] + ".jpg"
+            im.convert("RGB").save(work_path, "JPEG", quality=jpeg_quality, optimize=True)
+            return work_path, "image/jpeg"
+        im.save(work_path, optimize=True)
+    return work_path, mime_for(work_path)
+
+
+def mime_for(path):
+    return "image/png" if path.lower().endswith(".png") else "image/jpeg"
+
+
+def write_editor(img_path, out_path, mime, old_text, new_text, download_name):
+    """Write the editor page, streaming the image's base64 into it chunk by chunk."""
+    head, tail = TEMPLATE.split("__IMAGE_DATA__")
+    head = head.replace("__OLD_TEXT__", html.escape(old_text)).replace("__MIME__", mime)
+    tail = tail.replace("__NEW_TEXT__", json.dumps(new_text)).replace("__DOWNLOAD_NAME__", json.dumps(download_name))
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(img_path, "rb") as img_f, open(tmp_path, "w", encoding="utf-8") as out_f:
+        out_f.write(head)
+        for chunk in iter(lambda: img_f.read(B64_CHUNK), b""):
+            out_f.write(base64.b64encode(chunk).decode("ascii"))
+        out_f.write(tail)
+    os.replace(tmp_path, out_path)
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_editor(ads_dir, rel, out_path, args, manifest):
+    """Build one editor unless its image and options are unchanged. Returns True if (re)built."""
+    img_path = os.path.join(ads_dir, rel)
+    options = {
+        "template": TEMPLATE_VERSION,
+        "max_width": args.max_width,
+        "jpeg_quality": args.jpeg_quality,
+        "old_text": args.old_text,
+        "new_text": args.new_text,
+    }
+    image_sha256 = file_sha256(img_path)
+    previous = manifest.get(rel)
+    if (not args.force and previous and os.path.exists(out_path)
+            and previous.get("sha256") == image_sha256 and previous.get("options") == options):
+        return False
+
+    embed_path, mime = img_path, mime_for(img_path)
+    if args.max_width or args.jpeg_quality:
+        work_path = os.path.join(ads_dir, EDITORS_DIR, WORK_DIR, rel)
+        embed_path, mime = working_copy(img_path, work_path, args.max_width, args.jpeg_quality)
+
+    stem = os.path.splitext(os.path.basename(rel))[0]
+    write_editor(embed_path, out_path, mime, args.old_text, args.new_text, f"{stem}_fixed.png")
+    manifest[rel] = {"sha256": image_sha256, "options": options, "editor": os.path.relpath(out_path, ads_dir)}
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate patch-tool editor pages for ad images.")
+    parser.add_argument("--dir", default=ADS_DIR, help="Ads folder (default: this script's folder)")
+    parser.add_argument("--image", help="Only this image (relative to --dir)")
+    parser.add_argument("--out", help="Output path for --image (default: editors/<image>.html)")
+    parser.add_argument("--old-text", default=DEFAULT_OLD_TEXT, help="Text to box (shown in the instructions)")
+    parser.add_argument("--new-text", default=DEFAULT_NEW_TEXT, help="Replacement text drawn by Patch It!")
+    parser.add_argument("--max-width", type=int, help="Embed a copy downscaled to this width")
+    parser.add_argument("--jpeg-quality", type=int, help="Embed a JPEG re-encoded at this quality")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if unchanged")
+    args = parser.parse_args()
+
+    ads_dir = os.path.abspath(args.dir)
+    manifest_path = os.path.join(ads_dir, EDITORS_DIR, MANIFEST_FILE)
+    manifest = load_manifest(manifest_path)
+    images = [args.image] if args.image else find_images(ads_dir)
+
+    built = skipped = 0
+    for rel in images:
+        if args.out and args.image:
+            out_path = os.path.abspath(args.out)
+        else:
+            out_path = os.path.join(ads_dir, EDITORS_DIR, os.path.splitext(rel)[0] + ".html")
+        if build_editor(ads_dir, rel, out_path, args, manifest):
+            built += 1
+            print(f"  Built {os.path.relpath(out_path, ads_dir)} ({os.path.getsize(out_path)} bytes)")
+        else:
+            skipped += 1
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    print(f"Done: {built} built, {skipped} unchanged")
+
+
+if __name__ == "__main__":
+    main()
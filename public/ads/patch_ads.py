@@ -0,0 +1,238 @@
+"""
+Headless Ad Patcher
+
+Applies the editor's "Patch It!" operation without a browser, for any number of ads at once:
+
+1. A 4-px background slice taken just above the box (x-10 .. x+w+10) is stretched over the box
+   region (x-10, y-4, w+20, h+8); boxes touching the top edge are filled with #111717 instead.
+2. The replacement text is drawn centered in the box in #b0b5b9, at 0.85 x box height, with the
+   editor's shadow (rgba(0,0,0,0.9), blur 6, y offset 2).
+
+Jobs come from a JSON manifest (a list, or {"jobs": [...]}) of
+  {"image": "linkedin_ad_cannabis*.png", "box": [x, y, w, h], "text": "https://..."}
+where "image" is a path or glob relative to the ads folder and "text" defaults to the editor's
+replacement URL. Several jobs on the same image are applied in order. Images are processed in
+parallel worker processes and written as PNG to patched/<stem>_fixed.png (same name the editor's
+download button uses).
+
+Usage:
+  python public/ads/patch_ads.py public/ads/patch_manifest.json
+  python public/ads/patch_ads.py --image "linkedin_ad_cannabis*.png" --box 160,590,300,28
+  python public/ads/patch_ads.py manifest.json --font C:\\Windows\\Fonts\\seguisb.ttf --out-dir fixed
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+except ImportError:
+    print("Error: numpy and Pillow are required. Install with: pip install numpy Pillow")
+    sys.exit(1)
+
+from generate_editor import ADS_DIR, DEFAULT_NEW_TEXT, IMAGE_EXTENSIONS
+
+OUT_DIR = "patched"
+SLICE_HEIGHT = 4
+FALLBACK_FILL = (0x11, 0x17, 0x17)
+TEXT_COLOR = (0xb0, 0xb5, 0xb9)
+TEXT_SCALE = 0.85
+SHADOW_ALPHA = 0.9
+SHADOW_BLUR = 6
+SHADOW_OFFSET_Y = 2
+# The editor asks for 500 "Segoe UI", Roboto, sans-serif; first one found wins
+FONT_CANDIDATES = [
+    "seguisb.ttf", "segoeui.ttf", "Roboto-Medium.ttf", "Roboto-Regular.ttf",
+    "DejaVuSans.ttf", "LiberationSans-Regular.ttf", "Arial.ttf",
+]
+
+
+def find_font(font_path=None):
+    """Path of the font to draw with (None means Pillow's built-in font)."""
+    if font_path:
+        return font_path
+    for name in FONT_CANDIDATES:
+        try:
+            ImageFont.truetype(name, 10)
+            return name
+        except OSError:
+            continue
+    return None
+
+
+def load_font(font_path, size):
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default(size)
+
+
+def stretch_slice(arr, x, y, w, h):
+    """Stretch the 4-px strip above the box over (x-10, y-4, w+20, h+8), like canvas drawImage."""
+    img_h, img_w = arr.shape[:2]
+    slice_y = y - SLICE_HEIGHT - 2
+    x0, x1 = max(0, x - 10), min(img_w, x + w + 10)
+    strip = arr[slice_y:slice_y + SLICE_HEIGHT, x0:x1].astype(np.float32)
+
+    dst_top, dst_h = y - 4, h + 8
+    # Bilinear along y (canvas image smoothing); x is copied 1:1
+    src_y = (np.arange(dst_h, dtype=np.float32) + 0.5) * (SLICE_HEIGHT / dst_h) - 0.5
+    src_y = np.clip(src_y, 0, SLICE_HEIGHT - 1)
+    lo = np.floor(src_y).astype(np.intp)
+    hi = np.minimum(lo + 1, SLICE_HEIGHT - 1)
+    frac = (src_y - lo)[:, None, None]
+    patch = strip[lo] * (1 - frac) + strip[hi] * frac
+
+    y0, y1 = max(0, dst_top), min(img_h, dst_top + dst_h)
+    arr[y0:y1, x0:x1] = np.rint(patch[y0 - dst_top:y1 - dst_top]).astype(arr.dtype)
+
+
+def fill_box(arr, x, y, w, h):
+    arr[max(0, y - 2):max(0, y + h + 2), max(0, x - 5):max(0, x + w + 5)] = FALLBACK_FILL
+
+
+def _blend(arr, alpha, color, left, top):
+    """Alpha-blend a solid color into arr through an alpha mask placed at (left, top)."""
+    img_h, img_w = arr.shape[:2]
+    mh, mw = alpha.shape
+    x0, y0 = max(0, left), max(0, top)
+    x1, y1 = min(img_w, left + mw), min(img_h, top + mh)
+    if x0 >= x1 or y0 >= y1:
+        return
+    a = alpha[y0 - top:y1 - top, x0 - left:x1 - left, None]
+    region = arr[y0:y1, x0:x1].astype(np.float32)
+    arr[y0:y1, x0:x1] = np.rint(region * (1 - a) + np.asarray(color, np.float32) * a).astype(arr.dtype)
+
+
+def draw_text(arr, x, y, w, h, text, font_path):
+    """Centered text with the editor's drop shadow."""
+    font = load_font(font_path, max(1, round(h * TEXT_SCALE)))
+    cx, cy = x + w / 2, y + h / 2 + 1
+    left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), text, font=font, anchor="mm")
+    # Canvas shadowBlur is 2 x the Gaussian sigma; pad the mask so the blur is not clipped
+    sigma = SHADOW_BLUR / 2
+    pad = int(3 * sigma) + 2
+    mask = Image.new("L", (right - left + 2 * pad, bottom - top + 2 * pad), 0)
+    ImageDraw.Draw(mask).text((pad - left, pad - top), text, fill=255, font=font, anchor="mm")
+    origin_x, origin_y = round(cx) - pad + left, round(cy) - pad + top
+
+    shadow = np.asarray(mask.filter(ImageFilter.GaussianBlur(sigma)), np.float32) * (SHADOW_ALPHA / 255)
+    _blend(arr, shadow, (0, 0, 0), origin_x, origin_y + SHADOW_OFFSET_Y)
+    _blend(arr, np.asarray(mask, np.float32) / 255, TEXT_COLOR, origin_x, origin_y)
+
+
+def patch(arr, box, text, font_path):
+    """Apply one "Patch It!" edit to an RGB array in place."""
+    x, y, w, h = (round(v) for v in box)
+    img_h, img_w = arr.shape[:2]
+    if x < 0 or y < 0 or x + w > img_w or y + h > img_h:
+        raise ValueError(f"box {list(box)} is outside the {img_w}x{img_h} image")
+    if y - SLICE_HEIGHT - 2 > 0:
+        stretch_slice(arr, x, y, w, h)
+    else:
+        fill_box(arr, x, y, w, h)
+    draw_text(arr, x, y, w, h, text, font_path)
+
+
+def patch_image(task):
+    """Apply all edits for one image and write the result (runs in a worker process).
+
+    Returns (out_path, error); error is None on success.
+    """
+    img_path, out_path, edits, font_path = task
+    try:
+        with Image.open(img_path) as im:
+            arr = np.array(im.convert("RGB"))
+        for box, text in edits:
+            patch(arr, box, text, font_path)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        tmp_path = out_path + ".tmp"
+        Image.fromarray(arr).save(tmp_path, "PNG")
+        os.replace(tmp_path, out_path)
+    except (OSError, ValueError) as e:
+        return out_path, f"{os.path.basename(img_path)}: {e}"
+    return out_path, None
+
+
+def load_jobs(manifest_path):
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["jobs"] if isinstance(data, dict) else data
+
+
+def plan_tasks(jobs, ads_dir, out_dir, font_path):
+    """Expand image globs and group edits per image: [(img_path, out_path, [(box, text)], font)]."""
+    edits = {}
+    for job in jobs:
+        box = job["box"]
+        if len(box) != 4 or box[2] <= 0 or box[3] <= 0:
+            raise ValueError(f"Invalid box {box} for {job['image']}")
+        matches = sorted(p for p in glob.glob(os.path.join(ads_dir, job["image"]))
+                         if p.lower().endswith(IMAGE_EXTENSIONS))
+        if not matches:
+            print(f"  No images match {job['image']}")
+        for path in matches:
+            edits.setdefault(path, []).append((box, job.get("text", DEFAULT_NEW_TEXT)))
+    tasks = []
+    for path, image_edits in edits.items():
+        stem = os.path.splitext(os.path.basename(path))[0]
+        tasks.append((path, os.path.join(out_dir, f"{stem}_fixed.png"), image_edits, font_path))
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the ad editor's patch to many images without a browser.")
+    parser.add_argument("manifest", nargs="?", help="JSON list of {image, box: [x, y, w, h], text} jobs")
+    parser.add_argument("--image", help="Image path/glob for a single job (instead of a manifest)")
+    parser.add_argument("--box", help="x,y,w,h for --image")
+    parser.add_argument("--text", default=DEFAULT_NEW_TEXT, help="Replacement text for --image")
+    parser.add_argument("--dir", default=ADS_DIR, help="Ads folder images are relative to (default: this folder)")
+    parser.add_argument("--out-dir", help="Output folder (default: patched/ in the ads folder)")
+    parser.add_argument("--font", help="TrueType font file (default: first of Segoe UI / Roboto / DejaVu found)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    try:
+        if args.manifest:
+            jobs = load_jobs(args.manifest)
+        elif args.image and args.box:
+            jobs = [{"image": args.image, "box": [float(v) for v in args.box.split(",")], "text": args.text}]
+        else:
+            parser.error("give a manifest, or --image and --box")
+        ads_dir = os.path.abspath(args.dir)
+        out_dir = os.path.abspath(args.out_dir or os.path.join(ads_dir, OUT_DIR))
+        font_path = find_font(args.font)
+        tasks = plan_tasks(jobs, ads_dir, out_dir, font_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not tasks:
+        print("Nothing to patch")
+        return
+    if font_path is None:
+        print("  No TrueType font found, using Pillow's built-in font (pass --font for a closer match)")
+
+    workers = max(1, min(args.jobs or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        results = [patch_image(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(patch_image, tasks))
+    failed = 0
+    for out_path, error in results:
+        if error:
+            failed += 1
+            print(f"  Error: {error}")
+        else:
+            print(f"  Wrote {os.path.relpath(out_path, ads_dir)}")
+    print(f"Done: {len(results) - failed} images patched, {failed} failed")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
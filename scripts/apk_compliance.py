@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+APK Fleet Compliance Check
+
+Checks every branded APK in a directory (paynex, xoinpay, basaltsurge, digibazaar, ...) for the
+archive layout GeckoView needs to mmap its native code directly:
+
+- so_stored:      every lib/**/*.so is STORED (uncompressed)
+- arsc_stored:    resources.arsc is STORED
+- zipalign_4:     every STORED entry's data starts on a 4-byte boundary (zipalign -c 4)
+- so_page_align:  every STORED .so's data starts on a page boundary (16 KB by default)
+- header_match:   each checked local header agrees with the central directory on the compression method
+
+Entry metadata comes from the cached central-directory index; local headers are read through mmap.
+APKs are checked in parallel worker processes, and the result is a brand x check pass/fail matrix,
+printed as a table and optionally written as JSON/CSV. The exit status is 1 if any APK fails.
+
+Usage (run from the repo root):
+  python scripts/apk_compliance.py tmp/fleet
+  python scripts/apk_compliance.py tmp/fleet --json tmp/fleet_compliance.json --csv tmp/fleet_compliance.csv
+  python scripts/apk_compliance.py tmp/master.apk tmp/deployed_xoinpay.apk --page-size 4096
+"""
+
+import os
+import sys
+import csv
+import json
+import mmap
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from apk_index import (
+    ApkIndex, BadApkError, ZIP_STORED, ZIPALIGN_BYTES, SO_PAGE_ALIGN_BYTES, read_local_header
+)
+
+BRANDS_DIR = os.path.join("public", "brands")
+CHECKS = ["so_stored", "arsc_stored", "zipalign_4", "so_page_align", "header_match"]
+MAX_FAILURES_PER_CHECK = 10
+
+
+def known_brands(brands_dir: str = BRANDS_DIR) -> List[str]:
+    if not os.path.isdir(brands_dir):
+        return []
+    return sorted(d for d in os.listdir(brands_dir) if os.path.isdir(os.path.join(brands_dir, d)))
+
+
+def brand_of(apk_path: str, brands: List[str]) -> str:
+    stem = os.path.splitext(os.path.basename(apk_path))[0]
+    for b in brands:
+        if b in stem.lower():
+            return b
+    return stem
+
+
+def find_apks(paths: List[str]) -> List[str]:
+    apks = []
+    for p in paths:
+        if os.path.isdir(p):
+            apks.extend(sorted(os.path.join(p, f) for f in os.listdir(p) if f.endswith(".apk")))
+        else:
+            apks.append(p)
+    return apks
+
+
+def check_apk(apk_path: str, page_size: int = SO_PAGE_ALIGN_BYTES) -> Dict:
+    """Run all checks on one APK. Never raises: unreadable APKs fail every check with an error."""
+    failures: Dict[str, List[str]] = {c: [] for c in CHECKS}
+    result = {"apk": apk_path, "error": None}
+    try:
+        index = ApkIndex.load(apk_path)
+        so_names = {e.name for e in index.matching(prefix="lib/", suffixes=(".so",))}
+        arsc = index.by_name.get("resources.arsc")
+        if arsc is None:
+            failures["arsc_stored"].append("resources.arsc missing")
+
+        with open(index.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for e in index:
+                is_so = e.name in so_names
+                is_arsc = e is arsc
+                if e.compress_type != ZIP_STORED:
+                    if is_so:
+                        failures["so_stored"].append(f"{e.name}: method {e.compress_type}")
+                    elif is_arsc:
+                        failures["arsc_stored"].append(f"{e.name}: method {e.compress_type}")
+                    continue
+
+                header = read_local_header(mm, e.header_offset, e.name)
+                if header.compress_type != e.compress_type:
+                    failures["header_match"].append(
+                        f"{e.name}: local method {header.compress_type} != central {e.compress_type}")
+                data_offset = e.header_offset + header.data_start
+                if data_offset % ZIPALIGN_BYTES:
+                    failures["zipalign_4"].append(f"{e.name}: offset {data_offset}")
+                if is_so and data_offset % page_size:
+                    failures["so_page_align"].append(f"{e.name}: offset {data_offset} (mod {data_offset % page_size})")
+        result["entries"] = len(index)
+        result["so_count"] = len(so_names)
+    except (OSError, ValueError, BadApkError) as e:
+        result["error"] = str(e)
+
+    result["checks"] = {
+        c: result["error"] is None and not failures[c] for c in CHECKS
+    }
+    result["failures"] = {c: f[:MAX_FAILURES_PER_CHECK] for c, f in failures.items() if f}
+    result["failure_counts"] = {c: len(f) for c, f in failures.items() if f}
+    result["passed"] = all(result["checks"].values())
+    return result
+
+
+def check_fleet(apks: List[str], page_size: int = SO_PAGE_ALIGN_BYTES, jobs: Optional[int] = None) -> List[Dict]:
+    brands = known_brands()
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(apks) or 1))
+    if jobs == 1:
+        results = [check_apk(a, page_size) for a in apks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(check_apk, apks, [page_size] * len(apks)))
+    for r in results:
+        r["brand"] = brand_of(r["apk"], brands)
+    return results
+
+
+def print_matrix(results: List[Dict]) -> None:
+    width = max([len("brand")] + [len(r["brand"]) for r in results])
+    print(f"{'brand':<{width}}  " + "  ".join(f"{c:>13}" for c in CHECKS) + "  result")
+    for r in results:
+        cells = "  ".join(f"{'PASS' if r['checks'][c] else 'FAIL':>13}" for c in CHECKS)
+        print(f"{r['brand']:<{width}}  {cells}  {'PASS' if r['passed'] else 'FAIL'}")
+    for r in results:
+        if r["error"]:
+            print(f"  {r['brand']}: ERROR {r['error']}")
+        for check, items in r["failures"].items():
+            more = r["failure_counts"][check] - len(items)
+            print(f"  {r['brand']} {check}: " + "; ".join(items) + (f" (+{more} more)" if more > 0 else ""))
+
+
+def write_csv(results: List[Dict], path: str) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["brand", "apk"] + CHECKS + ["passed", "error"])
+        for r in results:
+            writer.writerow([r["brand"], r["apk"]] + [r["checks"][c] for c in CHECKS] + [r["passed"], r["error"] or ""])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check a fleet of branded APKs for STORED/aligned native libs.")
+    parser.add_argument("paths", nargs="*", default=[os.path.join("tmp", "fleet")],
+                        help="APK files and/or directories of APKs (default: tmp/fleet)")
+    parser.add_argument("--page-size", type=int, default=SO_PAGE_ALIGN_BYTES, help="Required .so data alignment")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", help="Write the full results to this JSON file")
+    parser.add_argument("--csv", help="Write the pass/fail matrix to this CSV file")
+    args = parser.parse_args(argv)
+
+    apks = find_apks(args.paths)
+    if not apks:
+        print("No APKs found to check")
+        return 1
+    results = check_fleet(apks, args.page_size, args.jobs)
+    print_matrix(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.json}")
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"Saved matrix to {args.csv}")
+    return 0 if all(r["passed"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
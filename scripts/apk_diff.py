@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+APK Diff
+
+Compares two APKs (e.g. tmp/master.apk vs tmp/deployed_xoinpay.apk) using only their central
+directories: entries are matched by name and compared on CRC32, uncompressed size and compression
+method, so identical content is never read. Only entries whose CRC differs are decompressed, and only
+when --content is given (text-like entries get a unified diff; compiled XML is decoded first).
+
+Entries GeckoView mmaps directly (.so files, resources.arsc) also get their compression method and
+data-offset alignment (4-byte zipalign, 16 KB page for .so) compared; regressions are flagged even
+when the bytes are identical.
+
+Usage (run from the repo root):
+  python scripts/apk_diff.py tmp/master.apk tmp/deployed_xoinpay.apk
+  python scripts/apk_diff.py tmp/master.apk tmp/deployed_xoinpay.apk --content --json tmp/apk_diff.json
+"""
+
+import os
+import sys
+import json
+import difflib
+import argparse
+from typing import Dict, List, Optional
+
+from apk_index import (
+    ApkIndex, ApkEntry, BadApkError, ZIP_STORED, STORED_REQUIRED_SUFFIXES, ZIPALIGN_BYTES, SO_PAGE_ALIGN_BYTES
+)
+from axml import is_binary_xml, parse_axml, to_xml_string
+
+TEXT_SUFFIXES = (".html", ".htm", ".js", ".css", ".json", ".txt", ".properties", ".xml", ".MF", ".SF", ".version")
+MAX_CONTENT_BYTES = 4 * 1024 * 1024
+MAX_DIFF_LINES = 200
+MAX_LINE_CHARS = 160
+
+
+def _method(entry: ApkEntry) -> str:
+    return "STORED" if entry.compress_type == ZIP_STORED else f"DEFLATED({entry.compress_type})"
+
+
+def _alignment(entry: ApkEntry, offset: int) -> Dict:
+    info = {"data_offset": offset, "aligned_4": offset % ZIPALIGN_BYTES == 0}
+    if entry.name.endswith(".so"):
+        info["aligned_16k"] = offset % SO_PAGE_ALIGN_BYTES == 0
+    return info
+
+
+def _layout_issues(name: str, before: Dict, after: Dict) -> List[str]:
+    """Regressions in compression/alignment of an mmapped entry between the two builds."""
+    issues = []
+    if before["method"] != after["method"]:
+        issues.append(f"compression {before['method']} -> {after['method']}")
+    for key, label in (("aligned_4", "4-byte alignment"), ("aligned_16k", "16 KB page alignment")):
+        if key in before and before[key] and not after[key] and after["method"] == "STORED":
+            issues.append(f"lost {label} (offset {after['data_offset']})")
+    if before["method"] == "STORED" and after["method"] != "STORED":
+        issues.append(f"{name} must stay STORED")
+    return issues
+
+
+def _text_of(index: ApkIndex, name: str) -> Optional[List[str]]:
+    entry = index.get(name)
+    if not name.endswith(TEXT_SUFFIXES) or entry.file_size > MAX_CONTENT_BYTES:
+        return None
+    data = index.read(name)
+    if name.endswith(".xml"):
+        if is_binary_xml(data):
+            return to_xml_string(parse_axml(data)).splitlines()
+    try:
+        return data.decode("utf-8").splitlines()
+    except UnicodeDecodeError:
+        return None
+
+
+def diff_apks(old_path: str, new_path: str, content: bool = False) -> Dict:
+    """Structured report of added / removed / changed / recompressed entries and layout regressions."""
+    old, new = ApkIndex.load(old_path), ApkIndex.load(new_path)
+    old_names, new_names = set(old.by_name), set(new.by_name)
+
+    report = {
+        "old": old.path,
+        "new": new.path,
+        "identical_central_directory": old.cd_sha256 == new.cd_sha256,
+        "added": [],
+        "removed": [],
+        "changed": [],
+        "recompressed": [],
+        "layout": [],
+        "unchanged": 0,
+    }
+    for name in sorted(new_names - old_names):
+        e = new.by_name[name]
+        report["added"].append({"name": name, "size": e.file_size, "method": _method(e)})
+    for name in sorted(old_names - new_names):
+        e = old.by_name[name]
+        report["removed"].append({"name": name, "size": e.file_size, "method": _method(e)})
+
+    common = sorted(old_names & new_names)
+    for name in common:
+        a, b = old.by_name[name], new.by_name[name]
+        if a.crc != b.crc or a.file_size != b.file_size:
+            change = {"name": name, "old_size": a.file_size, "new_size": b.file_size,
+                      "size_delta": b.file_size - a.file_size, "old_crc": f"{a.crc:08x}", "new_crc": f"{b.crc:08x}"}
+            if content:
+                old_text, new_text = _text_of(old, name), _text_of(new, name)
+                if old_text is not None and new_text is not None:
+                    diff = list(difflib.unified_diff(old_text, new_text, f"old/{name}", f"new/{name}", lineterm=""))
+                    change["diff"] = diff[:MAX_DIFF_LINES]
+                    change["diff_truncated"] = len(diff) > MAX_DIFF_LINES
+            report["changed"].append(change)
+        elif a.compress_type != b.compress_type or a.compressed_size != b.compressed_size:
+            report["recompressed"].append({"name": name, "old_method": _method(a), "new_method": _method(b),
+                                           "old_compressed": a.compressed_size, "new_compressed": b.compressed_size})
+        else:
+            report["unchanged"] += 1
+
+    # Compression / alignment of entries that must be STORED, read from their local headers only
+    mmapped = [n for n in common if n.endswith(STORED_REQUIRED_SUFFIXES)]
+    if mmapped:
+        old_offsets = old.data_offsets([old.by_name[n] for n in mmapped])
+        new_offsets = new.data_offsets([new.by_name[n] for n in mmapped])
+        for name in mmapped:
+            a, b = old.by_name[name], new.by_name[name]
+            before = dict(_alignment(a, old_offsets[name]), method=_method(a))
+            after = dict(_alignment(b, new_offsets[name]), method=_method(b))
+            issues = _layout_issues(name, before, after)
+            if issues:
+                report["layout"].append({"name": name, "old": before, "new": after, "issues": issues})
+    return report
+
+
+def has_differences(report: Dict) -> bool:
+    return any(report[k] for k in ("added", "removed", "changed", "recompressed", "layout"))
+
+
+def print_report(report: Dict) -> None:
+    print(f"Comparing {report['old']} -> {report['new']}")
+    if report["identical_central_directory"]:
+        print("  Central directories are identical")
+    print(f"  Unchanged: {report['unchanged']}  Added: {len(report['added'])}  Removed: {len(report['removed'])}  "
+          f"Changed: {len(report['changed'])}  Recompressed: {len(report['recompressed'])}")
+    for e in report["added"]:
+        print(f"  + {e['name']} ({e['size']} bytes, {e['method']})")
+    for e in report["removed"]:
+        print(f"  - {e['name']} ({e['size']} bytes, {e['method']})")
+    for e in report["changed"]:
+        print(f"  ~ {e['name']} ({e['old_size']} -> {e['new_size']} bytes, crc {e['old_crc']} -> {e['new_crc']})")
+        for line in e.get("diff", []):
+            print(f"      {line[:MAX_LINE_CHARS]}" + (" ..." if len(line) > MAX_LINE_CHARS else ""))
+        if e.get("diff_truncated"):
+            print("      ... (diff truncated)")
+    for e in report["recompressed"]:
+        print(f"  = {e['name']} content identical, {e['old_method']} -> {e['new_method']} "
+              f"({e['old_compressed']} -> {e['new_compressed']} bytes)")
+    for e in report["layout"]:
+        print(f"  WARNING: {e['name']}: " + "; ".join(e["issues"]))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Diff two APKs by central-directory metadata.")
+    parser.add_argument("old", nargs="?", default=os.path.join("tmp", "master.apk"))
+    parser.add_argument("new", nargs="?", default=os.path.join("tmp", "deployed_xoinpay.apk"))
+    parser.add_argument("--content", action="store_true", help="Decompress changed text entries and show a diff")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        report = diff_apks(args.old, args.new, args.content)
+    except (OSError, BadApkError) as e:
+        print(f"Error: {e}")
+        return 1
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved report to {args.json}")
+    return 2 if has_differences(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
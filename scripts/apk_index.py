@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+APK Index
+
+Parses an APK's zip central directory once into a cached index (name, sizes, CRC32, compress type,
+local header offset per entry) so the usual inspection queries (file lists, launcher icons, adaptive
+icon XMLs, .so compression, asset extraction) run against the index instead of re-opening the archive
+and walking namelist() per query.
+
+The on-disk cache lives in tmp/.apk_index/ and is keyed by the APK's absolute path, size and mtime;
+each index also records the SHA-256 of the central directory bytes, which identifies the archive layout.
+Entries are read straight from their local header offset, without zipfile.
+
+Usage (run from the repo root):
+  python scripts/apk_index.py info tmp/master.apk
+  python scripts/apk_index.py list tmp/master.apk --out tmp/apk_files.txt
+  python scripts/apk_index.py icons tmp/deployed_xoinpay.apk
+  python scripts/apk_index.py adaptive tmp/deployed_xoinpay.apk
+  python scripts/apk_index.py compression
+  python scripts/apk_index.py extract tmp/master.apk assets/wrap.html tmp/extracted_wrap.html
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import hashlib
+import argparse
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# APKs the scripts look at, in order of preference when no path is given
+DEFAULT_APK_CANDIDATES = [
+    os.path.join("tmp", "deployed_xoinpay.apk"),  # Downloaded from Azure
+    os.path.join("tmp", "xoinpay-touchpoint-signed.apk"),
+    os.path.join("tmp", "master.apk"),
+]
+
+INDEX_CACHE_DIR = os.path.join("tmp", ".apk_index")
+INDEX_VERSION = 1
+
+ICON_PATTERNS = ["mipmap", "ic_launcher"]
+ADAPTIVE_PATTERNS = [
+    "mipmap-anydpi",
+    "ic_launcher.xml",
+    "ic_launcher_round.xml",
+    "ic_launcher_foreground",
+    "ic_launcher_background",
+]
+# Entries GeckoView / Android expect to be STORED (uncompressed) so they can be mmapped
+STORED_REQUIRED_SUFFIXES = (".so", "resources.arsc")
+# zipalign: STORED data starts on a 4-byte boundary; STORED .so files on a 16 KB page for direct mmap
+ZIPALIGN_BYTES = 4
+SO_PAGE_ALIGN_BYTES = 16384
+
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIG = b"PK\x05\x06"
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_LOCATOR_SIG = b"PK\x06\x07"
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_EOCD_SIG = b"PK\x06\x06"
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+_CENTRAL_DIR_SIG = b"PK\x01\x02"
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIG = b"PK\x03\x04"
+
+
+class BadApkError(Exception):
+    """The file is not a readable zip/APK archive."""
+
+
+class ApkEntry(NamedTuple):
+    name: str
+    compress_type: int
+    crc: int
+    compressed_size: int
+    file_size: int
+    header_offset: int
+    flags: int
+
+
+def _read_central_directory(f, size: int) -> bytes:
+    """Locate the end-of-central-directory record (zip64 aware) and return the raw central directory."""
+    tail_len = min(size, _EOCD.size + 0xFFFF)
+    f.seek(size - tail_len)
+    tail = f.read(tail_len)
+    pos = tail.rfind(_EOCD_SIG)
+    if pos < 0 or pos + _EOCD.size > len(tail):
+        raise BadApkError("end of central directory not found")
+    _, _, _, _, total, cd_size, cd_offset, _ = _EOCD.unpack_from(tail, pos)
+
+    if total == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        loc = pos - _ZIP64_LOCATOR.size
+        if loc < 0 or tail[loc:loc + 4] != _ZIP64_LOCATOR_SIG:
+            raise BadApkError("zip64 locator not found")
+        _, _, eocd64_offset, _ = _ZIP64_LOCATOR.unpack_from(tail, loc)
+        f.seek(eocd64_offset)
+        record = f.read(_ZIP64_EOCD.size)
+        if len(record) < _ZIP64_EOCD.size or record[:4] != _ZIP64_EOCD_SIG:
+            raise BadApkError("zip64 end of central directory not found")
+        _, _, _, _, _, _, _, total, cd_size, cd_offset = _ZIP64_EOCD.unpack(record)
+
+    f.seek(cd_offset)
+    cd = f.read(cd_size)
+    if len(cd) != cd_size:
+        raise BadApkError("truncated central directory")
+    return cd
+
+
+def _parse_central_directory(cd: bytes) -> List[ApkEntry]:
+    entries = []
+    pos = 0
+    view = memoryview(cd)
+    while pos + _CENTRAL_DIR.size <= len(cd):
+        (sig, _, _, _, _, flags, compress_type, _, _, crc, compressed_size, file_size,
+         name_len, extra_len, comment_len, _, _, _, header_offset) = _CENTRAL_DIR.unpack_from(cd, pos)
+        if sig != _CENTRAL_DIR_SIG:
+            raise BadApkError(f"bad central directory signature at {pos}")
+        start = pos + _CENTRAL_DIR.size
+        raw_name = bytes(view[start:start + name_len])
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+
+        if 0xFFFFFFFF in (compressed_size, file_size, header_offset):
+            extra = bytes(view[start + name_len:start + name_len + extra_len])
+            file_size, compressed_size, header_offset = _apply_zip64_extra(
+                extra, file_size, compressed_size, header_offset)
+
+        entries.append(ApkEntry(name, compress_type, crc, compressed_size, file_size, header_offset, flags))
+        pos = start + name_len + extra_len + comment_len
+    return entries
+
+
+def _apply_zip64_extra(extra: bytes, file_size: int, compressed_size: int, header_offset: int):
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, length = struct.unpack_from("<2H", extra, pos)
+        if tag == 0x0001:
+            values = list(struct.unpack_from(f"<{length // 8}Q", extra, pos + 4))
+            if file_size == 0xFFFFFFFF and values:
+                file_size = values.pop(0)
+            if compressed_size == 0xFFFFFFFF and values:
+                compressed_size = values.pop(0)
+            if header_offset == 0xFFFFFFFF and values:
+                header_offset = values.pop(0)
+            break
+        pos += 4 + length
+    return file_size, compressed_size, header_offset
+
+
+class LocalHeader(NamedTuple):
+    compress_type: int
+    flags: int
+    data_start: int  # offset of the entry data relative to the local header
+
+
+def read_local_header(buf, offset: int, name: str = "") -> LocalHeader:
+    """Parse the local file header at buf[offset] (bytes, mmap or memoryview)."""
+    if offset + _LOCAL_HEADER.size > len(buf):
+        raise BadApkError(f"truncated local header for {name} at {offset}")
+    sig, _, _, flags, method, _, _, _, _, _, name_len, extra_len = _LOCAL_HEADER.unpack_from(buf, offset)
+    if sig != _LOCAL_HEADER_SIG:
+        raise BadApkError(f"bad local header for {name} at {offset}")
+    return LocalHeader(method, flags, _LOCAL_HEADER.size + name_len + extra_len)
+
+
+class ApkIndex:
+    """Central-directory index of one APK, with direct entry reads via local header offsets."""
+
+    _memory_cache: Dict[str, "ApkIndex"] = {}
+
+    def __init__(self, path: str, entries: List[ApkEntry], cd_sha256: str, size: int, mtime_ns: int):
+        self.path = path
+        self.entries = entries
+        self.cd_sha256 = cd_sha256
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.by_name = {e.name: e for e in entries}
+
+    @classmethod
+    def load(cls, path: str, cache_dir: Optional[str] = INDEX_CACHE_DIR) -> "ApkIndex":
+        """Return the index for path, from memory, the on-disk cache, or by parsing the central directory."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = hashlib.sha256(f"{path}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()[:32]
+
+        cached = cls._memory_cache.get(key)
+        if cached is not None:
+            return cached
+
+        cache_file = os.path.join(cache_dir, f"{key}.json") if cache_dir else None
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    index = cls(path, [ApkEntry(*e) for e in data["entries"]], data["cd_sha256"],
+                                st.st_size, st.st_mtime_ns)
+                    cls._memory_cache[key] = index
+                    return index
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # rebuild below
+
+        with open(path, "rb") as f:
+            cd = _read_central_directory(f, st.st_size)
+        index = cls(path, _parse_central_directory(cd), hashlib.sha256(cd).hexdigest(), st.st_size, st.st_mtime_ns)
+
+        if cache_file:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = cache_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                           "cd_sha256": index.cd_sha256, "entries": [list(e) for e in index.entries]}, f)
+            os.replace(tmp_file, cache_file)
+        cls._memory_cache[key] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[ApkEntry]:
+        return iter(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def get(self, name: str) -> ApkEntry:
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise KeyError(f"{name} not found in {self.path}") from None
+
+    def names(self) -> List[str]:
+        return [e.name for e in self.entries]
+
+    def matching(self, patterns: Optional[List[str]] = None, prefix: Optional[str] = None,
+                 suffixes: Optional[tuple] = None) -> List[ApkEntry]:
+        """Entries whose name contains any of patterns / starts with prefix / ends with any of suffixes."""
+        result = []
+        for e in self.entries:
+            if patterns is not None and not any(p in e.name for p in patterns):
+                continue
+            if prefix is not None and not e.name.startswith(prefix):
+                continue
+            if suffixes is not None and not e.name.endswith(suffixes):
+                continue
+            result.append(e)
+        return result
+
+    def data_offset(self, entry: ApkEntry, f=None) -> int:
+        """Absolute offset of the entry's data (after its local header, whose extra field may differ)."""
+        if f is None:
+            with open(self.path, "rb") as fh:
+                return self.data_offset(entry, fh)
+        f.seek(entry.header_offset)
+        header = f.read(_LOCAL_HEADER.size)
+        return entry.header_offset + read_local_header(header, 0, entry.name).data_start
+
+    def data_offsets(self, entries: List[ApkEntry]) -> Dict[str, int]:
+        """data_offset() for several entries with one open file handle."""
+        with open(self.path, "rb") as f:
+            return {e.name: self.data_offset(e, f) for e in entries}
+
+    def iter_chunks(self, name: str, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """Yield an entry's decompressed content in chunks, without holding it all in memory."""
+        entry = self.get(name)
+        with open(self.path, "rb") as f:
+            f.seek(self.data_offset(entry, f))
+            remaining = entry.compressed_size
+            inflater = zlib.decompressobj(-15) if entry.compress_type == ZIP_DEFLATED else None
+            if entry.compress_type not in (ZIP_STORED, ZIP_DEFLATED):
+                raise BadApkError(f"{name}: unsupported compression method {entry.compress_type}")
+            while remaining > 0:
+                raw = f.read(min(chunk_size, remaining))
+                if not raw:
+                    raise BadApkError(f"{name}: truncated entry data")
+                remaining -= len(raw)
+                chunk = inflater.decompress(raw) if inflater else raw
+                if chunk:
+                    yield chunk
+            if inflater:
+                tail = inflater.flush()
+                if tail:
+                    yield tail
+
+    def read(self, name: str, verify_crc: bool = True) -> bytes:
+        data = b"".join(self.iter_chunks(name))
+        if verify_crc and zlib.crc32(data) != self.get(name).crc:
+            raise BadApkError(f"{name}: CRC mismatch")
+        return data
+
+    def extract(self, name: str, dest_path: str) -> int:
+        """Stream an entry to dest_path. Returns bytes written."""
+        written = 0
+        crc = 0
+        with open(dest_path, "wb") as out:
+            for chunk in self.iter_chunks(name):
+                out.write(chunk)
+                crc = zlib.crc32(chunk, crc)
+                written += len(chunk)
+        if crc != self.get(name).crc:
+            raise BadApkError(f"{name}: CRC mismatch")
+        return written
+
+
+def find_default_apk() -> Optional[str]:
+    for c in DEFAULT_APK_CANDIDATES:
+        if os.path.exists(c):
+            return c
+    return None
+
+
+def compression_report(index: ApkIndex) -> Dict:
+    """Compression method of resources.arsc / libxul.so and the STORED ratio of all .so files."""
+    targets = {}
+    for t in ["resources.arsc", "lib/arm64-v8a/libxul.so", "lib/armeabi-v7a/libxul.so"]:
+        e = index.by_name.get(t)
+        targets[t] = None if e is None else e.compress_type
+    so = index.matching(suffixes=(".so",))
+    return {
+        "targets": targets,
+        "so_count": len(so),
+        "so_stored": sum(1 for e in so if e.compress_type == ZIP_STORED),
+    }
+
+
+def print_entries(entries: List[ApkEntry], out=None) -> None:
+    for e in entries:
+        line = f"  {e.name} ({e.file_size} bytes)"
+        print(line, file=out) if out else print(line)
+
+
+def _cmd_info(index: ApkIndex, args) -> int:
+    print(f"APK:            {index.path}")
+    print(f"Size:           {index.size} bytes")
+    print(f"Entries:        {len(index)}")
+    print(f"Central dir:    sha256={index.cd_sha256}")
+    stored = sum(1 for e in index if e.compress_type == ZIP_STORED)
+    print(f"Stored entries: {stored}/{len(index)}")
+    return 0
+
+
+def _cmd_list(index: ApkIndex, args) -> int:
+    if args.out:
+        with open(args.out, "w") as f:
+            for n in index.names():
+                f.write(n + "\n")
+        print(f"Saved file list to {args.out}")
+    else:
+        for n in index.names():
+            print(n)
+    return 0
+
+
+def _cmd_icons(index: ApkIndex, args) -> int:
+    icons = index.matching(patterns=ICON_PATTERNS)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write("Files containing 'mipmap' or 'ic_launcher':\n")
+            print_entries(icons, f)
+        print(f"Saved to {args.out}")
+        return 0
+    print("Files containing 'mipmap' or 'ic_launcher':")
+    print_entries(icons)
+    print("\nFiles in res/ starting with 'mipmap':")
+    print_entries(index.matching(prefix="res/mipmap"))
+    return 0
+
+
+def _cmd_adaptive(index: ApkIndex, args) -> int:
+    print("Checking for adaptive icon XMLs:")
+    print_entries(index.matching(patterns=ADAPTIVE_PATTERNS))
+    return 0
+
+
+def _cmd_compression(index: ApkIndex, args) -> int:
+    report = compression_report(index)
+    print(f"Checking compression in {index.path}:")
+    for t, method in report["targets"].items():
+        if method is None:
+            print(f"  {t}: NOT FOUND")
+        else:
+            print(f"  {t}: " + ("STORED (uncompressed)" if method == ZIP_STORED else f"DEFLATED ({method})"))
+    print(f"\nSummary: {report['so_stored']}/{report['so_count']} .so files are uncompressed")
+    if report["so_stored"] != report["so_count"]:
+        print("WARNING: Some .so files are still compressed! GeckoView may fail to load.")
+        return 1
+    print("OK: All .so files are uncompressed.")
+    return 0
+
+
+def _cmd_extract(index: ApkIndex, args) -> int:
+    if args.entry not in index:
+        print(f"{args.entry} not found in APK")
+        return 1
+    dest = args.dest or os.path.join("tmp", os.path.basename(args.entry))
+    written = index.extract(args.entry, dest)
+    print(f"Saved {args.entry} ({written} bytes) to {dest}")
+    return 0
+
+
+def _cmd_mipmaps(index: ApkIndex, args) -> int:
+    print("Listing mipmap folders:")
+    printed_folders = set()
+    for e in index.matching(patterns=["ic_launcher.png"]):
+        parts = e.name.split("/")
+        if "mipmap" in e.name and len(parts) > 1 and parts[1] not in printed_folders:
+            print(f" - {e.name}")
+            printed_folders.add(parts[1])
+    return 0
+
+
+COMMANDS = {
+    "info": (_cmd_info, "Summary of the archive and its index"),
+    "list": (_cmd_list, "List all entry names"),
+    "icons": (_cmd_icons, "Launcher icon / mipmap entries with sizes"),
+    "adaptive": (_cmd_adaptive, "Adaptive icon XMLs and layers"),
+    "compression": (_cmd_compression, "STORED check for .so files and resources.arsc"),
+    "extract": (_cmd_extract, "Extract one entry to a file"),
+    "mipmaps": (_cmd_mipmaps, "One ic_launcher.png per mipmap folder"),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect APKs through a cached central-directory index.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk index cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("apk", nargs="?", help="APK path (default: first existing of %s)" % ", ".join(DEFAULT_APK_CANDIDATES))
+        if name in ("list", "icons"):
+            p.add_argument("--out", help="Write the listing to this file")
+        if name == "extract":
+            p.add_argument("entry", help="Entry name, e.g. assets/wrap.html")
+            p.add_argument("dest", nargs="?", help="Destination file (default: tmp/<basename>)")
+    args = parser.parse_args(argv)
+
+    apk_path = args.apk or find_default_apk()
+    if not apk_path or not os.path.exists(apk_path):
+        print("No APK found to check")
+        return 1
+    try:
+        index = ApkIndex.load(apk_path, cache_dir=None if args.no_cache else INDEX_CACHE_DIR)
+        return COMMANDS[args.command][0](index, args)
+    except (OSError, BadApkError) as e:
+        print(f"Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Branded APK Repack
+
+Builds white-label touchpoint APKs from tmp/master.apk without recompressing it. Every unchanged entry
+(including the STORED libxul.so files) is copied byte-for-byte from the source archive (copy_file_range
+where available); only the brand assets are written fresh:
+
+- res/mipmap-*/ic_launcher.png, ic_launcher_round.png: public/brands/<brand>/<mipmap dir>/<file> or
+  public/brands/<brand>/generated/<mipmap dir>/<file> (brand_icons.py) if the brand has per-density icons,
+  otherwise public/brands/<brand>/icon.png (as the touchpoint build route does).
+  When launcher icons are replaced, the res/mipmap-anydpi-v26 adaptive icon XMLs are dropped so the
+  brand PNGs are used on API 26+.
+- assets/wrap.html: public/brands/<brand>/wrap.html, or the master's wrap.html with its endpoint
+  replaced when --endpoint <brand>=<url> is given.
+
+STORED data is aligned while writing (4 bytes, 16 KB for .so) with an 0xD935 alignment extra field, so no
+zipalign pass is needed. Old META-INF signatures are dropped; with --sign the aligned APK is handed to
+apksigner using ANDROID_KEYSTORE / ANDROID_KEY_ALIAS / ANDROID_KEY_PASS. Brands are built concurrently.
+
+Usage (run from the repo root):
+  python scripts/apk_repack.py paynex xoinpay basaltsurge digibazaar
+  python scripts/apk_repack.py xoinpay --endpoint xoinpay=https://xoinpay.azurewebsites.net --sign
+"""
+
+import os
+import re
+import sys
+import time
+import zlib
+import shutil
+import struct
+import zipfile
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+from apk_index import ApkIndex, BadApkError, ZIP_STORED, ZIP_DEFLATED, ZIPALIGN_BYTES, SO_PAGE_ALIGN_BYTES
+
+BRANDS_DIR = os.path.join("public", "brands")
+DEFAULT_SOURCE = os.path.join("tmp", "master.apk")
+DEFAULT_OUT_DIR = os.path.join("tmp", "brands")
+GENERATED_DIR = "generated"
+WRAP_HTML = "assets/wrap.html"
+LAUNCHER_ICONS = ("ic_launcher.png", "ic_launcher_round.png")
+ADAPTIVE_ICON_XMLS = ("res/mipmap-anydpi-v26/ic_launcher.xml", "res/mipmap-anydpi-v26/ic_launcher_round.xml")
+SIGNATURE_RE = re.compile(r"^META-INF/(MANIFEST\.MF|[^/]+\.(SF|RSA|DSA|EC))$")
+COPY_CHUNK = 1 << 20
+
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_CENTRAL_DIR = struct.Struct("<4s6H3L5H2L")
+_EOCD = struct.Struct("<4s4H2LH")
+_ALIGNMENT_EXTRA_ID = 0xD935
+
+
+class Replacement(NamedTuple):
+    data: bytes
+    compress_type: int
+
+
+def _wrap_with_endpoint(content: str, endpoint: str) -> str:
+    """Point wrap.html at endpoint (the same rules as the touchpoint build route's fallback)."""
+    content = re.sub(r'(var\s+src\s*=\s*qp\.get\s*\(\s*["\']src["\']\s*\)\s*\|\|\s*)["\'][^"\']+["\']',
+                     lambda m: f'{m.group(1)}"{endpoint}"', content)
+    content = re.sub(r'((?:var|const)\s+TARGET_URL\s*=\s*)"[^"]*"', lambda m: f'{m.group(1)}"{endpoint}"', content)
+    if endpoint not in content:
+        for pattern in (r"https://[a-z0-9-]+\.azurewebsites\.net[^\"']*", r"https://surge\.basalthq\.com[^\"']*",
+                        r"https://basaltsurge\.com[^\"']*", r"https://pay\.ledger1\.ai[^\"']*"):
+            content = re.sub(pattern, endpoint, content)
+    return content
+
+
+def brand_replacements(index: ApkIndex, brand: str, endpoint: Optional[str] = None,
+                       brands_dir: str = BRANDS_DIR) -> Dict[str, Optional[Replacement]]:
+    """Entry name -> new content for one brand (None removes the entry)."""
+    brand_dir = os.path.join(brands_dir, brand)
+    if not os.path.isdir(brand_dir):
+        raise FileNotFoundError(f"No brand assets in {brand_dir}")
+    replacements: Dict[str, Optional[Replacement]] = {}
+
+    fallback_icon = os.path.join(brand_dir, "icon.png")
+    icons_replaced = False
+    for e in index.matching(prefix="res/mipmap"):
+        folder, _, filename = e.name[len("res/"):].rpartition("/")
+        if filename not in LAUNCHER_ICONS:
+            continue
+        for candidate in (os.path.join(brand_dir, folder, filename),
+                          os.path.join(brand_dir, GENERATED_DIR, folder, filename), fallback_icon):
+            if os.path.exists(candidate):
+                with open(candidate, "rb") as f:
+                    # PNGs are already compressed; keep the source entry's method (usually STORED)
+                    replacements[e.name] = Replacement(f.read(), e.compress_type)
+                icons_replaced = True
+                break
+    if icons_replaced:
+        for name in ADAPTIVE_ICON_XMLS:
+            if name in index and not os.path.exists(os.path.join(brand_dir, name[len("res/"):])):
+                replacements[name] = None
+
+    brand_wrap = os.path.join(brand_dir, "wrap.html")
+    if os.path.exists(brand_wrap):
+        with open(brand_wrap, "rb") as f:
+            replacements[WRAP_HTML] = Replacement(f.read(), ZIP_DEFLATED)
+    elif endpoint and WRAP_HTML in index:
+        content = _wrap_with_endpoint(index.read(WRAP_HTML).decode("utf-8"), endpoint)
+        if endpoint not in content:
+            raise ValueError(f"{brand}: could not place endpoint {endpoint} in {WRAP_HTML}")
+        replacements[WRAP_HTML] = Replacement(content.encode("utf-8"), ZIP_DEFLATED)
+    return replacements
+
+
+def _alignment_for(name: str, compress_type: int) -> int:
+    if compress_type != ZIP_STORED:
+        return 0
+    return SO_PAGE_ALIGN_BYTES if name.endswith(".so") else ZIPALIGN_BYTES
+
+
+def _alignment_extra(offset: int, name_len: int, align: int) -> bytes:
+    """0xD935 extra field (as zipalign -p writes) padding the data start to a multiple of align."""
+    if not align:
+        return b""
+    data_start = offset + _LOCAL_HEADER.size + name_len
+    pad = (-(data_start + 6)) % align
+    return struct.pack("<HHH", _ALIGNMENT_EXTRA_ID, 2 + pad, align) + b"\0" * pad
+
+
+def _copy_range(src, dst, offset: int, length: int) -> None:
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    dst.flush()
+    if hasattr(os, "copy_file_range"):
+        try:
+            out_offset = dst.tell()
+            while length > 0:
+                n = os.copy_file_range(src_fd, dst_fd, length, offset, out_offset)
+                if n == 0:
+                    raise BadApkError("unexpected end of source APK")
+                offset += n
+                out_offset += n
+                length -= n
+            dst.seek(out_offset)
+            return
+        except OSError:
+            # e.g. cross-filesystem on older kernels. copy_file_range wrote at explicit offsets, so dst's
+            # position never moved: seek past what was already copied before falling back to read/write
+            dst.seek(out_offset)
+    src.seek(offset)
+    while length > 0:
+        chunk = src.read(min(COPY_CHUNK, length))
+        if not chunk:
+            raise BadApkError("unexpected end of source APK")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def repack(source: str, dest: str, replacements: Dict[str, Optional[Replacement]]) -> Dict:
+    """Write dest = source with replacements applied; unchanged entries are raw-copied and aligned."""
+    index = ApkIndex.load(source)
+    with zipfile.ZipFile(index.path) as zf:
+        infos = {i.filename: i for i in zf.infolist()}
+    stats = {"copied": 0, "copied_bytes": 0, "replaced": 0, "removed": 0, "dropped_signatures": 0}
+    central = []
+
+    tmp_dest = dest + ".tmp"
+    with open(index.path, "rb") as src, open(tmp_dest, "wb") as out:
+        for e in index:
+            info = infos[e.name]
+            if SIGNATURE_RE.match(e.name):
+                stats["dropped_signatures"] += 1
+                continue
+            if e.name in replacements and replacements[e.name] is None:
+                stats["removed"] += 1
+                continue
+
+            new = replacements.get(e.name)
+            if new is None:
+                compress_type, crc = e.compress_type, e.crc
+                compressed_size, file_size = e.compressed_size, e.file_size
+                data_offset = index.data_offset(e, src)
+            else:
+                raw = new.data
+                if new.compress_type == ZIP_DEFLATED:
+                    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+                    raw = compressor.compress(new.data) + compressor.flush()
+                compress_type, crc = new.compress_type, zlib.crc32(new.data)
+                compressed_size, file_size = len(raw), len(new.data)
+
+            if compressed_size >= 0xFFFFFFFF or out.tell() >= 0xFFFFFFFF:
+                raise BadApkError("zip64 output is not supported by the repacker")
+            name = e.name.encode("utf-8")
+            flags = (e.flags & ~0x08) | 0x800  # sizes are known up front: no data descriptor; UTF-8 names
+            header_offset = out.tell()
+            extra = _alignment_extra(header_offset, len(name), _alignment_for(e.name, compress_type))
+            dos_time = (info.date_time[3] << 11) | (info.date_time[4] << 5) | (info.date_time[5] // 2)
+            dos_date = ((info.date_time[0] - 1980) << 9) | (info.date_time[1] << 5) | info.date_time[2]
+            out.write(_LOCAL_HEADER.pack(b"PK\x03\x04", info.extract_version, flags, compress_type, dos_time,
+                                         dos_date, crc, compressed_size, file_size, len(name), len(extra)))
+            out.write(name + extra)
+            if new is None:
+                _copy_range(src, out, data_offset, compressed_size)
+                stats["copied"] += 1
+                stats["copied_bytes"] += compressed_size
+            else:
+                out.write(raw)
+                stats["replaced"] += 1
+            central.append(_CENTRAL_DIR.pack(
+                b"PK\x01\x02", info.create_version | (info.create_system << 8), info.extract_version, flags,
+                compress_type, dos_time, dos_date, crc, compressed_size, file_size, len(name), 0, 0, 0,
+                info.internal_attr, info.external_attr, header_offset) + name)
+
+        cd_offset = out.tell()
+        cd = b"".join(central)
+        out.write(cd)
+        out.write(_EOCD.pack(b"PK\x05\x06", 0, 0, len(central), len(central), len(cd), cd_offset, 0))
+    os.replace(tmp_dest, dest)
+    stats["size"] = os.path.getsize(dest)
+    return stats
+
+
+def sign_apk(aligned: str, signed: str) -> bool:
+    """Sign an aligned APK with apksigner (v1+v2+v3). Returns False if signing is not configured."""
+    apksigner = shutil.which("apksigner") or shutil.which("apksigner.bat")
+    keystore = os.environ.get("ANDROID_KEYSTORE")
+    if not apksigner or not keystore:
+        return False
+    cmd = [apksigner, "sign", "--ks", keystore, "--out", signed]
+    if os.environ.get("ANDROID_KEY_ALIAS"):
+        cmd += ["--ks-key-alias", os.environ["ANDROID_KEY_ALIAS"]]
+    if os.environ.get("ANDROID_KEY_PASS"):
+        cmd += ["--ks-pass", "env:ANDROID_KEY_PASS", "--key-pass", "env:ANDROID_KEY_PASS"]
+    subprocess.run(cmd + [aligned], check=True, capture_output=True)
+    return True
+
+
+def build_brand(source: str, brand: str, out_dir: str, endpoint: Optional[str], sign: bool) -> Dict:
+    """Build one brand's APK. Never raises: failures are reported in the result."""
+    start = time.perf_counter()
+    result = {"brand": brand, "error": None}
+    try:
+        index = ApkIndex.load(source)
+        replacements = brand_replacements(index, brand, endpoint)
+        aligned = os.path.join(out_dir, f"{brand}-touchpoint-aligned.apk")
+        result.update(repack(source, aligned, replacements))
+        result["aligned"] = aligned
+        if sign:
+            signed = os.path.join(out_dir, f"{brand}-touchpoint-signed.apk")
+            result["signed"] = signed if sign_apk(aligned, signed) else None
+    except (OSError, ValueError, KeyError, BadApkError, subprocess.CalledProcessError) as e:
+        result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build branded APKs from a master APK by raw-copy repacking.")
+    parser.add_argument("brands", nargs="*", help="Brands under public/brands (default: all)")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Master APK (default: tmp/master.apk)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR, help="Output directory (default: tmp/brands)")
+    parser.add_argument("--endpoint", action="append", default=[], metavar="BRAND=URL",
+                        help="Endpoint to write into wrap.html for a brand without its own wrap.html")
+    parser.add_argument("--sign", action="store_true", help="Sign with apksigner after repacking")
+    parser.add_argument("--jobs", type=int, help="Brands built in parallel (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    brands = args.brands or sorted(d for d in os.listdir(BRANDS_DIR) if os.path.isdir(os.path.join(BRANDS_DIR, d)))
+    endpoints = dict(e.split("=", 1) for e in args.endpoint)
+    if not os.path.exists(args.source):
+        print(f"Source APK not found: {args.source}")
+        return 1
+    os.makedirs(args.out_dir, exist_ok=True)
+    ApkIndex.load(args.source)  # build the index cache once before the workers read it
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(brands)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(build_brand, [args.source] * len(brands), brands, [args.out_dir] * len(brands),
+                                [endpoints.get(b) for b in brands], [args.sign] * len(brands)))
+
+    failed = 0
+    for r in results:
+        if r["error"]:
+            failed += 1
+            print(f"  {r['brand']}: FAILED ({r['error']})")
+            continue
+        print(f"  {r['brand']}: {r['aligned']} ({r['size']} bytes, {r['copied']} copied, {r['replaced']} replaced, "
+              f"{r['removed']} removed) in {r['seconds']}s")
+        if args.sign:
+            print(f"    signed: {r['signed']}" if r.get("signed") else
+                  "    not signed (apksigner or ANDROID_KEYSTORE not available)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
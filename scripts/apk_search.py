@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+APK Pattern Search
+
+Searches the decompressed content of every APK entry for many byte patterns at once. Each entry is
+streamed through incremental inflation in chunks (memory stays at a few MB regardless of APK size), and
+all patterns are located in a single pass per chunk with one compiled regex of lookaheads, so overlapping
+patterns ("azurewebsites.net" inside "*.azurewebsites.net") are all reported. Matches that straddle a
+chunk boundary are found by carrying the last (longest pattern - 1) bytes into the next window.
+
+Entry names are matched too, and entries are spread across worker processes by compressed size.
+Patterns are also searched as UTF-16LE (the string encoding of many compiled Android XML/ARSC pools)
+unless --no-utf16 is given.
+
+Usage (run from the repo root):
+  python scripts/apk_search.py tmp/master.apk -p paynex -p xoinpay -p azurewebsites.net
+  python scripts/apk_search.py tmp/master.apk -p cleartextTrafficPermitted --entry-prefix res/ --json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from apk_index import ApkIndex, BadApkError, find_default_apk
+
+CHUNK_SIZE = 1 << 20
+CONTEXT_BYTES = 20
+DEFAULT_MAX_HITS = 20
+
+
+class Hit(NamedTuple):
+    pattern: str
+    encoding: str
+    entry: str
+    offset: int      # offset in the decompressed entry, -1 for a match in the entry name
+    context: str
+
+
+class PatternSet:
+    """Compiled multi-pattern matcher over bytes (every pattern, every position, one regex pass)."""
+
+    def __init__(self, patterns: List[str], utf16: bool = True):
+        self.needles: List[Tuple[bytes, str, str]] = []
+        for p in dict.fromkeys(patterns):
+            self.needles.append((p.encode("utf-8"), p, "utf-8"))
+            if utf16:
+                self.needles.append((p.encode("utf-16-le"), p, "utf-16"))
+        self.max_len = max(len(n) for n, _, _ in self.needles)
+        # Lookahead alternation finds every start position where any needle begins; the needles that
+        # actually start there are then resolved with startswith (several can share a position)
+        alternation = b"|".join(re.escape(n) for n, _, _ in sorted(self.needles, key=lambda t: -len(t[0])))
+        self.regex = re.compile(b"(?=(?:" + alternation + b"))")
+        self.by_first_byte: Dict[int, List[Tuple[bytes, str, str]]] = {}
+        for needle in self.needles:
+            self.by_first_byte.setdefault(needle[0][0], []).append(needle)
+
+    def finditer(self, window: bytes, start: int = 0):
+        """Yield (position, needle, pattern, encoding) for every needle occurrence starting at >= start."""
+        for m in self.regex.finditer(window, start):
+            pos = m.start()
+            for needle, pattern, encoding in self.by_first_byte.get(window[pos], ()):
+                if window.startswith(needle, pos):
+                    yield pos, needle, pattern, encoding
+
+
+def _context(window: bytes, pos: int, length: int) -> str:
+    snippet = window[max(0, pos - CONTEXT_BYTES):pos + length + CONTEXT_BYTES]
+    return "".join(chr(b) if 32 <= b < 127 else "." for b in snippet)
+
+
+def search_entry(index: ApkIndex, name: str, patterns: PatternSet, max_hits: int) -> List[Hit]:
+    """Stream one entry and return its hits (at most max_hits per pattern/encoding)."""
+    hits: List[Hit] = []
+    counts: Dict[Tuple[str, str], int] = {}
+    overlap = patterns.max_len - 1
+    tail = b""
+    consumed = 0  # decompressed bytes before the current chunk
+
+    for chunk in index.iter_chunks(name, CHUNK_SIZE):
+        window = tail + chunk
+        base = consumed - len(tail)
+        # Matches ending inside the carried tail were already reported from the previous window
+        first = max(0, len(tail) - patterns.max_len + 1)
+        for pos, needle, pattern, encoding in patterns.finditer(window, first):
+            if pos + len(needle) <= len(tail):
+                continue
+            key = (pattern, encoding)
+            counts[key] = counts.get(key, 0) + 1
+            if counts[key] <= max_hits:
+                hits.append(Hit(pattern, encoding, name, base + pos, _context(window, pos, len(needle))))
+        consumed += len(chunk)
+        tail = window[-overlap:] if overlap else b""
+    return hits
+
+
+def _search_worker(apk_path: str, names: List[str], patterns: List[str], utf16: bool, max_hits: int) -> List[Hit]:
+    index = ApkIndex.load(apk_path)
+    pattern_set = PatternSet(patterns, utf16)
+    hits: List[Hit] = []
+    for name in names:
+        hits.extend(search_entry(index, name, pattern_set, max_hits))
+    return hits
+
+
+def _balance(entries, jobs: int) -> List[List[str]]:
+    """Greedy split of entries into `jobs` buckets of similar total compressed size."""
+    buckets: List[Tuple[int, List[str]]] = [(0, []) for _ in range(jobs)]
+    for e in sorted(entries, key=lambda e: -e.compressed_size):
+        i = min(range(jobs), key=lambda b: buckets[b][0])
+        buckets[i] = (buckets[i][0] + e.compressed_size, buckets[i][1] + [e.name])
+    return [names for _, names in buckets if names]
+
+
+def search_apk(
+    apk_path: str,
+    patterns: List[str],
+    jobs: Optional[int] = None,
+    utf16: bool = True,
+    max_hits: int = DEFAULT_MAX_HITS,
+    entry_prefix: Optional[str] = None
+) -> List[Hit]:
+    """Search every (or every entry_prefix) entry of an APK; entries are searched in parallel."""
+    index = ApkIndex.load(apk_path)
+    entries = [e for e in index if not entry_prefix or e.name.startswith(entry_prefix)]
+    pattern_set = PatternSet(patterns, utf16)
+
+    hits: List[Hit] = []
+    for e in entries:
+        raw_name = e.name.encode("utf-8")
+        for pos, needle, pattern, encoding in pattern_set.finditer(raw_name):
+            hits.append(Hit(pattern, encoding, e.name, -1, e.name))
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(entries) or 1))
+    if jobs == 1:
+        hits.extend(_search_worker(index.path, [e.name for e in entries], patterns, utf16, max_hits))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_search_worker, index.path, names, patterns, utf16, max_hits)
+                       for names in _balance(entries, jobs)]
+            for f in futures:
+                hits.extend(f.result())
+    hits.sort(key=lambda h: (h.pattern, h.entry, h.offset))
+    return hits
+
+
+def print_report(patterns: List[str], hits: List[Hit]) -> None:
+    by_pattern: Dict[str, List[Hit]] = {}
+    for h in hits:
+        by_pattern.setdefault(h.pattern, []).append(h)
+    for p in patterns:
+        found = by_pattern.get(p, [])
+        if not found:
+            print(f"  NOT found: '{p}'")
+            continue
+        print(f"  Found '{p}' ({len(found)} hit(s)):")
+        for h in found:
+            where = "entry name" if h.offset < 0 else f"offset {h.offset}"
+            enc = "" if h.encoding == "utf-8" else f" [{h.encoding}]"
+            print(f"    {h.entry} @ {where}{enc}")
+            if h.offset >= 0:
+                print(f"      Context: {h.context}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Search decompressed APK entries for many patterns in one pass.")
+    parser.add_argument("apk", nargs="?", help="APK path (default: first existing of the apk_index candidates)")
+    parser.add_argument("-p", "--pattern", action="append", required=True, help="Pattern to search (repeatable)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-hits", type=int, default=DEFAULT_MAX_HITS, help="Max hits per pattern per entry")
+    parser.add_argument("--entry-prefix", help="Only search entries whose name starts with this prefix")
+    parser.add_argument("--no-utf16", action="store_true", help="Do not also search UTF-16LE encodings")
+    parser.add_argument("--json", action="store_true", help="Print hits as JSON")
+    args = parser.parse_args(argv)
+
+    apk_path = args.apk or find_default_apk()
+    if not apk_path or not os.path.exists(apk_path):
+        print("No APK found to search")
+        return 1
+    try:
+        hits = search_apk(apk_path, args.pattern, args.jobs, not args.no_utf16, args.max_hits, args.entry_prefix)
+    except (OSError, BadApkError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps([h._asdict() for h in hits], indent=2))
+    else:
+        print(f"Searching for patterns in {apk_path} (decompressed entries):")
+        print_report(args.pattern, hits)
+    return 0 if hits else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+"""
+Android Binary XML / resources.arsc Decoder
+
+Pure-Python decoder for the compiled resource formats inside an APK (AOSP ResourceTypes.h layout):
+binary XML (AndroidManifest.xml, res/xml/*, adaptive-icon res/mipmap-anydpi-*/*.xml) and the
+resources.arsc resource table. Chunks are parsed in place over a memoryview with struct.unpack_from,
+and pool strings are decoded lazily on first use, so checking one attribute of a large manifest does not
+decode the whole pool. No Android SDK (aapt2/apkanalyzer) is needed.
+
+Decoded XML is returned as an xml.etree.ElementTree element (attribute names in {namespace}name form),
+with @0x7f... references resolved to @type/name when the resources.arsc table is available.
+
+Usage (run from the repo root):
+  python scripts/axml.py tmp/master.apk manifest
+  python scripts/axml.py tmp/master.apk netconfig
+  python scripts/axml.py tmp/master.apk adaptive
+  python scripts/axml.py tmp/master.apk xml res/xml/network_security_config.xml
+  python scripts/axml.py tmp/master.apk resources --type string
+  python scripts/axml.py tmp/master.apk attrs          # check ANDROID_ATTRS against the manifest
+"""
+
+import os
+import sys
+import struct
+import argparse
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from apk_index import ApkIndex, BadApkError, ADAPTIVE_PATTERNS, find_default_apk
+
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+MANIFEST = "AndroidManifest.xml"
+RESOURCES = "resources.arsc"
+NETWORK_CONFIG = "res/xml/network_security_config.xml"
+
+# Chunk types
+RES_STRING_POOL_TYPE = 0x0001
+RES_TABLE_TYPE = 0x0002
+RES_XML_TYPE = 0x0003
+RES_XML_START_NAMESPACE_TYPE = 0x0100
+RES_XML_END_NAMESPACE_TYPE = 0x0101
+RES_XML_START_ELEMENT_TYPE = 0x0102
+RES_XML_END_ELEMENT_TYPE = 0x0103
+RES_XML_CDATA_TYPE = 0x0104
+RES_XML_RESOURCE_MAP_TYPE = 0x0180
+RES_TABLE_PACKAGE_TYPE = 0x0200
+RES_TABLE_TYPE_TYPE = 0x0201
+
+# Res_value data types
+TYPE_NULL = 0x00
+TYPE_REFERENCE = 0x01
+TYPE_ATTRIBUTE = 0x02
+TYPE_STRING = 0x03
+TYPE_FLOAT = 0x04
+TYPE_DIMENSION = 0x05
+TYPE_FRACTION = 0x06
+TYPE_INT_DEC = 0x10
+TYPE_INT_HEX = 0x11
+TYPE_INT_BOOLEAN = 0x12
+TYPE_FIRST_COLOR_INT = 0x1C
+TYPE_LAST_COLOR_INT = 0x1F
+
+UTF8_FLAG = 0x100
+NO_ENTRY = 0xFFFFFFFF
+TYPE_FLAG_SPARSE = 0x01
+TYPE_FLAG_OFFSET16 = 0x02
+ENTRY_FLAG_COMPLEX = 0x0001
+ENTRY_FLAG_COMPACT = 0x0008
+
+DIMENSION_UNITS = ["px", "dp", "sp", "pt", "in", "mm"]
+FRACTION_UNITS = ["%", "%p"]
+RADIX_MULTS = [1.0 / (1 << 8), 1.0 / (1 << 15), 1.0 / (1 << 23), 1.0 / (1 << 31)]
+
+# Framework attribute ids (platform res/values/public.xml) for names that aapt2 may strip from the string
+# pool (resource map fallback). `axml.py <apk> attrs` checks them against a real manifest's resource map.
+ANDROID_ATTRS = {
+    0x01010000: "theme", 0x01010001: "label", 0x01010002: "icon", 0x01010003: "name",
+    0x01010006: "permission", 0x01010010: "exported", 0x0101000F: "debuggable",
+    0x01010018: "authorities", 0x0101001A: "initOrder", 0x01010027: "scheme", 0x01010028: "host",
+    0x0101021B: "versionCode", 0x0101021C: "versionName", 0x0101020C: "minSdkVersion",
+    0x01010270: "targetSdkVersion", 0x01010199: "drawable", 0x01010280: "allowBackup",
+    0x010104EA: "extractNativeLibs", 0x010104EC: "usesCleartextTraffic", 0x01010527: "networkSecurityConfig",
+    0x0101052C: "roundIcon", 0x01010572: "compileSdkVersion", 0x01010573: "compileSdkVersionCodename",
+    0x0101057A: "appComponentFactory",
+}
+ANDROID_ATTR_IDS = {name: res_id for res_id, name in ANDROID_ATTRS.items()}
+
+_CHUNK_HEADER = struct.Struct("<HHI")
+_STRING_POOL_HEADER = struct.Struct("<IIIII")        # after the chunk header
+_XML_NAMESPACE = struct.Struct("<II")                # prefix, uri
+_XML_START_ELEMENT = struct.Struct("<IIHHHHHH")      # ns, name, attrStart, attrSize, attrCount, id, class, style
+_XML_ATTRIBUTE = struct.Struct("<IIIHBBI")           # ns, name, rawValue, size, res0, dataType, data
+_XML_CDATA = struct.Struct("<IHBBI")                 # data, Res_value
+_TABLE_PACKAGE = struct.Struct("<I256sIIII")         # id, name, typeStrings, lastPublicType, keyStrings, lastPublicKey
+_TABLE_TYPE = struct.Struct("<BBHII")                # id, flags, reserved, entryCount, entriesStart
+_TABLE_ENTRY = struct.Struct("<HHI")                 # size, flags, key
+_RES_VALUE = struct.Struct("<HBBI")                  # size, res0, dataType, data
+
+
+class AxmlError(BadApkError):
+    """Raised for malformed binary XML or resource table data."""
+
+
+def _chunks(mv: memoryview, start: int, end: int) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield (type, header_size, offset, size) for each chunk in mv[start:end]."""
+    pos = start
+    while pos + _CHUNK_HEADER.size <= end:
+        ctype, header_size, size = _CHUNK_HEADER.unpack_from(mv, pos)
+        if size < _CHUNK_HEADER.size or pos + size > end:
+            raise AxmlError(f"Bad chunk 0x{ctype:04x} at {pos} (size {size})")
+        yield ctype, header_size, pos, size
+        pos += size
+
+
+class StringPool:
+    """ResStringPool over a memoryview; strings are decoded on first access and cached."""
+
+    def __init__(self, mv: memoryview, offset: int):
+        ctype, header_size, _ = _CHUNK_HEADER.unpack_from(mv, offset)
+        if ctype != RES_STRING_POOL_TYPE:
+            raise AxmlError(f"Expected string pool at {offset}, got chunk 0x{ctype:04x}")
+        count, _styles, flags, strings_start, _styles_start = _STRING_POOL_HEADER.unpack_from(mv, offset + 8)
+        self._mv = mv
+        self._offsets = offset + header_size
+        self._data = offset + strings_start
+        self.count = count
+        self.utf8 = bool(flags & UTF8_FLAG)
+        self._cache: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, index: int) -> Optional[str]:
+        if index == NO_ENTRY or index >= self.count:
+            return None
+        s = self._cache.get(index)
+        if s is None:
+            (rel,) = struct.unpack_from("<I", self._mv, self._offsets + index * 4)
+            s = self._decode_utf8(self._data + rel) if self.utf8 else self._decode_utf16(self._data + rel)
+            self._cache[index] = s
+        return s
+
+    def _decode_utf8(self, pos: int) -> str:
+        mv = self._mv
+        # UTF-16 length (skipped), then UTF-8 byte length; each is 1 byte or 2 with the high bit set
+        pos += 2 if mv[pos] & 0x80 else 1
+        length = mv[pos]
+        if length & 0x80:
+            length = ((length & 0x7F) << 8) | mv[pos + 1]
+            pos += 2
+        else:
+            pos += 1
+        return bytes(mv[pos:pos + length]).decode("utf-8", "replace")
+
+    def _decode_utf16(self, pos: int) -> str:
+        (length,) = struct.unpack_from("<H", self._mv, pos)
+        pos += 2
+        if length & 0x8000:
+            (low,) = struct.unpack_from("<H", self._mv, pos)
+            length = ((length & 0x7FFF) << 16) | low
+            pos += 2
+        return bytes(self._mv[pos:pos + length * 2]).decode("utf-16-le", "replace")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self.get(i)
+
+
+def _complex_to_float(data: int) -> float:
+    mantissa = (data & 0xFFFFFF00) - (1 << 32 if data & 0x80000000 else 0)
+    return mantissa * RADIX_MULTS[(data >> 4) & 0x3]
+
+
+def format_value(data_type: int, data: int, strings: Optional[StringPool] = None,
+                 table: Optional["ResourceTable"] = None) -> str:
+    """Render a Res_value the way aapt prints it (@type/name references when a table is given)."""
+    if data_type == TYPE_STRING:
+        return strings.get(data) if strings else f"string#{data}"
+    if data_type in (TYPE_REFERENCE, TYPE_ATTRIBUTE):
+        sigil = "@" if data_type == TYPE_REFERENCE else "?"
+        if data == 0:
+            return "@null"
+        name = table.name(data) if table else None
+        if name is None and (data >> 24) == 0x01:
+            name = f"android:attr/{ANDROID_ATTRS[data]}" if data in ANDROID_ATTRS else None
+        return f"{sigil}{name}" if name else f"{sigil}0x{data:08x}"
+    if data_type == TYPE_INT_BOOLEAN:
+        return "true" if data else "false"
+    if data_type == TYPE_INT_DEC:
+        return str(data - (1 << 32) if data & 0x80000000 else data)
+    if data_type == TYPE_INT_HEX:
+        return f"0x{data:08x}"
+    if TYPE_FIRST_COLOR_INT <= data_type <= TYPE_LAST_COLOR_INT:
+        return f"#{data:08x}"
+    if data_type == TYPE_FLOAT:
+        return repr(struct.unpack("<f", struct.pack("<I", data))[0])
+    if data_type == TYPE_DIMENSION:
+        return f"{_complex_to_float(data):g}{DIMENSION_UNITS[data & 0xF] if (data & 0xF) < 6 else ''}"
+    if data_type == TYPE_FRACTION:
+        return f"{_complex_to_float(data) * 100:g}{FRACTION_UNITS[data & 0xF] if (data & 0xF) < 2 else ''}"
+    if data_type == TYPE_NULL:
+        return ""
+    return f"(type 0x{data_type:02x})0x{data:08x}"
+
+
+def is_binary_xml(data: bytes) -> bool:
+    return len(data) >= 8 and struct.unpack_from("<H", data)[0] == RES_XML_TYPE
+
+
+def parse_axml(data: bytes, table: Optional["ResourceTable"] = None) -> ET.Element:
+    """Decode a binary XML document into an ElementTree element (plain-text XML is parsed as-is)."""
+    if not is_binary_xml(data):
+        return ET.fromstring(data)
+    mv = memoryview(data)
+    _, header_size, size = _CHUNK_HEADER.unpack_from(mv, 0)
+    end = min(size, len(mv))
+
+    strings: Optional[StringPool] = None
+    resource_ids: memoryview = memoryview(b"")
+    namespaces: Dict[str, str] = {}
+    root: Optional[ET.Element] = None
+    stack: List[ET.Element] = []
+
+    def attr_name(ns_index: int, name_index: int) -> str:
+        name = strings.get(name_index) or ""
+        if not name and name_index < len(resource_ids) // 4:
+            (res_id,) = struct.unpack_from("<I", resource_ids, name_index * 4)
+            name = ANDROID_ATTRS.get(res_id, f"0x{res_id:08x}")
+        ns = strings.get(ns_index)
+        return f"{{{ns}}}{name}" if ns else name
+
+    for ctype, chunk_header, pos, chunk_size in _chunks(mv, header_size, end):
+        if ctype == RES_STRING_POOL_TYPE:
+            strings = StringPool(mv, pos)
+        elif ctype == RES_XML_RESOURCE_MAP_TYPE:
+            resource_ids = mv[pos + chunk_header:pos + chunk_size]
+        elif ctype == RES_XML_START_NAMESPACE_TYPE:
+            prefix, uri = _XML_NAMESPACE.unpack_from(mv, pos + chunk_header)
+            namespaces[strings.get(uri)] = strings.get(prefix)
+        elif ctype == RES_XML_START_ELEMENT_TYPE:
+            ext = pos + chunk_header
+            ns, name, attr_start, attr_size, attr_count, _, _, _ = _XML_START_ELEMENT.unpack_from(mv, ext)
+            tag = strings.get(name)
+            if strings.get(ns):
+                tag = f"{{{strings.get(ns)}}}{tag}"
+            attrib = {}
+            for i in range(attr_count):
+                a_ns, a_name, raw, _, _, data_type, value = _XML_ATTRIBUTE.unpack_from(
+                    mv, ext + attr_start + i * attr_size)
+                text = strings.get(raw)
+                attrib[attr_name(a_ns, a_name)] = text if text is not None else \
+                    format_value(data_type, value, strings, table)
+            elem = ET.Element(tag, attrib)
+            if stack:
+                stack[-1].append(elem)
+            else:
+                root = elem
+            stack.append(elem)
+        elif ctype == RES_XML_END_ELEMENT_TYPE:
+            if stack:
+                stack.pop()
+        elif ctype == RES_XML_CDATA_TYPE and stack:
+            (text_index, _, _, _, _) = _XML_CDATA.unpack_from(mv, pos + chunk_header)
+            stack[-1].text = (stack[-1].text or "") + (strings.get(text_index) or "")
+        elif ctype == RES_XML_END_NAMESPACE_TYPE:
+            continue
+    if root is None:
+        raise AxmlError("Binary XML has no root element")
+    for uri, prefix in namespaces.items():
+        if uri and prefix:
+            ET.register_namespace(prefix, uri)
+    return root
+
+
+def to_xml_string(elem: ET.Element) -> str:
+    elem = ET.fromstring(ET.tostring(elem))  # indent() mutates; keep the caller's tree untouched
+    ET.indent(elem)
+    return ET.tostring(elem, encoding="unicode")
+
+
+class ResourceTable:
+    """resources.arsc index: resource id -> type/name and default-config simple values."""
+
+    def __init__(self, data: bytes):
+        self._mv = mv = memoryview(data)
+        ctype, header_size, size = _CHUNK_HEADER.unpack_from(mv, 0)
+        if ctype != RES_TABLE_TYPE:
+            raise AxmlError("Not a resources.arsc table")
+        self.strings: Optional[StringPool] = None
+        self.packages: Dict[int, str] = {}
+        self._types: Dict[Tuple[int, int], str] = {}                       # (pkg, type id) -> type name
+        self._entries: Dict[int, Tuple[int, int, int]] = {}                  # res id -> (key, dataType, data)
+        self._keys: Dict[int, StringPool] = {}                               # pkg -> key pool
+
+        for ctype, chunk_header, pos, chunk_size in _chunks(mv, header_size, min(size, len(mv))):
+            if ctype == RES_STRING_POOL_TYPE:
+                self.strings = StringPool(mv, pos)
+            elif ctype == RES_TABLE_PACKAGE_TYPE:
+                self._parse_package(pos, chunk_header, chunk_size)
+
+    def _parse_package(self, pos: int, header_size: int, size: int) -> None:
+        mv = self._mv
+        pkg_id, raw_name, type_strings, _, key_strings, _ = _TABLE_PACKAGE.unpack_from(mv, pos + 8)
+        self.packages[pkg_id] = raw_name.decode("utf-16-le", "ignore").split("\0", 1)[0]
+        type_pool = StringPool(mv, pos + type_strings)
+        self._keys[pkg_id] = StringPool(mv, pos + key_strings)
+        for i, type_name in enumerate(type_pool):
+            self._types[(pkg_id, i + 1)] = type_name
+
+        for ctype, chunk_header, cpos, _ in _chunks(mv, pos + header_size, pos + size):
+            if ctype != RES_TABLE_TYPE_TYPE:
+                continue
+            type_id, flags, _, entry_count, entries_start = _TABLE_TYPE.unpack_from(mv, cpos + 8)
+            base = (pkg_id << 24) | (type_id << 16)
+            index_pos = cpos + chunk_header
+            for idx, offset in self._entry_offsets(index_pos, flags, entry_count):
+                res_id = base | idx
+                if res_id in self._entries:
+                    continue  # first (default) configuration wins
+                epos = cpos + entries_start + offset
+                e_size, e_flags, key = _TABLE_ENTRY.unpack_from(mv, epos)
+                if e_flags & ENTRY_FLAG_COMPACT:
+                    # Compact entry: key index in the size field, dataType in the high flags byte
+                    self._entries[res_id] = (e_size, e_flags >> 8, key)
+                elif e_flags & ENTRY_FLAG_COMPLEX:
+                    self._entries[res_id] = (key, TYPE_NULL, 0)
+                else:
+                    _, _, data_type, data = _RES_VALUE.unpack_from(mv, epos + e_size)
+                    self._entries[res_id] = (key, data_type, data)
+
+    def _entry_offsets(self, pos: int, flags: int, count: int) -> Iterator[Tuple[int, int]]:
+        mv = self._mv
+        if flags & TYPE_FLAG_SPARSE:
+            for i in range(count):
+                idx, off = struct.unpack_from("<HH", mv, pos + i * 4)
+                yield idx, off * 4
+        elif flags & TYPE_FLAG_OFFSET16:
+            for i in range(count):
+                (off,) = struct.unpack_from("<H", mv, pos + i * 2)
+                if off != 0xFFFF:
+                    yield i, off * 4
+        else:
+            for i in range(count):
+                (off,) = struct.unpack_from("<I", mv, pos + i * 4)
+                if off != NO_ENTRY:
+                    yield i, off
+
+    def __contains__(self, res_id: int) -> bool:
+        return res_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def name(self, res_id: int) -> Optional[str]:
+        entry = self._entries.get(res_id)
+        type_name = self._types.get((res_id >> 24, (res_id >> 16) & 0xFF))
+        if entry is None or type_name is None:
+            return None
+        return f"{type_name}/{self._keys[res_id >> 24].get(entry[0])}"
+
+    def value(self, res_id: int) -> Optional[str]:
+        """Default-configuration value of a simple resource (None for bags/styles)."""
+        entry = self._entries.get(res_id)
+        if entry is None or entry[1] == TYPE_NULL:
+            return None
+        return format_value(entry[1], entry[2], self.strings, self)
+
+    def resources(self, type_name: Optional[str] = None) -> Iterator[Tuple[int, str, Optional[str]]]:
+        for res_id in sorted(self._entries):
+            name = self.name(res_id)
+            if type_name is None or name.startswith(type_name + "/"):
+                yield res_id, name, self.value(res_id)
+
+
+def load_resource_table(index: ApkIndex) -> Optional[ResourceTable]:
+    return ResourceTable(index.read(RESOURCES)) if RESOURCES in index else None
+
+
+def read_xml(index: ApkIndex, name: str, table: Optional[ResourceTable] = None) -> ET.Element:
+    return parse_axml(index.read(name), table)
+
+
+def android_attr(elem: ET.Element, name: str) -> Optional[str]:
+    """android:name, also when it was decoded under its bare 0x0101.... id (unknown to ANDROID_ATTRS)."""
+    value = elem.get(f"{{{ANDROID_NS}}}{name}")
+    if value is None and name in ANDROID_ATTR_IDS:
+        value = elem.get(f"{{{ANDROID_NS}}}0x{ANDROID_ATTR_IDS[name]:08x}")
+    return value
+
+
+def resource_map(data: bytes) -> Dict[int, str]:
+    """{attribute id: name} from a binary XML's resource map and string pool (names aapt2 kept)."""
+    if not is_binary_xml(data):
+        return {}
+    mv = memoryview(data)
+    _, header_size, size = _CHUNK_HEADER.unpack_from(mv, 0)
+    strings: Optional[StringPool] = None
+    ids: List[int] = []
+    for ctype, chunk_header, pos, chunk_size in _chunks(mv, header_size, min(size, len(mv))):
+        if ctype == RES_STRING_POOL_TYPE:
+            strings = StringPool(mv, pos)
+        elif ctype == RES_XML_RESOURCE_MAP_TYPE:
+            ids = list(struct.unpack_from(f"<{(chunk_size - chunk_header) // 4}I", mv, pos + chunk_header))
+    if strings is None:
+        return {}
+    return {res_id: strings.get(i) for i, res_id in enumerate(ids) if strings.get(i)}
+
+
+def check_attr_table(data: bytes) -> List[str]:
+    """Disagreements between ANDROID_ATTRS and the resource map of a compiled XML file."""
+    problems = []
+    for res_id, name in sorted(resource_map(data).items()):
+        known = ANDROID_ATTRS.get(res_id)
+        if known is not None and known != name:
+            problems.append(f"0x{res_id:08x} is {name}, ANDROID_ATTRS says {known}")
+        elif known is None and name in ANDROID_ATTR_IDS:
+            problems.append(f"{name} is 0x{res_id:08x}, ANDROID_ATTRS says 0x{ANDROID_ATTR_IDS[name]:08x}")
+    return problems
+
+
+def manifest_summary(root: ET.Element, table: Optional[ResourceTable] = None) -> Dict:
+    """Package, versions, SDK levels, cleartext/network-config settings and the launcher icon."""
+    app = root.find("application")
+    uses_sdk = root.find("uses-sdk")
+    summary = {
+        "package": root.get("package"),
+        "versionCode": android_attr(root, "versionCode"),
+        "versionName": android_attr(root, "versionName"),
+        "minSdkVersion": android_attr(uses_sdk, "minSdkVersion") if uses_sdk is not None else None,
+        "targetSdkVersion": android_attr(uses_sdk, "targetSdkVersion") if uses_sdk is not None else None,
+        "permissions": [android_attr(p, "name") for p in root.findall("uses-permission")],
+    }
+    if app is not None:
+        for key in ("label", "icon", "roundIcon", "usesCleartextTraffic", "networkSecurityConfig",
+                    "extractNativeLibs", "debuggable"):
+            summary[key] = android_attr(app, key)
+        label = summary.get("label")
+        if table and label and label.startswith("@string/"):
+            for res_id, name, value in table.resources("string"):
+                if f"@{name}" == label:
+                    summary["label"] = value
+                    break
+    return summary
+
+
+def network_security_summary(root: ET.Element) -> Dict:
+    """Base cleartext policy plus every domain-config with its domains and cleartext flag."""
+    base = root.find("base-config")
+    configs = []
+    for dc in root.iter("domain-config"):
+        configs.append({
+            "cleartextTrafficPermitted": dc.get("cleartextTrafficPermitted"),
+            "domains": [
+                (d.text or "").strip() + (" (+subdomains)" if d.get("includeSubdomains") == "true" else "")
+                for d in dc.findall("domain")
+            ],
+        })
+    return {
+        "base_cleartextTrafficPermitted": base.get("cleartextTrafficPermitted") if base is not None else None,
+        "domain_configs": configs,
+    }
+
+
+def adaptive_icon_layers(root: ET.Element) -> Dict[str, Optional[str]]:
+    layers = {}
+    for layer in ("background", "foreground", "monochrome"):
+        elem = root.find(layer)
+        layers[layer] = android_attr(elem, "drawable") if elem is not None else None
+    return layers
+
+
+def _print_dict(d: Dict, indent: str = "  ") -> None:
+    for k, v in d.items():
+        if isinstance(v, list) and v and isinstance(v[0], dict):
+            print(f"{indent}{k}:")
+            for item in v:
+                print(f"{indent}  -")
+                _print_dict(item, indent + "    ")
+        else:
+            print(f"{indent}{k}: {v}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Decode Android binary XML and resources.arsc from an APK.")
+    parser.add_argument("apk", nargs="?", help="APK path (default: first existing of the apk_index candidates)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("manifest", help="Summarize AndroidManifest.xml")
+    sub.add_parser("netconfig", help="Summarize res/xml/network_security_config.xml")
+    sub.add_parser("adaptive", help="Show adaptive-icon layers")
+    p = sub.add_parser("xml", help="Decode one binary XML entry to text")
+    p.add_argument("entry")
+    p.add_argument("--out", help="Write the decoded XML here instead of stdout")
+    p = sub.add_parser("resources", help="List resources.arsc entries")
+    p.add_argument("--type", help="Only this resource type (string, xml, mipmap, ...)")
+    sub.add_parser("attrs", help="Check the framework attribute ids against the manifest's resource map")
+    args = parser.parse_args(argv)
+
+    apk_path = args.apk or find_default_apk()
+    if not apk_path or not os.path.exists(apk_path):
+        print("No APK found")
+        return 1
+    try:
+        index = ApkIndex.load(apk_path)
+        table = load_resource_table(index)
+        if args.command == "manifest":
+            print(f"{MANIFEST} ({apk_path}):")
+            _print_dict(manifest_summary(read_xml(index, MANIFEST, table), table))
+        elif args.command == "netconfig":
+            if NETWORK_CONFIG not in index:
+                print(f"{NETWORK_CONFIG} not found")
+                return 2
+            print(f"{NETWORK_CONFIG}:")
+            _print_dict(network_security_summary(read_xml(index, NETWORK_CONFIG, table)))
+        elif args.command == "adaptive":
+            for entry in index.matching(patterns=ADAPTIVE_PATTERNS):
+                if entry.name.endswith(".xml"):
+                    print(f"{entry.name}: {adaptive_icon_layers(read_xml(index, entry.name, table))}")
+        elif args.command == "xml":
+            text = to_xml_string(read_xml(index, args.entry, table))
+            if args.out:
+                with open(args.out, "w", encoding="utf-8") as f:
+                    f.write(text + "\n")
+                print(f"Saved to {args.out}")
+            else:
+                print(text)
+        elif args.command == "resources":
+            if table is None:
+                print(f"{RESOURCES} not found")
+                return 2
+            for res_id, name, value in table.resources(args.type):
+                print(f"  0x{res_id:08x} {name}" + (f" = {value}" if value is not None else ""))
+        elif args.command == "attrs":
+            data = index.read(MANIFEST)
+            checked = [i for i, name in resource_map(data).items() if i in ANDROID_ATTRS or name in ANDROID_ATTR_IDS]
+            problems = check_attr_table(data)
+            for problem in problems:
+                print(f"  ✗ {problem}")
+            print(f"{len(checked)} framework attribute ids checked against {MANIFEST}, {len(problems)} wrong")
+            return 1 if problems else 0
+    except (OSError, KeyError, BadApkError, ET.ParseError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Brand Icon Generator
+
+Generates every icon a brand needs from one source image in public/brands/<brand>/:
+
+- Android launcher icons: mipmap-<density>/ic_launcher.png and ic_launcher_round.png (48dp)
+- Adaptive icon layers:   mipmap-<density>/ic_launcher_foreground.png / ic_launcher_background.png (108dp,
+                          logo inside the 66dp safe zone, background filled with the logo's edge color)
+- Web icons:              favicon-16x16.png, favicon-32x32.png, favicon.ico, apple-touch-icon.png,
+                          android-chrome-192x192.png, android-chrome-512x512.png
+
+Outputs go to public/brands/<brand>/generated/. apk_repack.py picks up only ic_launcher.png and
+ic_launcher_round.png from there (and drops the APK's anydpi-v26 adaptive icon XMLs); the foreground/
+background layers are generated for the Android project and are not consumed by repack.
+Each brand's generated/.manifest.json records the SHA-256 of its source image and of the output spec,
+so unchanged brands are skipped; resizing jobs of all stale brands run in one process pool (each
+worker decodes a source once per group of outputs).
+
+The source is the highest-resolution of icon.png / android-chrome-512x512.png, else the largest square
+PNG in the brand folder; --source <brand>=<file> overrides it.
+
+Usage (run from the repo root):
+  python scripts/brand_icons.py
+  python scripts/brand_icons.py paynex xoinpay --force
+  python scripts/brand_icons.py --source basaltsurge=bshield.png
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    print("Error: Pillow is required. Install with: pip install Pillow")
+    sys.exit(1)
+
+BRANDS_DIR = os.path.join("public", "brands")
+GENERATED_DIR = "generated"
+MANIFEST_FILE = ".manifest.json"
+GENERATOR_VERSION = 1
+
+SOURCE_CANDIDATES = ["icon.png", "android-chrome-512x512.png"]
+DENSITIES = {"mdpi": 1.0, "hdpi": 1.5, "xhdpi": 2.0, "xxhdpi": 3.0, "xxxhdpi": 4.0}
+LAUNCHER_DP = 48
+ADAPTIVE_DP = 108
+ADAPTIVE_SAFE_ZONE = 66 / 108
+WEB_ICONS = {
+    "favicon-16x16.png": 16,
+    "favicon-32x32.png": 32,
+    "apple-touch-icon.png": 180,
+    "android-chrome-192x192.png": 192,
+    "android-chrome-512x512.png": 512,
+}
+FAVICON_ICO_SIZES = [16, 32, 48]
+
+
+class IconJob(NamedTuple):
+    source: str
+    dest: str
+    kind: str         # square | round | foreground | background | ico
+    size: int
+    background: Tuple[int, int, int, int]
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def list_brands(brands_dir: str = BRANDS_DIR) -> List[str]:
+    return sorted(d for d in os.listdir(brands_dir) if os.path.isdir(os.path.join(brands_dir, d)))
+
+
+def pick_source(brand_dir: str) -> Optional[str]:
+    """Highest-resolution preferred candidate, else the largest square PNG in the brand folder."""
+    def area(path: str) -> int:
+        with Image.open(path) as im:
+            return im.width * im.height
+
+    candidates = [os.path.join(brand_dir, c) for c in SOURCE_CANDIDATES if os.path.exists(os.path.join(brand_dir, c))]
+    if candidates:
+        return max(candidates, key=area)
+    squares = []
+    for f in sorted(os.listdir(brand_dir)):
+        path = os.path.join(brand_dir, f)
+        if f.lower().endswith(".png") and os.path.isfile(path):
+            with Image.open(path) as im:
+                if im.width == im.height:
+                    squares.append((im.width * im.height, path))
+    return max(squares, key=lambda s: s[0])[1] if squares else None
+
+
+def edge_color(path: str) -> Tuple[int, int, int, int]:
+    """Average color of the opaque border pixels (white when the border is transparent)."""
+    with Image.open(path) as im:
+        im = im.convert("RGBA").resize((64, 64), Image.LANCZOS)
+    w, h = im.size
+    border = [im.getpixel((x, y)) for x in range(w) for y in (0, h - 1)] + \
+             [im.getpixel((x, y)) for y in range(h) for x in (0, w - 1)]
+    opaque = [p for p in border if p[3] > 200]
+    if len(opaque) < len(border) // 2:
+        return (255, 255, 255, 255)
+    return tuple(sum(p[i] for p in opaque) // len(opaque) for i in range(3)) + (255,)
+
+
+def plan_jobs(source: str, out_dir: str, background: Tuple[int, int, int, int]) -> List[IconJob]:
+    jobs = []
+    for density, scale in DENSITIES.items():
+        folder = os.path.join(out_dir, f"mipmap-{density}")
+        launcher, adaptive = round(LAUNCHER_DP * scale), round(ADAPTIVE_DP * scale)
+        jobs.append(IconJob(source, os.path.join(folder, "ic_launcher.png"), "square", launcher, background))
+        jobs.append(IconJob(source, os.path.join(folder, "ic_launcher_round.png"), "round", launcher, background))
+        jobs.append(IconJob(source, os.path.join(folder, "ic_launcher_foreground.png"), "foreground", adaptive,
+                            background))
+        jobs.append(IconJob(source, os.path.join(folder, "ic_launcher_background.png"), "background", adaptive,
+                            background))
+    for name, size in WEB_ICONS.items():
+        jobs.append(IconJob(source, os.path.join(out_dir, name), "square", size, background))
+    jobs.append(IconJob(source, os.path.join(out_dir, "favicon.ico"), "ico", max(FAVICON_ICO_SIZES), background))
+    return jobs
+
+
+def spec_hash(jobs: List[IconJob], out_dir: str) -> str:
+    """Hash of what is generated (paths, kinds, sizes, background), so spec changes also invalidate."""
+    spec = [(os.path.relpath(j.dest, out_dir), j.kind, j.size, j.background) for j in jobs]
+    return hashlib.sha256(json.dumps([GENERATOR_VERSION, spec]).encode("utf-8")).hexdigest()
+
+
+def _fit(im: "Image.Image", size: int) -> "Image.Image":
+    """Scale im to fit a size x size transparent square, centered (keeps the aspect ratio)."""
+    im = im.copy()
+    im.thumbnail((size, size), Image.LANCZOS)
+    canvas = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    canvas.paste(im, ((size - im.width) // 2, (size - im.height) // 2), im)
+    return canvas
+
+
+def render(job: IconJob, src: "Image.Image") -> str:
+    """Render one output file from the decoded RGBA source. Returns the destination path."""
+    os.makedirs(os.path.dirname(job.dest), exist_ok=True)
+    if job.kind == "background":
+        Image.new("RGBA", (job.size, job.size), job.background).save(job.dest, optimize=True)
+    elif job.kind == "ico":
+        _fit(src, job.size).save(job.dest, sizes=[(s, s) for s in FAVICON_ICO_SIZES])
+    elif job.kind == "foreground":
+        layer = Image.new("RGBA", (job.size, job.size), (0, 0, 0, 0))
+        logo = _fit(src, round(job.size * ADAPTIVE_SAFE_ZONE))
+        offset = (job.size - logo.width) // 2
+        layer.paste(logo, (offset, offset), logo)
+        layer.save(job.dest, optimize=True)
+    elif job.kind == "round":
+        icon = _fit(src, job.size)
+        mask = Image.new("L", (job.size * 4, job.size * 4), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, job.size * 4 - 1, job.size * 4 - 1), fill=255)
+        mask = mask.resize((job.size, job.size), Image.LANCZOS)
+        disc = Image.new("RGBA", (job.size, job.size), job.background)
+        disc.alpha_composite(icon)
+        disc.putalpha(mask)
+        disc.save(job.dest, optimize=True)
+    else:
+        _fit(src, job.size).save(job.dest, optimize=True)
+    return job.dest
+
+
+def render_group(group: List[IconJob]) -> List[str]:
+    """Render jobs sharing one source (runs in a worker process); the source is decoded once."""
+    with Image.open(group[0].source) as im:
+        src = im.convert("RGBA")
+    largest = max(j.size for j in group)
+    if max(src.size) > 2 * largest:
+        src.thumbnail((2 * largest, 2 * largest), Image.LANCZOS)
+    return [render(job, src) for job in group]
+
+
+def load_manifest(out_dir: str) -> Dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(out_dir: str, manifest: Dict) -> None:
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def generate(brands: List[str], sources: Dict[str, str], force: bool = False,
+             jobs: Optional[int] = None, brands_dir: str = BRANDS_DIR) -> Dict[str, str]:
+    """Regenerate stale brands. Returns brand -> status (generated / up to date / skipped: reason)."""
+    status: Dict[str, str] = {}
+    pending: Dict[str, Tuple[str, Dict, List[IconJob]]] = {}
+
+    for brand in brands:
+        brand_dir = os.path.join(brands_dir, brand)
+        source = os.path.join(brand_dir, sources[brand]) if brand in sources else pick_source(brand_dir)
+        if not source or not os.path.exists(source):
+            status[brand] = "skipped: no source image"
+            continue
+        out_dir = os.path.join(brand_dir, GENERATED_DIR)
+        old = load_manifest(out_dir)
+        source_sha256 = file_sha256(source)
+        # The edge color only depends on the source, so reuse it while the source is unchanged
+        if old.get("source_sha256") == source_sha256 and old.get("background"):
+            background = tuple(old["background"])
+        else:
+            background = edge_color(source)
+        plan = plan_jobs(source, out_dir, background)
+        manifest = {
+            "source": os.path.relpath(source, brand_dir),
+            "source_sha256": source_sha256,
+            "spec_sha256": spec_hash(plan, out_dir),
+            "background": list(background),
+        }
+        outputs_exist = all(os.path.exists(j.dest) for j in plan)
+        if not force and outputs_exist and all(old.get(k) == v for k, v in manifest.items()):
+            status[brand] = "up to date"
+            continue
+        pending[brand] = (out_dir, manifest, plan)
+
+    # Split each brand's jobs into a few groups so all workers stay busy, decoding the source once per group
+    workers = max(1, jobs or os.cpu_count() or 1)
+    groups = []
+    for _, _, plan in pending.values():
+        per_group = max(1, -(-len(plan) * len(pending) // workers))
+        groups.extend(plan[i:i + per_group] for i in range(0, len(plan), per_group))
+    if groups:
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+            list(pool.map(render_group, groups))
+
+    for brand, (out_dir, manifest, plan) in pending.items():
+        manifest["outputs"] = {os.path.relpath(j.dest, out_dir): file_sha256(j.dest) for j in plan}
+        write_manifest(out_dir, manifest)
+        status[brand] = f"generated {len(plan)} files from {manifest['source']}"
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate Android/web icons for each brand, cached by content hash.")
+    parser.add_argument("brands", nargs="*", help="Brands under public/brands (default: all)")
+    parser.add_argument("--source", action="append", default=[], metavar="BRAND=FILE",
+                        help="Source image for a brand, relative to its folder")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if sources are unchanged")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(BRANDS_DIR):
+        print(f"{BRANDS_DIR} not found (run from the repo root)")
+        return 1
+    brands = args.brands or list_brands()
+    sources = dict(s.split("=", 1) for s in args.source)
+    for brand, state in generate(brands, sources, args.force, args.jobs).items():
+        print(f"  {brand}: {state}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
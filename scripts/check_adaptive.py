@@ -1,24 +1,19 @@
-import zipfile
 import os
+from apk_index import ApkIndex, ADAPTIVE_PATTERNS, print_entries
+from axml import load_resource_table, read_xml, adaptive_icon_layers
 
 apk_path = os.path.join("tmp", "deployed_xoinpay.apk")
 
 try:
-    with zipfile.ZipFile(apk_path, 'r') as z:
-        print("Checking for adaptive icon XMLs:")
-        adaptive_patterns = [
-            "mipmap-anydpi",
-            "ic_launcher.xml",
-            "ic_launcher_round.xml",
-            "ic_launcher_foreground",
-            "ic_launcher_background",
-        ]
-        
-        for n in z.namelist():
-            for p in adaptive_patterns:
-                if p in n:
-                    info = z.getinfo(n)
-                    print(f"  {n} ({info.file_size} bytes)")
-                    break
+    index = ApkIndex.load(apk_path)
+    entries = index.matching(patterns=ADAPTIVE_PATTERNS)
+    print("Checking for adaptive icon XMLs:")
+    print_entries(entries)
+
+    table = load_resource_table(index)
+    for entry in entries:
+        if entry.name.endswith(".xml"):
+            layers = adaptive_icon_layers(read_xml(index, entry.name, table))
+            print(f"  {entry.name}: " + ", ".join(f"{k}={v}" for k, v in layers.items() if v))
 except Exception as e:
     print(f"Error: {e}")
@@ -1,18 +1,25 @@
-import zipfile
 import os
+from apk_index import ApkIndex
+from axml import NETWORK_CONFIG, load_resource_table, read_xml, to_xml_string, network_security_summary
 
 apk_path = os.path.join("tmp", "master.apk")
 dest_path = os.path.join("tmp", "network_security_config.xml")
 
 try:
-    with zipfile.ZipFile(apk_path, 'r') as z:
-        try:
-            with z.open("res/xml/network_security_config.xml") as f:
-                content = f.read()
-                with open(dest_path, "wb") as out:
-                    out.write(content)
-            print(f"Saved to {dest_path}")
-        except KeyError:
-            print("network_security_config.xml not found")
+    index = ApkIndex.load(apk_path)
+    if NETWORK_CONFIG in index:
+        # Decode the compiled binary XML so the saved file is readable
+        root = read_xml(index, NETWORK_CONFIG, load_resource_table(index))
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(to_xml_string(root) + "\n")
+        print(f"Saved to {dest_path}")
+
+        summary = network_security_summary(root)
+        print(f"  base-config cleartextTrafficPermitted: {summary['base_cleartextTrafficPermitted']}")
+        for dc in summary["domain_configs"]:
+            print(f"  domain-config cleartextTrafficPermitted={dc['cleartextTrafficPermitted']}: "
+                  f"{', '.join(dc['domains'])}")
+    else:
+        print("network_security_config.xml not found")
 except Exception as e:
     print(f"Error: {e}")
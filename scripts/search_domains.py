@@ -1,35 +1,32 @@
-import subprocess
 import os
+import sys
+from apk_search import search_apk, print_report
 
 apk_path = os.path.join("tmp", "master.apk")
 
-# Try to use aapt2 dump to get network security config
-# aapt2 is typically in Android SDK build-tools
-# Alternatively, we can use apktool or just look for text patterns
-
-# For now, let's just grep for domain patterns in the raw binary
-with open(apk_path, "rb") as f:
-    content = f.read()
-    
-# Search for common domain patterns
+# Search the decompressed content of every APK entry (the network security config, manifest and
+# resources are deflated, so a grep over the raw archive bytes silently misses them)
 domains = [
-    b"paynex",
-    b"xoinpay", 
-    b"azurewebsites.net",
-    b"*.azurewebsites.net",
-    b"cleartextTrafficPermitted",
-    b"domain-config",
+    "paynex",
+    "xoinpay",
+    "azurewebsites.net",
+    "*.azurewebsites.net",
+    "cleartextTrafficPermitted",
+    "domain-config",
 ]
 
-print("Searching for domain patterns in APK binary:")
-for d in domains:
-    if d in content:
-        # Find position and print context
-        pos = content.find(d)
-        context = content[max(0, pos-20):min(len(content), pos+len(d)+20)]
-        print(f"  Found '{d.decode('latin-1', 'ignore')}' at position {pos}")
-        # Print readable parts
-        readable = ''.join(chr(b) if 32 <= b < 127 else '.' for b in context)
-        print(f"    Context: {readable}")
-    else:
-        print(f"  NOT found: '{d.decode('latin-1', 'ignore')}'")
+
+def main() -> int:
+    try:
+        hits = search_apk(apk_path, domains)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    print("Searching for domain patterns in APK entries:")
+    print_report(domains, hits)
+    return 0
+
+
+# search_apk starts worker processes, which re-import this script on spawn platforms (Windows, macOS)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+APIM Policy Sync
+
+Extracts the raw XML of every APIM policy body in infra/policies (*-body.json, *-policy.json:
+{"properties": {"format": "rawxml", "value": "<policies>..."}}) to tmp/<name>.xml, e.g.
+product-portalpay-pro-policy-body.json -> tmp/portalpay-pro-policy.xml.
+
+- Only bodies whose SHA-256 changed since the last run (or whose XML is missing) are extracted; state is
+  kept in tmp/.policy_sync.json.
+- Bodies are processed concurrently and XML is written atomically (.tmp + rename).
+- For each changed body, the policy elements are compared structurally with the previous run, e.g.
+  "inbound/rate-limit-by-key: calls 2500 -> 5000", "inbound/quota-by-key: added".
+
+Usage:
+  python sync_policies.py
+  python sync_policies.py --dry-run     # report changes without writing
+  python sync_policies.py --force
+"""
+
+import os
+import sys
+import glob
+import json
+import hashlib
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+POLICIES_DIR = os.path.join("infra", "policies")
+BODY_PATTERNS = ["*-body.json", "*-policy.json"]
+OUT_DIR = "tmp"
+STATE_FILE = os.path.join(OUT_DIR, ".policy_sync.json")
+
+
+def discover(policies_dir: str = POLICIES_DIR) -> List[str]:
+    found = set()
+    for pattern in BODY_PATTERNS:
+        found.update(glob.glob(os.path.join(policies_dir, pattern)))
+    return sorted(found)
+
+
+def output_name(body_path: str) -> str:
+    """product-portalpay-pro-policy-body.json -> portalpay-pro-policy.xml"""
+    name = os.path.basename(body_path)
+    name = name[:-len("-body.json")] if name.endswith("-body.json") else os.path.splitext(name)[0]
+    if name.startswith("product-"):
+        name = name[len("product-"):]
+    return name + ".xml"
+
+
+def policy_elements(xml: str) -> Dict[str, Dict[str, str]]:
+    """Flatten a policy document to {path: attributes (+ text)}; repeated siblings get [n] suffixes."""
+    elements: Dict[str, Dict[str, str]] = {}
+
+    def walk(elem: ET.Element, prefix: str) -> None:
+        counts: Dict[str, int] = {}
+        for child in elem:
+            if not isinstance(child.tag, str):
+                continue
+            n = counts.get(child.tag, 0)
+            counts[child.tag] = n + 1
+            path = f"{prefix}{child.tag}" + (f"[{n}]" if n else "")
+            attrs = dict(child.attrib)
+            text = (child.text or "").strip()
+            if text and len(child) == 0:
+                attrs["#text"] = text
+            elements[path] = attrs
+            walk(child, path + "/")
+
+    walk(ET.fromstring(xml.encode("utf-8")), "")
+    return elements
+
+
+def diff_elements(old: Dict[str, Dict[str, str]], new: Dict[str, Dict[str, str]]) -> List[str]:
+    changes = []
+    for path in sorted(set(old) | set(new)):
+        if path not in old:
+            changes.append(f"{path}: added " + " ".join(f'{k}="{v}"' for k, v in new[path].items()))
+        elif path not in new:
+            changes.append(f"{path}: removed")
+        elif old[path] != new[path]:
+            a, b = old[path], new[path]
+            for key in sorted(set(a) | set(b)):
+                if a.get(key) != b.get(key):
+                    changes.append(f"{path}: {key} {a.get(key, '(unset)')} -> {b.get(key, '(unset)')}")
+    return changes
+
+
+def sync_one(body_path: str, previous: Optional[Dict], out_dir: str, force: bool, dry_run: bool) -> Dict:
+    """Extract one policy body if it changed. Never raises; errors are reported in the result."""
+    out_path = os.path.join(out_dir, output_name(body_path))
+    result = {"source": body_path, "output": out_path, "status": "unchanged", "changes": []}
+    try:
+        with open(body_path, "rb") as f:
+            raw = f.read()
+        sha = hashlib.sha256(raw).hexdigest()
+        if not force and previous and previous.get("sha256") == sha and os.path.exists(out_path):
+            result["state"] = previous
+            return result
+
+        xml = json.loads(raw)["properties"]["value"]
+        elements = policy_elements(xml)
+        if previous and previous.get("elements") is not None:
+            result["changes"] = diff_elements(previous["elements"], elements)
+        result["status"] = "updated" if previous else "new"
+        result["state"] = {"sha256": sha, "output": out_path, "elements": elements}
+        if not dry_run:
+            os.makedirs(out_dir, exist_ok=True)
+            with open(out_path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(xml)
+            os.replace(out_path + ".tmp", out_path)
+    except (OSError, ValueError, KeyError, ET.ParseError) as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        result["state"] = previous
+    return result
+
+
+def load_state(path: str = STATE_FILE) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: Dict, path: str = STATE_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def sync(bodies: List[str], out_dir: str = OUT_DIR, force: bool = False, dry_run: bool = False,
+         jobs: Optional[int] = None) -> List[Dict]:
+    state = load_state()
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(bodies) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda b: sync_one(b, state.get(b), out_dir, force, dry_run), bodies))
+    if not dry_run:
+        # Merge, so syncing a single body keeps the saved elements of every other policy
+        new_state = {source: entry for source, entry in state.items() if os.path.exists(source)}
+        new_state.update({r["source"]: r["state"] for r in results if r.get("state")})
+        if new_state != state:
+            save_state(new_state)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract changed APIM policy bodies to XML and diff their elements.")
+    parser.add_argument("bodies", nargs="*", help=f"Policy body JSON files (default: discover in {POLICIES_DIR})")
+    parser.add_argument("--out-dir", default=OUT_DIR, help=f"Where to write the XML (default: {OUT_DIR})")
+    parser.add_argument("--force", action="store_true", help="Extract even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing anything")
+    parser.add_argument("--jobs", type=int, help="Concurrent workers (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    bodies = args.bodies or discover()
+    if not bodies:
+        print(f"No policy bodies found in {POLICIES_DIR}")
+        return 1
+    results = sync(bodies, args.out_dir, args.force, args.dry_run, args.jobs)
+    for r in results:
+        if r["status"] == "error":
+            print(f"  Error: {r['source']}: {r['error']}")
+        elif r["status"] == "unchanged":
+            print(f"  {r['source']}: unchanged")
+        else:
+            verb = "would extract" if args.dry_run else "extracted"
+            print(f"  {r['source']}: {r['status']}, {verb} {r['output']}")
+            for change in r["changes"]:
+                print(f"      {change}")
+    changed = sum(r["status"] in ("new", "updated") for r in results)
+    print(f"{changed} changed, {len(results) - changed} unchanged or failed")
+    return 1 if any(r["status"] == "error" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
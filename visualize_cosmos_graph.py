@@ -4,26 +4,72 @@ Cosmos DB Graph Visualizer - Dynamic & Aesthetic Edition
 --------------------------------------------------------
 Beautiful, interactive graph visualization of Azure Cosmos DB data
 with PortalPay-inspired styling and modern aesthetics.
+
+Each stage is a subcommand that reads and writes its own artifact and imports only
+what it needs (azure-cosmos for fetch, networkx for build, networkx + matplotlib for
+render; stats, export and query are plain Python):
+
+  fetch   Cosmos            -> cosmos_items.json
+  build   cosmos_items.json -> cosmos_graph_full.json  (node data kept in full)
+  stats   graph file        -> terminal
+  export  graph file        -> cosmos_graph.json       (node data truncated to 5 fields)
+  render  graph file        -> cosmos_graph.png        (--show opens the window)
+  query   graph file        -> nodes by --id / --type / --field NAME=VALUE
+  summary graph file        -> cosmos_graph_summary.png (supernodes per type / wallet / brand,
+                               --expand GROUP drills into one; needs numpy)
+
+Usage:
+  python visualize_cosmos_graph.py                 # all stages, as before
+  python visualize_cosmos_graph.py fetch --max-items 500
+  python visualize_cosmos_graph.py build && python visualize_cosmos_graph.py render
+  python visualize_cosmos_graph.py stats --graph cosmos_graph.json
+  python visualize_cosmos_graph.py query --type inventory_item --limit 20
+  python visualize_cosmos_graph.py summary --by wallet --list
+  python visualize_cosmos_graph.py summary --expand group:receipt
 """
 
 import os
 import sys
-from typing import Dict, List, Any
 import json
+import math
+import argparse
+import importlib
+from typing import Dict, List, Any, Optional
+
+ITEMS_FILE = 'cosmos_items.json'
+GRAPH_FILE = 'cosmos_graph_full.json'
+EXPORT_FILE = 'cosmos_graph.json'
+IMAGE_FILE = 'cosmos_graph.png'
+EXPORT_DATA_FIELDS = 5
+SUMMARY_IMAGE_FILE = 'cosmos_graph_summary.png'
+GROUP_BY = ('type', 'wallet', 'brand')
+EXPAND_LIMIT = 200
+LABEL_FONTSIZE = 9
+LABEL_CHAR_WIDTH = 0.6   # average glyph width / line height, in font sizes
+LABEL_LINE_HEIGHT = 1.2
+
+
+def _require(module: str, package: str):
+    """Import a dependency on first use, so each stage only pays for the packages it needs."""
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        print(f"Error: Missing required package - {e}")
+        print("\nPlease install required packages:")
+        print(f"  pip install {package}")
+        sys.exit(1)
+
 
-try:
-    from azure.cosmos import CosmosClient, exceptions
-    import networkx as nx
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    from matplotlib.patches import FancyBboxPatch
-    from dotenv import load_dotenv
-    import numpy as np
-except ImportError as e:
-    print(f"Error: Missing required package - {e}")
-    print("\nPlease install required packages:")
-    print("  pip install azure-cosmos python-dotenv networkx matplotlib numpy")
-    sys.exit(1)
+def _load_env() -> None:
+    _require('dotenv', 'python-dotenv').load_dotenv()
+
+
+def _pyplot(show: bool):
+    """matplotlib.pyplot, on the non-GUI Agg backend unless the window is wanted."""
+    matplotlib = _require('matplotlib', 'matplotlib')
+    if not show:
+        matplotlib.use('Agg')
+    return importlib.import_module('matplotlib.pyplot')
 
 
 # PortalPay Color Scheme
@@ -42,54 +88,102 @@ COLORS = {
 }
 
 
+def connect_cosmos() -> Dict[str, Any]:
+    """Connect to the PortalPay container configured in the environment (.env is loaded).
+
+    Returns a dict with connection_string, database_id, container_id, client, database and container.
+    """
+    _load_env()
+
+    connection_string = os.getenv('COSMOS_CONNECTION_STRING')
+    database_id = os.getenv('COSMOS_PAYPORTAL_DB_ID', 'payportal')
+    container_id = os.getenv('COSMOS_PAYPORTAL_CONTAINER_ID', 'payportal_events')
+
+    if not connection_string:
+        raise ValueError("COSMOS_CONNECTION_STRING not found in environment variables")
+
+    cosmos = _require('azure.cosmos', 'azure-cosmos')
+    client = cosmos.CosmosClient.from_connection_string(connection_string)
+    database = client.get_database_client(database_id)
+    return {
+        'connection_string': connection_string,
+        'database_id': database_id,
+        'container_id': container_id,
+        'client': client,
+        'database': database,
+        'container': database.get_container_client(container_id),
+    }
+
+
 class CosmosGraphVisualizer:
     """Visualize Cosmos DB data as a beautiful, dynamic graph network."""
-    
-    def __init__(self):
-        """Initialize the visualizer with environment variables."""
-        load_dotenv()
-        
-        self.connection_string = os.getenv('COSMOS_CONNECTION_STRING')
-        self.database_id = os.getenv('COSMOS_PAYPORTAL_DB_ID', 'payportal')
-        self.container_id = os.getenv('COSMOS_PAYPORTAL_CONTAINER_ID', 'payportal_events')
-        
-        if not self.connection_string:
-            raise ValueError("COSMOS_CONNECTION_STRING not found in environment variables")
-        
-        # Initialize Cosmos client
-        self.client = CosmosClient.from_connection_string(self.connection_string)
-        self.database = self.client.get_database_client(self.database_id)
-        self.container = self.database.get_container_client(self.container_id)
-        
-        # Initialize graph
-        self.graph = nx.DiGraph()
+
+    def __init__(self, connect: bool = True):
+        """Initialize the visualizer with environment variables.
+
+        With connect=False no Cosmos client is created (for stages working from saved artifacts).
+        """
+        if connect:
+            cosmos = connect_cosmos()
+        else:
+            _load_env()
+            cosmos = {
+                'connection_string': None,
+                'database_id': os.getenv('COSMOS_PAYPORTAL_DB_ID', 'payportal'),
+                'container_id': os.getenv('COSMOS_PAYPORTAL_CONTAINER_ID', 'payportal_events'),
+                'client': None,
+                'database': None,
+                'container': None,
+            }
+        self.connection_string = cosmos['connection_string']
+        self.database_id = cosmos['database_id']
+        self.container_id = cosmos['container_id']
+        self.client = cosmos['client']
+        self.database = cosmos['database']
+        self.container = cosmos['container']
+
+        # Graph is created by build_graph() / load_graph() (networkx is imported there)
+        self.graph = None
         self.node_colors = []
         self.node_types = {}
-        
-    def fetch_data(self, max_items: int = 100) -> List[Dict[str, Any]]:
+
+    def fetch_data(self, max_items: int = 100, query: str = "SELECT * FROM c") -> List[Dict[str, Any]]:
         """Fetch data from Cosmos DB container."""
         print(f"🔍 Fetching data from {self.database_id}/{self.container_id}...")
-        
+        exceptions = _require('azure.cosmos.exceptions', 'azure-cosmos')
+
         try:
-            query = "SELECT * FROM c"
             items = list(self.container.query_items(
                 query=query,
                 enable_cross_partition_query=True,
                 max_item_count=max_items
             ))
-            
+
             print(f"✓ Fetched {len(items)} items")
             return items
-            
+
         except exceptions.CosmosHttpResponseError as e:
             print(f"✗ Error fetching data: {e.message}")
             return []
+
+    def load_graph(self, path: str):
+        """Load a graph file written by build (or export) into self.graph."""
+        data = load_graph_data(path)
+        metadata = data.get('metadata', {})
+        self.database_id = metadata.get('database', self.database_id)
+        self.container_id = metadata.get('container', self.container_id)
+        self.node_types = dict(metadata.get('node_types', {}))
+        self.graph = graph_from_data(data)
+        return self.graph
     
     def build_graph(self, items: List[Dict[str, Any]]):
         """Build a graph from Cosmos DB items with smart relationship detection."""
         print("🔨 Building graph from data...")
-        
+        if self.graph is None:
+            self.graph = _require('networkx', 'networkx').DiGraph()
+
         field_values: Dict[str, set] = {}
+        item_ids = {d.get('id') for d in items}
         
         for item in items:
             doc_id = item.get('id', str(item.get('_rid', 'unknown')))
@@ -122,7 +216,7 @@ class CosmosGraphVisualizer:
                 # Create edges for reference fields
                 if any(suffix in key.lower() for suffix in ['id', 'ref', 'link', 'parent']):
                     if isinstance(value, str) and value != doc_id:
-                        if any(d.get('id') == value for d in items):
+                        if value in item_ids:
                             self.graph.add_edge(
                                 doc_id, 
                                 value, 
@@ -172,13 +266,17 @@ class CosmosGraphVisualizer:
         type_index = self.node_types.get(node_type, 0)
         return color_list[type_index % len(color_list)]
     
-    def visualize_dynamic(self, output_file: str = 'cosmos_graph.png', figsize: tuple = (20, 16)):
+    def visualize_dynamic(self, output_file: str = IMAGE_FILE, figsize: tuple = (20, 16), show: bool = True):
         """Create a beautiful, dynamic visualization with PortalPay styling."""
-        if self.graph.number_of_nodes() == 0:
+        if self.graph is None or self.graph.number_of_nodes() == 0:
             print("⚠ No data to visualize!")
             return
         
         print(f"🎨 Creating dynamic visualization...")
+        nx = _require('networkx', 'networkx')
+        plt = _pyplot(show)
+        mpatches = importlib.import_module('matplotlib.patches')
+        FancyBboxPatch = mpatches.FancyBboxPatch
         
         # Set up the plot with dark theme
         plt.style.use('dark_background')
@@ -201,13 +299,17 @@ class CosmosGraphVisualizer:
         doc_colors = [self.get_node_color(self.graph.nodes[n]['type'], 'document') for n in doc_nodes]
         field_colors = [COLORS['secondary']] * len(field_nodes)
         
+        # Supernodes (aggregate) grow with their member count, super-edges with their weight
+        def scale(data):
+            return 1 + 0.5 * math.log10(data['count']) if data.get('count', 0) > 1 else 1
+        
         # Draw edges with gradient effect
-        for edge in self.graph.edges():
-            x = [pos[edge[0]][0], pos[edge[1]][0]]
-            y = [pos[edge[0]][1], pos[edge[1]][1]]
+        for source, target, data in self.graph.edges(data=True):
+            x = [pos[source][0], pos[target][0]]
+            y = [pos[source][1], pos[target][1]]
             ax.plot(x, y, 
                    color=COLORS['edge'], 
-                   linewidth=1.5, 
+                   linewidth=1.5 * (1 + math.log10(data.get('weight', 1))), 
                    alpha=0.3,
                    zorder=1)
         
@@ -215,16 +317,17 @@ class CosmosGraphVisualizer:
         for i, node in enumerate(doc_nodes):
             x, y = pos[node]
             color = doc_colors[i]
+            k = scale(self.graph.nodes[node])
             
             # Outer glow
-            circle_glow = plt.Circle((x, y), 0.045, 
+            circle_glow = plt.Circle((x, y), 0.045 * k, 
                                     color=color, 
                                     alpha=0.2,
                                     zorder=2)
             ax.add_patch(circle_glow)
             
             # Main node
-            circle = plt.Circle((x, y), 0.03, 
+            circle = plt.Circle((x, y), 0.03 * k, 
                                color=color, 
                                alpha=0.9,
                                edgecolor='white',
@@ -235,9 +338,10 @@ class CosmosGraphVisualizer:
         # Draw field nodes as rounded squares
         for node in field_nodes:
             x, y = pos[node]
+            k = scale(self.graph.nodes[node])
             rect = FancyBboxPatch(
-                (x - 0.025, y - 0.025), 
-                0.05, 0.05,
+                (x - 0.025 * k, y - 0.025 * k), 
+                0.05 * k, 0.05 * k,
                 boxstyle="round,pad=0.005",
                 facecolor=COLORS['secondary'],
                 edgecolor='white',
@@ -253,20 +357,10 @@ class CosmosGraphVisualizer:
             label = data.get('label', node)
             if len(label) > 15:
                 label = label[:12] + '...'
+            if 'count' in data:
+                label += f"\n×{data['count']}"
             labels[node] = label
         
-        # Draw labels
-        for node, label in labels.items():
-            x, y = pos[node]
-            ax.text(x, y - 0.06, label,
-                   fontsize=9,
-                   ha='center',
-                   va='top',
-                   color=COLORS['foreground'],
-                   weight='medium',
-                   family='sans-serif',
-                   zorder=4)
-        
         # Create beautiful legend
         legend_elements = []
         for node_type, index in sorted(self.node_types.items(), key=lambda x: x[1]):
@@ -330,6 +424,28 @@ class CosmosGraphVisualizer:
         
         plt.tight_layout(rect=[0, 0, 1, 0.90])
         
+        # Draw labels: only those that don't collide with a more important one (supernode size,
+        # degree, documents before fields) once the layout is final
+        nodes = list(labels)
+        anchors = ax.transData.transform([(pos[n][0], pos[n][1] - 0.06 * scale(self.graph.nodes[n])) for n in nodes])
+        px = LABEL_FONTSIZE * fig.dpi / 72
+        sizes = [(px * LABEL_CHAR_WIDTH * max(len(line) for line in labels[n].split('\n')),
+                  px * LABEL_LINE_HEIGHT * (labels[n].count('\n') + 1)) for n in nodes]
+        priority = [(self.graph.nodes[n].get('count', 1), self.graph.degree(n),
+                     self.graph.nodes[n].get('node_class') == 'document') for n in nodes]
+        kept = place_labels(anchors, sizes, priority)
+        for i in kept:
+            x, y = pos[nodes[i]]
+            ax.text(x, y - 0.06 * scale(self.graph.nodes[nodes[i]]), labels[nodes[i]],
+                   fontsize=LABEL_FONTSIZE,
+                   ha='center',
+                   va='top',
+                   color=COLORS['foreground'],
+                   weight='medium',
+                   family='sans-serif',
+                   zorder=4)
+        print(f"✓ Labels: {len(kept)} of {len(nodes)} placed without overlap")
+        
         # Save with high quality
         plt.savefig(output_file, 
                    dpi=300, 
@@ -339,10 +455,13 @@ class CosmosGraphVisualizer:
         print(f"✓ Visualization saved to {output_file}")
         
         # Show interactive plot
-        plt.show()
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
     
-    def export_graph_data(self, output_file: str = 'cosmos_graph.json'):
-        """Export graph data to JSON file."""
+    def to_graph_data(self) -> Dict[str, Any]:
+        """Graph as {'nodes', 'edges', 'metadata'} with full node data (the build artifact format)."""
         graph_data = {
             'nodes': [],
             'edges': [],
@@ -356,10 +475,7 @@ class CosmosGraphVisualizer:
         }
         
         for node, data in self.graph.nodes(data=True):
-            node_data = {'id': node, **data}
-            if 'data' in node_data and isinstance(node_data['data'], dict):
-                node_data['data'] = {k: v for k, v in list(node_data['data'].items())[:5]}
-            graph_data['nodes'].append(node_data)
+            graph_data['nodes'].append({'id': node, **data})
         
         for source, target, data in self.graph.edges(data=True):
             graph_data['edges'].append({
@@ -367,88 +483,473 @@ class CosmosGraphVisualizer:
                 'target': target,
                 **data
             })
-        
-        with open(output_file, 'w') as f:
-            json.dump(graph_data, f, indent=2, default=str)
-        
+        return graph_data
+    
+    def export_graph_data(self, output_file: str = EXPORT_FILE):
+        """Export graph data to JSON file."""
+        write_json(output_file, truncate_graph_data(self.to_graph_data()))
         print(f"✓ Graph data exported to {output_file}")
     
     def print_statistics(self):
         """Print detailed graph statistics."""
-        print("\n" + "="*70)
-        print("📊 GRAPH STATISTICS")
-        print("="*70)
-        print(f"Database:        {self.database_id}")
-        print(f"Container:       {self.container_id}")
-        print(f"Total Nodes:     {self.graph.number_of_nodes()}")
-        print(f"Total Edges:     {self.graph.number_of_edges()}")
-        
-        if self.graph.number_of_nodes() > 0:
-            density = nx.density(self.graph)
-            print(f"Graph Density:   {density:.4f}")
-        
-        if self.node_types:
-            print(f"\n📁 Node Types:")
-            node_type_counts = {}
-            for _, data in self.graph.nodes(data=True):
-                node_type = data.get('type', 'unknown')
-                node_class = data.get('node_class', 'unknown')
-                key = f"{node_type} ({node_class})"
-                node_type_counts[key] = node_type_counts.get(key, 0) + 1
+        print_graph_statistics(self.to_graph_data())
+
+    def aggregate(self, by: str = 'type', expand: Optional[List[str]] = None, expand_limit: int = EXPAND_LIMIT):
+        """Replace the graph with its supernode summary (see aggregate_graph_data), ready to visualize."""
+        summary = aggregate_graph_data(self.to_graph_data(), by=by, expand=expand, expand_limit=expand_limit)
+        self.graph = graph_from_data(summary)
+        print(f"✓ Graph aggregated by {by}: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges")
+        return summary
+
+
+def write_json(path: str, data: Any) -> None:
+    with open(path + '.tmp', 'w') as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(path + '.tmp', path)
+
+
+def load_graph_data(path: str) -> Dict[str, Any]:
+    """Read a graph file (build artifact or export); both share the nodes/edges/metadata layout."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def graph_from_data(graph_data: Dict[str, Any]):
+    """networkx DiGraph from graph data (imports networkx)."""
+    nx = _require('networkx', 'networkx')
+    graph = nx.DiGraph()
+    for node in graph_data['nodes']:
+        attrs = dict(node)
+        graph.add_node(attrs.pop('id'), **attrs)
+    for edge in graph_data['edges']:
+        attrs = dict(edge)
+        graph.add_edge(attrs.pop('source'), attrs.pop('target'), **attrs)
+    return graph
+
+
+def truncate_graph_data(graph_data: Dict[str, Any], fields: int = EXPORT_DATA_FIELDS) -> Dict[str, Any]:
+    """Export format: each node's document data is cut to its first few fields."""
+    nodes = []
+    for node in graph_data['nodes']:
+        node_data = dict(node)
+        if 'data' in node_data and isinstance(node_data['data'], dict):
+            node_data['data'] = {k: v for k, v in list(node_data['data'].items())[:fields]}
+        nodes.append(node_data)
+    return {**graph_data, 'nodes': nodes}
+
+
+def place_labels(anchors, sizes, priority) -> List[int]:
+    """Indices of the labels to draw, most important first, skipping any that overlaps one already kept.
+
+    anchors are the top-centre points of the labels and sizes their (width, height), both in display
+    pixels. Kept boxes are bucketed in a uniform grid of the largest label size, so each candidate is
+    only tested against the few boxes in the cells it covers.
+    """
+    if not len(anchors):
+        return []
+    cell_w = max(w for w, _ in sizes) or 1.0
+    cell_h = max(h for _, h in sizes) or 1.0
+    grid: Dict[tuple, List[tuple]] = {}
+    kept = []
+    for i in sorted(range(len(anchors)), key=lambda i: priority[i], reverse=True):
+        (x, y), (w, h) = anchors[i], sizes[i]
+        box = (x - w / 2, y - h, x + w / 2, y)
+        cells = [(cx, cy) for cx in range(int(box[0] // cell_w), int(box[2] // cell_w) + 1)
+                 for cy in range(int(box[1] // cell_h), int(box[3] // cell_h) + 1)]
+        if any(box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]
+               for c in cells for other in grid.get(c, ())):
+            continue
+        for c in cells:
+            grid.setdefault(c, []).append(box)
+        kept.append(i)
+    return kept
+
+
+def group_key(node: Dict[str, Any], by: str = 'type') -> str:
+    """Supernode a node collapses into: its type, optionally split by wallet or brand; field nodes by field name."""
+    if node.get('node_class') == 'field':
+        return f"field:{node.get('field_name', '?')}"
+    key = str(node.get('type', 'unknown'))
+    if by != 'type':
+        data = node.get('data') if isinstance(node.get('data'), dict) else {}
+        if by == 'wallet':
+            owner = data.get('wallet') or data.get('merchantWallet') or data.get('payTo')
+        else:
+            owner = data.get('brandKey') or data.get('brand')
+        key += f"@{owner or 'none'}"
+    return key
+
+
+def aggregate_graph_data(graph_data: Dict[str, Any], by: str = 'type', expand: Optional[List[str]] = None,
+                         expand_limit: int = EXPAND_LIMIT) -> Dict[str, Any]:
+    """Collapse nodes into 'group:<key>' supernodes with member counts and edges into weighted super-edges.
+
+    Members of the groups in expand stay individual nodes (up to expand_limit per group; the rest stay in the
+    supernode), so layout and rendering scale with the number of groups, not documents. Edge grouping is a
+    NumPy group-by over (source group, target group) codes.
+    """
+    if by not in GROUP_BY:
+        raise ValueError(f"Unknown grouping {by!r} (expected one of {', '.join(GROUP_BY)})")
+    np = _require('numpy', 'numpy')
+    expand = set(expand or ())
+    nodes = graph_data['nodes']
+
+    keys = np.array([f"group:{group_key(n, by)}" for n in nodes], dtype=object)
+    groups, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(groups))
+    unknown = sorted(expand - set(groups.tolist()))
+    if unknown:
+        raise ValueError(f"No supernode {unknown[0]}")
+
+    # Each node maps to a "slot": its group, or its own slot when its group is expanded
+    slot_ids: List[str] = list(groups.tolist())
+    slot_nodes: List[Dict[str, Any]] = []
+    for group_id, i, count in zip(slot_ids, first.tolist(), counts.tolist()):
+        member = nodes[i]
+        is_field = member.get('node_class') == 'field'
+        key = group_id[len('group:'):]
+        label = key.split(':', 1)[1] if is_field else key.split('@', 1)[-1]
+        if len(label) == 42 and label.startswith('0x'):
+            label = f"{label[:6]}…{label[-4:]}"
+        slot_nodes.append({'id': group_id, 'label': label, 'type': 'field' if is_field else member.get('type', 'unknown'),
+                           'node_class': 'field' if is_field else 'document', 'group_by': by, 'key': key,
+                           'count': count, 'internal_edges': 0})
+    slot = inverse.copy()
+    for group_id in expand:
+        g = int(np.searchsorted(groups, group_id))
+        members = np.flatnonzero(inverse == g)[:expand_limit]
+        for i in members.tolist():
+            slot[i] = len(slot_ids)
+            slot_ids.append(nodes[i]['id'])
+            slot_nodes.append(dict(nodes[i], group=group_id))
+        slot_nodes[g]['count'] -= len(members)
+
+    position = {n['id']: i for i, n in enumerate(nodes)}
+    pairs = [(position[e['source']], position[e['target']]) for e in graph_data['edges']
+             if e['source'] in position and e['target'] in position]
+    ends = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    src, dst = slot[ends[:, 0]], slot[ends[:, 1]]
+    n_slots = len(slot_ids)
+    codes, weights = np.unique(src * n_slots + dst, return_counts=True)
+    edges = []
+    for code, weight in zip(codes.tolist(), weights.tolist()):
+        a, b = divmod(code, n_slots)
+        if a == b:
+            slot_nodes[a]['internal_edges'] = weight
+        else:
+            edges.append({'source': slot_ids[a], 'target': slot_ids[b], 'relation': 'aggregate',
+                          'edge_type': 'aggregate', 'weight': weight})
+    kept = [n for n in slot_nodes if n.get('count', 1) > 0]
+
+    metadata = dict(graph_data.get('metadata', {}))
+    metadata.update({'aggregated_by': by, 'expanded': sorted(expand), 'source_nodes': len(nodes),
+                     'source_edges': len(graph_data['edges']), 'total_nodes': len(kept), 'total_edges': len(edges)})
+    return {'nodes': kept, 'edges': edges, 'metadata': metadata}
+
+
+def weak_components(node_ids: List[str], edges: List[Dict[str, Any]]) -> List[int]:
+    """Sizes of the weakly connected components (union-find, no networkx needed)."""
+    parent = {n: n for n in node_ids}
+
+    def find(n):
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    for edge in edges:
+        for n in (edge['source'], edge['target']):
+            parent.setdefault(n, n)
+        a, b = find(edge['source']), find(edge['target'])
+        if a != b:
+            parent[a] = b
+    sizes: Dict[str, int] = {}
+    for n in parent:
+        root = find(n)
+        sizes[root] = sizes.get(root, 0) + 1
+    return sorted(sizes.values(), reverse=True)
+
+
+def print_graph_statistics(graph_data: Dict[str, Any]):
+    """Print detailed graph statistics."""
+    metadata = graph_data.get('metadata', {})
+    nodes, edges = graph_data['nodes'], graph_data['edges']
+    node_count, edge_count = len(nodes), len(edges)
+
+    print("\n" + "="*70)
+    print("📊 GRAPH STATISTICS")
+    print("="*70)
+    print(f"Database:        {metadata.get('database')}")
+    print(f"Container:       {metadata.get('container')}")
+    print(f"Total Nodes:     {node_count}")
+    print(f"Total Edges:     {edge_count}")
+    
+    if node_count > 0:
+        density = edge_count / (node_count * (node_count - 1)) if node_count > 1 else 0.0
+        print(f"Graph Density:   {density:.4f}")
+    
+    if metadata.get('node_types'):
+        print(f"\n📁 Node Types:")
+        node_type_counts = {}
+        for data in nodes:
+            node_type = data.get('type', 'unknown')
+            node_class = data.get('node_class', 'unknown')
+            key = f"{node_type} ({node_class})"
+            node_type_counts[key] = node_type_counts.get(key, 0) + 1
+        
+        for node_type, count in sorted(node_type_counts.items()):
+            print(f"  • {node_type}: {count}")
+    
+    if node_count > 0:
+        comp_sizes = weak_components([n['id'] for n in nodes], edges)
+        if len(comp_sizes) == 1:
+            print(f"\n🔗 Graph is fully connected")
+        else:
+            print(f"\n🔗 Graph has {len(comp_sizes)} connected components")
             
-            for node_type, count in sorted(node_type_counts.items()):
-                print(f"  • {node_type}: {count}")
-        
-        if self.graph.number_of_nodes() > 0:
-            try:
-                if nx.is_weakly_connected(self.graph):
-                    print(f"\n🔗 Graph is fully connected")
-                else:
-                    components = list(nx.weakly_connected_components(self.graph))
-                    print(f"\n🔗 Graph has {len(components)} connected components")
-                    
-                    # Show component sizes
-                    comp_sizes = sorted([len(c) for c in components], reverse=True)
-                    if len(comp_sizes) <= 5:
-                        print(f"   Component sizes: {comp_sizes}")
-                    else:
-                        print(f"   Largest components: {comp_sizes[:5]}")
-            except:
-                pass
-        
-        print("="*70 + "\n")
+            # Show component sizes
+            if len(comp_sizes) <= 5:
+                print(f"   Component sizes: {comp_sizes}")
+            else:
+                print(f"   Largest components: {comp_sizes[:5]}")
+    
+    print("="*70 + "\n")
 
 
-def main():
-    """Main execution function."""
+class GraphIndex:
+    """Adjacency and type lookups over graph data, for the query stage (plain Python)."""
+
+    def __init__(self, graph_data: Dict[str, Any]):
+        self.metadata = graph_data.get('metadata', {})
+        self.nodes: Dict[str, Dict[str, Any]] = {n['id']: n for n in graph_data['nodes']}
+        self.out_edges: Dict[str, List[Dict[str, Any]]] = {}
+        self.in_edges: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_type: Dict[str, List[str]] = {}
+        for edge in graph_data['edges']:
+            self.out_edges.setdefault(edge['source'], []).append(edge)
+            self.in_edges.setdefault(edge['target'], []).append(edge)
+        for node_id, node in self.nodes.items():
+            self.by_type.setdefault(node.get('type', 'unknown'), []).append(node_id)
+
+    def neighbors(self, node_id: str) -> List[Dict[str, Any]]:
+        """Edges touching node_id as {'direction', 'relation', 'node'} (node = the other end)."""
+        result = []
+        for edge in self.out_edges.get(node_id, []):
+            result.append({'direction': 'out', 'relation': edge.get('relation'), 'node': edge['target']})
+        for edge in self.in_edges.get(node_id, []):
+            result.append({'direction': 'in', 'relation': edge.get('relation'), 'node': edge['source']})
+        return result
+
+    def find(self, node_type: Optional[str] = None, field: Optional[str] = None,
+             value: Optional[str] = None) -> List[str]:
+        """Node ids of a type and/or documents whose field equals value (via its shared field node)."""
+        if field is not None:
+            field_node = f"field_{field}:{value}"
+            if field_node in self.nodes:
+                candidates = [e['source'] for e in self.in_edges.get(field_node, [])]
+            else:
+                candidates = [n for n, d in self.nodes.items()
+                              if isinstance(d.get('data'), dict) and str(d['data'].get(field)) == value]
+        elif node_type is not None:
+            candidates = self.by_type.get(node_type, [])
+        else:
+            candidates = list(self.nodes)
+        if node_type is not None:
+            candidates = [n for n in candidates if self.nodes.get(n, {}).get('type') == node_type]
+        return candidates
+
+
+def _default_graph() -> str:
+    """The build artifact if there is one, else the (truncated) export."""
+    return GRAPH_FILE if os.path.exists(GRAPH_FILE) or not os.path.exists(EXPORT_FILE) else EXPORT_FILE
+
+
+def cmd_fetch(args) -> int:
+    visualizer = CosmosGraphVisualizer()
+    items = visualizer.fetch_data(max_items=args.max_items, query=args.query)
+    if not items:
+        print("\n⚠  No data found in the container.")
+        print("   Please check your configuration.")
+        return 1
+    write_json(args.out, {'database': visualizer.database_id, 'container': visualizer.container_id,
+                          'items': items})
+    print(f"✓ Items saved to {args.out}")
+    return 0
+
+
+def cmd_build(args) -> int:
+    with open(args.items, 'r') as f:
+        saved = json.load(f)
+    visualizer = CosmosGraphVisualizer(connect=False)
+    visualizer.database_id = saved.get('database', visualizer.database_id)
+    visualizer.container_id = saved.get('container', visualizer.container_id)
+    visualizer.build_graph(saved['items'])
+    write_json(args.out, visualizer.to_graph_data())
+    print(f"✓ Graph saved to {args.out}")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    print_graph_statistics(load_graph_data(args.graph))
+    return 0
+
+
+def cmd_export(args) -> int:
+    write_json(args.out, truncate_graph_data(load_graph_data(args.graph)))
+    print(f"✓ Graph data exported to {args.out}")
+    return 0
+
+
+def cmd_render(args) -> int:
+    visualizer = CosmosGraphVisualizer(connect=False)
+    visualizer.load_graph(args.graph)
+    visualizer.visualize_dynamic(output_file=args.out, show=args.show)
+    return 0
+
+
+def cmd_query(args) -> int:
+    index = GraphIndex(load_graph_data(args.graph))
+    if args.id:
+        node = index.nodes.get(args.id)
+        if node is None:
+            print(f"✗ No node {args.id}")
+            return 2
+        result = {'node': node, 'neighbors': index.neighbors(args.id)[:args.limit]}
+        if args.json:
+            print(json.dumps(result, indent=2, default=str))
+            return 0
+        print(json.dumps(node, indent=2, default=str))
+        for n in result['neighbors']:
+            arrow = '->' if n['direction'] == 'out' else '<-'
+            print(f"  {arrow} {n['relation']}: {n['node']}")
+        return 0
+
+    field, value = (args.field.split('=', 1) + [''])[:2] if args.field else (None, None)
+    matches = index.find(node_type=args.type, field=field, value=value)
+    if args.json:
+        print(json.dumps([index.nodes.get(n, {'id': n}) for n in matches[:args.limit]], indent=2, default=str))
+    else:
+        for node_id in matches[:args.limit]:
+            print(f"  {node_id}  ({index.nodes.get(node_id, {}).get('type', '?')})")
+        print(f"{len(matches)} matching nodes" + (f", first {args.limit} shown" if len(matches) > args.limit else ""))
+    return 0 if matches else 2
+
+
+def cmd_summary(args) -> int:
+    summary = aggregate_graph_data(load_graph_data(args.graph), by=args.by, expand=args.expand,
+                                   expand_limit=args.expand_limit)
+    metadata = summary['metadata']
+    print(f"✓ {metadata['source_nodes']} nodes / {metadata['source_edges']} edges -> "
+          f"{metadata['total_nodes']} nodes / {metadata['total_edges']} edges (by {args.by})")
+    if args.json:
+        write_json(args.json, summary)
+        print(f"✓ Summary graph saved to {args.json}")
+    if args.list:
+        for node in sorted(summary['nodes'], key=lambda n: -n.get('count', 1)):
+            if 'count' in node:
+                print(f"  {node['count']:>8}  {node['id']}  ({node['internal_edges']} internal edges)")
+        return 0
+    visualizer = CosmosGraphVisualizer(connect=False)
+    visualizer.database_id = metadata.get('database', visualizer.database_id)
+    visualizer.container_id = metadata.get('container', visualizer.container_id)
+    visualizer.node_types = dict(metadata.get('node_types', {}))
+    visualizer.graph = graph_from_data(summary)
+    visualizer.visualize_dynamic(output_file=args.out, show=args.show)
+    return 0
+
+
+def cmd_all(args) -> int:
+    """The original pipeline: fetch -> build -> stats -> export -> render (-> window)."""
     print("\n" + "="*70)
     print("🎨 COSMOS DB GRAPH VISUALIZER")
     print("   Dynamic & Aesthetic Edition")
     print("="*70 + "\n")
     
+    visualizer = CosmosGraphVisualizer()
+    
+    items = visualizer.fetch_data(max_items=args.max_items)
+    
+    if not items:
+        print("\n⚠  No data found in the container.")
+        print("   Please check your configuration.")
+        return 0
+    
+    visualizer.build_graph(items)
+    visualizer.print_statistics()
+    visualizer.export_graph_data()
+    visualizer.visualize_dynamic(show=not args.no_show)
+    
+    print("\n✨ Done! Your beautiful graph visualization is ready.")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Cosmos DB graph visualizer, stage by stage.")
+    sub = parser.add_subparsers(dest='command')
+
+    p = sub.add_parser('fetch', help='Fetch documents from Cosmos')
+    p.add_argument('--max-items', type=int, default=100, help='Page size for the query (default: 100)')
+    p.add_argument('--query', default='SELECT * FROM c', help='Cosmos SQL query')
+    p.add_argument('--out', default=ITEMS_FILE, help=f'Items file (default: {ITEMS_FILE})')
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser('build', help='Build the graph from fetched items')
+    p.add_argument('--items', default=ITEMS_FILE, help=f'Items file (default: {ITEMS_FILE})')
+    p.add_argument('--out', default=GRAPH_FILE, help=f'Graph file (default: {GRAPH_FILE})')
+    p.set_defaults(func=cmd_build)
+
+    for name, func, help_text in (('stats', cmd_stats, 'Print graph statistics'),
+                                  ('export', cmd_export, f'Write the truncated {EXPORT_FILE} export'),
+                                  ('render', cmd_render, 'Render the graph to PNG'),
+                                  ('query', cmd_query, 'Look up nodes and their neighbors'),
+                                  ('summary', cmd_summary, 'Render the graph collapsed into supernodes')):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--graph', default=None,
+                       help=f'Graph file (default: {GRAPH_FILE}, else {EXPORT_FILE})')
+        p.set_defaults(func=func)
+        if name == 'export':
+            p.add_argument('--out', default=EXPORT_FILE, help=f'Export file (default: {EXPORT_FILE})')
+        elif name == 'render':
+            p.add_argument('--out', default=IMAGE_FILE, help=f'Image file (default: {IMAGE_FILE})')
+            p.add_argument('--show', action='store_true', help='Open the interactive matplotlib window')
+        elif name == 'query':
+            p.add_argument('--id', help='Show this node and its neighbors')
+            p.add_argument('--type', help='Nodes of this type')
+            p.add_argument('--field', metavar='NAME=VALUE', help='Documents sharing this field value')
+            p.add_argument('--limit', type=int, default=20, help='Maximum results (default: 20)')
+            p.add_argument('--json', action='store_true', help='Print results as JSON')
+        elif name == 'summary':
+            p.add_argument('--by', choices=GROUP_BY, default='type', help='Supernode grouping (default: type)')
+            p.add_argument('--expand', action='append', metavar='GROUP',
+                           help='Show the members of this supernode (e.g. group:receipt); repeatable')
+            p.add_argument('--expand-limit', type=int, default=EXPAND_LIMIT,
+                           help=f'Members shown per expanded supernode (default: {EXPAND_LIMIT})')
+            p.add_argument('--list', action='store_true', help='Print the supernodes and their counts instead of rendering')
+            p.add_argument('--json', metavar='PATH', help='Also write the summary graph to PATH')
+            p.add_argument('--out', default=SUMMARY_IMAGE_FILE, help=f'Image file (default: {SUMMARY_IMAGE_FILE})')
+            p.add_argument('--show', action='store_true', help='Open the interactive matplotlib window')
+
+    p = sub.add_parser('all', help='Run every stage (the default)')
+    p.add_argument('--max-items', type=int, default=100, help='Page size for the query (default: 100)')
+    p.add_argument('--no-show', action='store_true', help='Do not open the matplotlib window')
+    p.set_defaults(func=cmd_all)
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0] not in sub.choices and argv[0] not in ('-h', '--help')):
+        argv = ['all'] + argv
+    args = parser.parse_args(argv)
+    if getattr(args, 'graph', False) is None:
+        args.graph = _default_graph()
+
     try:
-        visualizer = CosmosGraphVisualizer()
-        
-        items = visualizer.fetch_data(max_items=100)
-        
-        if not items:
-            print("\n⚠  No data found in the container.")
-            print("   Please check your configuration.")
-            return
-        
-        visualizer.build_graph(items)
-        visualizer.print_statistics()
-        visualizer.export_graph_data()
-        visualizer.visualize_dynamic()
-        
-        print("\n✨ Done! Your beautiful graph visualization is ready.")
-        
+        return args.func(args)
     except Exception as e:
         print(f"\n✗ Error: {str(e)}")
         import traceback
         traceback.print_exc()
-        sys.exit(1)
+        return 1
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())